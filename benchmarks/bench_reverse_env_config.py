@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks the substitution of user variable values into suggestions, as done
+by ``MigrationEnvironment._reverse_env_config``, with 10 to 10,000 user
+variables.
+
+The multi-string matcher is compared with the regular expression alternation
+it replaced. Below ``MultiStringMatcher.AUTOMATON_THRESHOLD`` variables the
+matcher is itself a precompiled alternation; the automaton is timed on its own
+to show where it overtakes the alternation. Run with::
+
+    PYTHONPATH=. python benchmarks/bench_reverse_env_config.py
+"""
+
+from __future__ import print_function
+import random
+import re
+import timeit
+
+from mock import patch
+
+from sceptre_migration_tool.string_matcher import MultiStringMatcher
+
+
+VARIABLE_COUNTS = (10, 100, 500, 1000, 10000)
+VALUE_COUNT = 1000
+
+
+def make_user_variables(count):
+    user_variables = {}
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            value = "{:012d}".format(100000000000 + i)
+        elif kind == 1:
+            value = "10.{}.{}.0/24".format(i // 256 % 256, i % 256)
+        else:
+            value = "host-{}.example.com".format(i)
+        user_variables["var{}".format(i)] = value
+    return user_variables
+
+
+def make_values(user_variables):
+    variable_values = list(user_variables.values())
+    rng = random.Random(42)
+    values = []
+    for i in range(VALUE_COUNT):
+        if i % 2:
+            values.append("arn:aws:iam::{}:role/deploy-{}".format(
+                rng.choice(variable_values), i
+            ))
+        else:
+            values.append("sg-{:08x},subnet-{:08x}".format(i, i * 7))
+    return values
+
+
+def regex_sub(reversed_env_config):
+    pattern = '|'.join(
+        re.escape(value) for value in reversed_env_config
+    )
+
+    def reverse(m):
+        return reversed_env_config[m.group(0)]
+    return lambda value: re.sub(pattern, reverse, value)
+
+
+def matcher_sub(reversed_env_config):
+    return MultiStringMatcher(reversed_env_config).sub
+
+
+def automaton_sub(reversed_env_config):
+    with patch.object(MultiStringMatcher, "AUTOMATON_THRESHOLD", 0):
+        return MultiStringMatcher(reversed_env_config).sub
+
+
+def main():
+    print("{:>10} {:>14} {:>14} {:>14} {:>16} {:>9}".format(
+        "variables", "matcher build", "regex us/val",
+        "matcher us/val", "automaton us/val", "speedup"
+    ))
+    for count in VARIABLE_COUNTS:
+        user_variables = make_user_variables(count)
+        reversed_env_config = {
+            v: "{{ var." + k + " }}" for k, v in user_variables.items()
+        }
+        values = make_values(user_variables)
+
+        build_time = timeit.timeit(
+            lambda: matcher_sub(reversed_env_config), number=1
+        )
+        regex = regex_sub(reversed_env_config)
+        matcher = matcher_sub(reversed_env_config)
+        automaton = automaton_sub(reversed_env_config)
+
+        regex_time = min(timeit.repeat(
+            lambda: [regex(v) for v in values], number=1, repeat=3
+        ))
+        matcher_time = min(timeit.repeat(
+            lambda: [matcher(v) for v in values], number=1, repeat=3
+        ))
+        automaton_time = min(timeit.repeat(
+            lambda: [automaton(v) for v in values], number=1, repeat=3
+        ))
+        row = "{:>10} {:>13.1f}ms {:>14.1f} {:>14.1f} {:>16.1f} {:>8.1f}x"
+        print(row.format(
+            count,
+            build_time * 1000,
+            regex_time / VALUE_COUNT * 1e6,
+            matcher_time / VALUE_COUNT * 1e6,
+            automaton_time / VALUE_COUNT * 1e6,
+            regex_time / matcher_time
+        ))
+
+
+if __name__ == "__main__":
+    main()
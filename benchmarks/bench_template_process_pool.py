@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks the conversion of large JSON templates, which boto returns
+parsed, to YAML, as done by ``template.import_template``, by 4 threads, with
+and without a process pool of 1, 2 and 4 worker processes.
+
+Throughput with the pool grows with the number of cores; without it, the
+threads are serialised by the GIL. Run with::
+
+    PYTHONPATH=. python benchmarks/bench_template_process_pool.py
+"""
+
+from __future__ import print_function
+from concurrent.futures import ThreadPoolExecutor
+import json
+import time
+
+from sceptre_migration_tool import process_pool
+from sceptre_migration_tool import template
+
+
+TEMPLATE_COUNT = 8
+THREADS = 4
+PROCESS_COUNTS = (None, 1, 2, 4)
+
+
+def make_template(resource_count=1500):
+    resources = {}
+    for i in range(resource_count):
+        resources["Instance{}".format(i)] = {
+            "Type": "AWS::EC2::Instance",
+            "Properties": {
+                "ImageId": {"Ref": "ImageId"},
+                "InstanceType": "t2.micro",
+                "SubnetId": {"Fn::ImportValue": "subnet-{}".format(i % 16)},
+                "Tags": [
+                    {"Key": "Name", "Value": "instance-{}".format(i)},
+                    {"Key": "Index", "Value": str(i)}
+                ]
+            }
+        }
+    return {
+        "Parameters": {"ImageId": {"Type": "String"}},
+        "Resources": resources
+    }
+
+
+def convert_all(templates):
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(
+            lambda body: template._run_cpu_bound(
+                template._prepare_template, body, body, ".yaml"
+            ),
+            templates
+        ))
+
+
+def main():
+    body = make_template()
+    templates = [body] * TEMPLATE_COUNT
+    print("template size {:.0f} KB, {} templates, {} threads".format(
+        len(json.dumps(body)) / 1024.0, TEMPLATE_COUNT, THREADS
+    ))
+    print("{:>10} {:>10} {:>16}".format("processes", "seconds", "templates/s"))
+    for processes in PROCESS_COUNTS:
+        if processes:
+            process_pool.configure(processes)
+            # Start the workers before timing
+            convert_all(templates[:processes])
+        start = time.time()
+        convert_all(templates)
+        elapsed = time.time() - start
+        if processes:
+            process_pool.get_process_pool().shutdown()
+            process_pool._process_pool = None
+        print("{:>10} {:>10.2f} {:>16.1f}".format(
+            processes or "none", elapsed, TEMPLATE_COUNT / elapsed
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.atomic_file
+
+This module writes files atomically, so that an interrupted import never
+leaves a partially written file behind.
+"""
+
+from contextlib import contextmanager
+import errno
+import os
+import tempfile
+
+
+# mkstemp creates files readable by their owner only; give written files the
+# permissions ``open`` would have.
+_umask = os.umask(0)
+os.umask(_umask)
+
+
+def ensure_dir_exists(directory, permissions=None):
+    """
+    Creates a directory, and any missing parents, unless it already exists.
+    Other threads or processes may create it at the same time.
+
+    :param directory: The directory.
+    :type directory: str
+    :param permissions: The permissions of the directory, only set when it
+        is created here; an existing directory is left as it is.
+    :type permissions: int
+    :returns: Whether the directory was created here.
+    :rtype: bool
+    """
+    if os.path.isdir(directory):
+        return False
+    try:
+        if permissions is None:
+            os.makedirs(directory)
+        else:
+            os.makedirs(directory, permissions)
+    except OSError as e:
+        # Another thread or process may have created it in the meantime
+        if e.errno != errno.EEXIST or not os.path.isdir(directory):
+            raise
+        return False
+    if permissions is not None:
+        # makedirs' mode is subject to the umask
+        os.chmod(directory, permissions)
+    return True
+
+
+@contextmanager
+def atomic_open(path, mode="w", permissions=None):
+    """
+    Opens a temporary file next to ``path`` for writing. When the ``with``
+    block completes, the file is flushed to disk and renamed to ``path``,
+    replacing any existing file. If the block raises, the temporary file is
+    removed and ``path`` is left untouched.
+
+    :param path: The file to write.
+    :type path: str
+    :param mode: The mode to open the file with, ``"w"`` or ``"wb"``.
+    :type mode: str
+    :param permissions: The permissions of the file; by default, those
+        ``open`` would give it. The file never has wider permissions while
+        it is written.
+    :type permissions: int
+    :returns: A context manager yielding the open temporary file.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix="." + os.path.basename(path) + ".",
+        suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, mode) as temp_file:
+            yield temp_file
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.chmod(
+            temp_path,
+            0o666 & ~_umask if permissions is None else permissions
+        )
+        os.rename(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
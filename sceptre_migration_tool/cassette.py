@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.cassette
+
+This module records the AWS calls made during a migration to a cassette file
+and replays them, so that a run can be repeated offline and deterministically.
+"""
+
+from collections import deque
+import json
+import logging
+import threading
+
+from botocore.exceptions import ClientError
+
+from .exceptions import CassetteMismatchError
+from .response_cache import encode_value, decode_object
+
+
+RECORD = "record"
+REPLAY = "replay"
+
+_cassette = None
+
+
+def configure(path, mode):
+    """
+    Enables the process-wide cassette.
+
+    :param path: The cassette file.
+    :type path: str
+    :param mode: Either ``RECORD`` or ``REPLAY``.
+    :type mode: str
+    """
+    global _cassette
+    _cassette = Cassette(path, mode)
+
+
+def get_cassette():
+    """
+    :returns: The process-wide cassette, or None if it is disabled.
+    :rtype: Cassette
+    """
+    return _cassette
+
+
+class Cassette(object):
+    """
+    Cassette stores AWS calls, one JSON object per line, each holding the
+    call's account, region, command and arguments and either its response or
+    its error.
+
+    When replaying, every call must have been recorded. Identical calls are
+    answered in the order they were recorded, so concurrent runs replay the
+    same responses as sequential ones.
+
+    :param path: The cassette file.
+    :type path: str
+    :param mode: Either ``RECORD`` or ``REPLAY``.
+    :type mode: str
+    """
+
+    def __init__(self, path, mode):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._interactions = {}
+        if mode == REPLAY:
+            self._load()
+        else:
+            # Start an empty cassette; interactions are appended as made
+            open(path, "w").close()
+
+    @property
+    def is_replaying(self):
+        return self.mode == REPLAY
+
+    def play(self, key):
+        """
+        Replays a recorded call.
+
+        :param key: The account, region, command and arguments of the call.
+        :type key: tuple
+        :returns: The recorded response.
+        :rtype: dict
+        :raises: botocore.exceptions.ClientError
+        :raises: sceptre_migration_tool.exceptions.CassetteMismatchError
+        """
+        with self._lock:
+            interactions = self._interactions.get(_canonical(key))
+            if not interactions:
+                raise CassetteMismatchError(
+                    "No recorded response for {} in {}".format(key, self.path)
+                )
+            interaction = interactions.popleft()
+        if "error" in interaction:
+            raise ClientError(
+                interaction["error"], interaction["operation_name"]
+            )
+        return interaction["response"]
+
+    def record(self, key, response=None, error=None):
+        """
+        Appends a call to the cassette.
+
+        :param key: The account, region, command and arguments of the call.
+        :type key: tuple
+        :param response: The response of the call.
+        :type response: dict
+        :param error: The error raised by the call.
+        :type error: botocore.exceptions.ClientError
+        """
+        interaction = {"key": key}
+        if error is not None:
+            interaction["error"] = error.response
+            interaction["operation_name"] = error.operation_name
+        else:
+            interaction["response"] = response
+        line = json.dumps(interaction, default=encode_value)
+        with self._lock:
+            with open(self.path, "a") as cassette_file:
+                cassette_file.write(line + "\n")
+
+    def _load(self):
+        with open(self.path, "r") as cassette_file:
+            for line in cassette_file:
+                if not line.strip():
+                    continue
+                interaction = json.loads(line, object_pairs_hook=decode_object)
+                self._interactions.setdefault(
+                    _canonical(interaction["key"]), deque()
+                ).append(interaction)
+        self.logger.debug(
+            "Loaded %d recorded calls from %s",
+            sum(len(calls) for calls in self._interactions.values()),
+            self.path
+        )
+
+
+def _canonical(key):
+    return json.dumps(key, sort_keys=True, default=encode_value)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.cfn_yaml
+
+This module loads and dumps CloudFormation templates and other YAML documents
+used by the migration tool. It uses LibYAML when it is available, and handles
+CloudFormation's short-form intrinsic function tags with its own loader
+class, leaving PyYAML's global state untouched.
+"""
+
+from collections import OrderedDict
+import json
+
+from six import string_types
+import yaml
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+    from yaml import CSafeDumper as _SafeDumper
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _SafeLoader
+    from yaml import SafeDumper as _SafeDumper
+
+
+class CfnYamlLoader(_SafeLoader):
+    """
+    A safe YAML loader that expands CloudFormation short-form tags, such as
+    ``!Ref`` and ``!GetAtt``, into their long-form equivalents.
+    """
+
+
+class CfnYamlDumper(_SafeDumper):
+    """
+    A safe YAML dumper that writes ordered mappings in their own order.
+    """
+
+
+def _construct_intrinsic(loader, tag_suffix, node):
+    if isinstance(node, yaml.ScalarNode):
+        value = loader.construct_scalar(node)
+    elif isinstance(node, yaml.SequenceNode):
+        value = loader.construct_sequence(node, deep=True)
+    else:
+        value = loader.construct_mapping(node, deep=True)
+
+    if tag_suffix in ("Ref", "Condition"):
+        return {tag_suffix: value}
+    if tag_suffix == "GetAtt" and isinstance(value, string_types):
+        value = value.split(".", 1)
+    return {"Fn::" + tag_suffix: value}
+
+
+def _represent_ordered_dict(dumper, data):
+    return dumper.represent_mapping(
+        "tag:yaml.org,2002:map", list(data.items())
+    )
+
+
+CfnYamlLoader.add_multi_constructor("!", _construct_intrinsic)
+CfnYamlDumper.add_representer(OrderedDict, _represent_ordered_dict)
+
+
+def load(body):
+    """
+    Parses a JSON or YAML document. JSON documents are parsed with ``json``,
+    which is much faster than any YAML parser.
+
+    :param body: The document.
+    :type body: str or bytes
+    :returns: The parsed document.
+    :rtype: object
+    """
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    if body.lstrip().startswith("{"):
+        try:
+            return json.loads(body)
+        except ValueError:
+            # YAML flow mappings also start with a brace
+            pass
+    return yaml.load(body, Loader=CfnYamlLoader)
+
+
+def dump(data, stream=None):
+    """
+    Serialises data as block-style YAML.
+
+    :param data: The data to serialise.
+    :type data: object
+    :param stream: A file to write to; if None, a string is returned.
+    :type stream: file
+    :returns: The YAML document, if no stream is given.
+    :rtype: str
+    """
+    return yaml.dump(
+        data, stream, Dumper=CfnYamlDumper, default_flow_style=False
+    )
+
+
+def dump_stream(data, stream):
+    """
+    Serialises data as block-style YAML straight into a stream, producing
+    the same document as ``dump``. Unlike ``dump``, which represents the
+    whole document as a graph of nodes before writing any of it, mappings
+    and sequences are emitted as they are walked, so only the output buffer
+    and the node of one scalar are held at a time. Objects referenced more
+    than once are written in full each time, rather than as aliases.
+
+    :param data: The data to serialise.
+    :type data: object
+    :param stream: The file to write to.
+    :type stream: file
+    """
+    dumper = CfnYamlDumper(stream, default_flow_style=False)
+    try:
+        dumper.emit(yaml.StreamStartEvent())
+        dumper.emit(yaml.DocumentStartEvent(explicit=False))
+        _emit_data(dumper, data)
+        dumper.emit(yaml.DocumentEndEvent(explicit=False))
+        dumper.emit(yaml.StreamEndEvent())
+    finally:
+        dumper.dispose()
+
+
+def _emit_data(dumper, data):
+    if isinstance(data, dict):
+        if isinstance(data, OrderedDict):
+            items = data.items()
+        else:
+            # Sorted, as SafeRepresenter sorts plain mappings
+            try:
+                items = sorted(data.items())
+            except TypeError:
+                items = data.items()
+        dumper.emit(yaml.MappingStartEvent(
+            None, _MAP_TAG, True, flow_style=False
+        ))
+        for key, value in items:
+            _emit_data(dumper, key)
+            _emit_data(dumper, value)
+        dumper.emit(yaml.MappingEndEvent())
+    elif isinstance(data, list):
+        dumper.emit(yaml.SequenceStartEvent(
+            None, _SEQ_TAG, True, flow_style=False
+        ))
+        for item in data:
+            _emit_data(dumper, item)
+        dumper.emit(yaml.SequenceEndEvent())
+    else:
+        _emit_node(dumper, dumper.represent_data(data))
+
+
+def _emit_node(dumper, node):
+    if isinstance(node, yaml.ScalarNode):
+        # Whether the tag can be left implicit, as the serializer decides
+        implicit = (
+            node.tag == dumper.resolve(
+                yaml.ScalarNode, node.value, (True, False)
+            ),
+            node.tag == dumper.resolve(
+                yaml.ScalarNode, node.value, (False, True)
+            )
+        )
+        dumper.emit(yaml.ScalarEvent(
+            None, node.tag, implicit, node.value, style=node.style
+        ))
+    elif isinstance(node, yaml.SequenceNode):
+        dumper.emit(yaml.SequenceStartEvent(
+            None, node.tag,
+            node.tag == dumper.resolve(yaml.SequenceNode, node.value, True),
+            flow_style=node.flow_style
+        ))
+        for item in node.value:
+            _emit_node(dumper, item)
+        dumper.emit(yaml.SequenceEndEvent())
+    else:
+        dumper.emit(yaml.MappingStartEvent(
+            None, node.tag,
+            node.tag == dumper.resolve(yaml.MappingNode, node.value, True),
+            flow_style=node.flow_style
+        ))
+        for key, value in node.value:
+            _emit_node(dumper, key)
+            _emit_node(dumper, value)
+        dumper.emit(yaml.MappingEndEvent())
+
+
+_MAP_TAG = "tag:yaml.org,2002:map"
+_SEQ_TAG = "tag:yaml.org,2002:seq"
@@ -7,18 +7,65 @@ This module implements the Sceptre Migration Tool CLI
 """
 
 import os
+import sys
 import logging
 from logging import Formatter
 import warnings
+from functools import wraps
 
 import click
-import colorama
-import yaml
 
 from . import __version__
-from sceptre import cli as sceptre_cli
-from sceptre.environment import Environment
-from sceptre_migration_tool import migrator
+
+# Sceptre, boto and yaml take a noticeable part of a second to import, so
+# they are only imported by the commands that need them; --help and
+# --version import none of them.
+
+
+def catch_exceptions(func):
+    """
+    Sceptre's ``catch_exceptions``, importing Sceptre's CLI module only when
+    the decorated command runs.
+
+    :param func: The function which may throw exceptions which should be
+        simplified.
+    :type func: func
+    :returns: The decorated function.
+    :rtype: func
+    """
+    @wraps(func)
+    def decorated(*args, **kwargs):
+        from sceptre.cli import catch_exceptions as sceptre_catch_exceptions
+        return sceptre_catch_exceptions(func)(*args, **kwargs)
+
+    return decorated
+
+
+def stack_options(func):
+    """
+    Adds the stack and environment arguments to the click function ``func``,
+    like Sceptre's ``stack_options``.
+
+    :param func: The click function to add the arguments to.
+    :type func: function
+    :returns: function
+    """
+    func = click.argument("stack")(func)
+    func = click.argument("environment")(func)
+    return func
+
+
+def environment_options(func):
+    """
+    Adds the environment argument to the click function ``func``, like
+    Sceptre's ``environment_options``.
+
+    :param func: The click function to add the arguments to.
+    :type func: function
+    :returns: function
+    """
+    func = click.argument("environment")(func)
+    return func
 
 
 @click.group()
@@ -31,13 +78,54 @@ from sceptre_migration_tool import migrator
 @click.option(
     "--var-file", type=click.File("rb"),
     help="A YAML file of variables to template into config files.")
+@click.option(
+    "--cache-dir", "cache_dir", type=click.Path(file_okay=False),
+    help="Cache AWS responses in this directory, so that re-runs mostly "
+    "read from local disk.")
+@click.option(
+    "--cache-ttl", "cache_ttl", type=click.IntRange(min=0), default=3600,
+    show_default=True,
+    help="Seconds a cached stack description or export list stays fresh. "
+    "Cached templates stay fresh until their stack is updated.")
+@click.option(
+    "--refresh", is_flag=True,
+    help="Ignore cached AWS responses and replace them.")
+@click.option(
+    "--credential-cache-dir", "credential_cache_dir",
+    type=click.Path(file_okay=False),
+    help="Cache the temporary credentials of assumed IAM roles in this "
+    "directory, so that later runs skip STS until they expire.")
+@click.option(
+    "--processes", "processes", type=click.IntRange(min=1), default=1,
+    show_default=True,
+    help="Number of processes converting and comparing large templates. "
+    "Use with --jobs, so that templates are fetched while others are "
+    "converted.")
+@click.option(
+    "--stream-templates", is_flag=True,
+    help="Write converted templates straight to their files, rather than "
+    "building each in memory first. Lowers memory use when many large "
+    "templates are imported at once; converts them in the importing "
+    "threads, not in --processes.")
+@click.option(
+    "--record", "record_path", type=click.Path(dir_okay=False),
+    help="Record every AWS call made by the command to this cassette file.")
+@click.option(
+    "--replay", "replay_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Answer every AWS call from this cassette file, without "
+    "credentials or network access.")
 @click.pass_context
 def cli(
-        ctx, debug, directory, var, var_file
+        ctx, debug, directory, var, var_file, cache_dir, cache_ttl, refresh,
+        credential_cache_dir, processes, stream_templates, record_path,
+        replay_path
 ):  # pragma: no cover
     """
     Implements sceptre_migration_tool's CLI.
     """
+    import colorama
+
     setup_logging(debug)
     colorama.init()
     # Enable deprecation warnings
@@ -48,7 +136,8 @@ def cli(
     }
     user_variables = {}
     if var_file:
-        user_variables.update(yaml.safe_load(var_file.read()))
+        from sceptre_migration_tool import cfn_yaml
+        user_variables.update(cfn_yaml.load(var_file.read()))
     if var:
         # --var options overwrite --var-file options
         for variable in var:
@@ -56,18 +145,41 @@ def cli(
             user_variables.update({variable_key: variable_value})
     if user_variables:
         ctx.obj["options"]["user_variables"] = user_variables
+    if cache_dir:
+        from sceptre_migration_tool import response_cache
+        response_cache.configure(cache_dir, cache_ttl, refresh)
+    if credential_cache_dir:
+        from sceptre_migration_tool import credential_cache
+        credential_cache.configure(credential_cache_dir)
+    if processes > 1:
+        from sceptre_migration_tool import process_pool
+        process_pool.configure(processes)
+    if stream_templates:
+        from sceptre_migration_tool import template
+        template.configure_streaming(True)
+    if record_path and replay_path:
+        raise click.UsageError("--record and --replay are exclusive.")
+    if record_path or replay_path:
+        from sceptre_migration_tool import cassette
+        if record_path:
+            cassette.configure(record_path, cassette.RECORD)
+        else:
+            cassette.configure(replay_path, cassette.REPLAY)
 
 
 @cli.command(name="import-stack")
-@sceptre_cli.stack_options
+@stack_options
 @click.argument("aws_stack_name")
 @click.option("--template", "template_path", help="Specify template path.")
 @click.pass_context
-@sceptre_cli.catch_exceptions
+@catch_exceptions
 def import_stack(ctx, environment, stack, aws_stack_name, template_path):
     """
     Import a Sceptre stack from AWS Cloudformation.
     """
+    from sceptre.environment import Environment
+    from sceptre_migration_tool import migrator
+
     if not template_path:
         template_path = os.path.join(
             "templates",
@@ -93,54 +205,116 @@ def import_stack(ctx, environment, stack, aws_stack_name, template_path):
               "delimited values: "
               "environment sceptre-stack-name aws-stack-name {template-path} "
               "The last is optional and if not specified by template will "
-              "be assumed as templates/aws-import/{aws-stack-name}.yaml")
+              "be assumed as templates/aws-import/{aws-stack-name}.yaml. "
+              "Use - to read the list from standard input.")
+@click.option("--jobs", "jobs", type=click.IntRange(min=1), default=1,
+              show_default=True,
+              help="Number of environment groups to import concurrently. "
+              "Environments sharing a region, profile and IAM role form one "
+              "group, whose stacks are imported one at a time.")
+@click.option("--resume", is_flag=True,
+              help="Skip the stacks imported by an earlier, interrupted run.")
 @click.pass_context
-@sceptre_cli.catch_exceptions
-def import_list(ctx, list_path):
+@catch_exceptions
+def import_list(ctx, list_path, jobs, resume):
     """
     Import a list of Sceptre stack from AWS Cloudformation.
     """
+    from sceptre_migration_tool import migrator
+
+    if list_path == "-":
+        migrator.import_list(
+            ctx.obj["sceptre_dir"], ctx.obj["options"],
+            sys.stdin, jobs, resume
+        )
+        return
     with open(list_path, 'r') as fobj:
-        migrator.import_list(ctx.obj["sceptre_dir"], ctx.obj["options"], fobj)
+        migrator.import_list(
+            ctx.obj["sceptre_dir"], ctx.obj["options"], fobj, jobs, resume
+        )
 
 
 @cli.command(name="generate-import-list")
 @click.option("--list-path", "list_path",
-              help="Specify the list output file.")
+              help="Specify the list output file. Defaults to standard "
+              "output, which is also used for -.")
 @click.pass_context
-@sceptre_cli.environment_options
-@sceptre_cli.catch_exceptions
+@environment_options
+@catch_exceptions
 def generate_import_list(ctx, environment, list_path):
     """
     Generate import a list of Sceptre stack from AWS Cloudformation.
     """
+    from sceptre.environment import Environment
+    from sceptre_migration_tool import migrator
+
     env = Environment(
         sceptre_dir=ctx.obj["sceptre_dir"],
         environment_path=environment,
         options=ctx.obj["options"]
     )
 
-    if list_path:
+    if list_path and list_path != "-":
         with open(list_path, 'w') as list_file_obj:
             migrator.generate_import_list(env, list_file_obj)
     else:
         migrator.generate_import_list(env)
 
 
+@cli.command(name="generate-project-import-list")
+@click.option("--list-path", "list_path",
+              help="Specify the list output file. Defaults to standard "
+              "output, which is also used for -.")
+@click.option("--jobs", "jobs", type=click.IntRange(min=1), default=1,
+              show_default=True,
+              help="Number of accounts and regions to list concurrently.")
+@click.pass_context
+@catch_exceptions
+def generate_project_import_list(ctx, list_path, jobs):
+    """
+    Generate one import list for every environment of the project.
+
+    Environments that share a region, profile and IAM role see the same
+    stacks. Each of those stacks is listed once, under the first of the
+    environments in path order; the other environments are left out of
+    the list, which is logged. Edit the list to move stacks between them.
+    """
+    from sceptre_migration_tool import migrator
+
+    if list_path and list_path != "-":
+        with open(list_path, 'w') as list_file_obj:
+            migrator.generate_project_import_list(
+                ctx.obj["sceptre_dir"], ctx.obj["options"], list_file_obj,
+                jobs
+            )
+    else:
+        migrator.generate_project_import_list(
+            ctx.obj["sceptre_dir"], ctx.obj["options"], jobs=jobs
+        )
+
+
 @cli.command(name="import-env")
-@sceptre_cli.environment_options
+@environment_options
+@click.option("--jobs", "jobs", type=click.IntRange(min=1), default=1,
+              show_default=True,
+              help="Number of stacks to import concurrently.")
+@click.option("--resume", is_flag=True,
+              help="Skip the stacks imported by an earlier, interrupted run.")
 @click.pass_context
-@sceptre_cli.catch_exceptions
-def import_env(ctx, environment):
+@catch_exceptions
+def import_env(ctx, environment, jobs, resume):
     """
     Import a Sceptre environment from a set of AWS CloudFormation stacks.
     """
+    from sceptre.environment import Environment
+    from sceptre_migration_tool import migrator
+
     env = Environment(
         sceptre_dir=ctx.obj["sceptre_dir"],
         environment_path=environment,
         options=ctx.obj["options"]
     )
-    migrator.import_env(env)
+    migrator.import_env(env, jobs, resume)
 
 
 def setup_logging(debug):
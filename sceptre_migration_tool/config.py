@@ -8,24 +8,22 @@ This module imports an AWS stack configuration into Sceptre.
 
 from __future__ import print_function
 import os
-import yaml
 import logging
 
-from .exceptions import ImportFailureError
-
-
-def default_ctor(loader, tag_suffix, node):
-    return tag_suffix + ' ' + str(node.value)
-
+from six import StringIO, string_types
 
-yaml.add_multi_constructor('!', default_ctor)
+from . import cfn_yaml
+from .atomic_file import atomic_open
+from .exceptions import ImportFailureError
+from .manifest import get_manifest
 
 
 def import_config(
         migration_environment,
         aws_stack_name,
         config_path,
-        template
+        template,
+        template_body=None
 ):
 
     abs_config_path = os.path.join(
@@ -40,34 +38,55 @@ def import_config(
             "File already exists: file = {}".format(abs_config_path)
         )
 
-    response = migration_environment.connection_manager.call(
-        service='cloudformation',
-        command='describe_stacks',
-        kwargs={
-            'StackName': aws_stack_name
-        }
-    )
-
     migration_environment.set_resolution_context(
         config_path,
         aws_stack_name,
-        response['Stacks'][0],
+        migration_environment.stack_inventory.describe_stack(aws_stack_name),
         template
     )
 
-    with open(abs_config_path, 'w') as config_fobj:
-        writer = ConfigFileWriter(
-            config_fobj,
-            migration_environment
+    config_fobj = StringIO()
+    writer = ConfigFileWriter(
+        config_fobj,
+        migration_environment,
+        template_body
+    )
+    writer.write()
+    _write_config(
+        abs_config_path,
+        config_fobj.getvalue(),
+        get_manifest(migration_environment.environment_config.sceptre_dir)
+    )
+
+
+def _write_config(path, body, manifest):
+    # Identical configs are not rewritten, so their mtimes stay unchanged
+    if manifest.is_current(path, body):
+        logging.getLogger(__name__).debug(
+            "%s - Config unchanged, not rewritten", path
         )
-        writer.write()
+        return
+    if _read_config(path) != body:
+        with atomic_open(path) as config_fobj:
+            config_fobj.write(body)
+    manifest.record(path, body)
+
+
+def _read_config(path):
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'r') as config_fobj:
+        return config_fobj.read()
 
 
 class ConfigFileWriter(object):
-    def __init__(self, config_fobj, migration_environment):
+    def __init__(self, config_fobj, migration_environment, template_body=None):
         self.logger = logging.getLogger(__name__)
         self.config_fobj = config_fobj
         self.migration_environment = migration_environment
+        # The body returned by import_template, if any, so that the template
+        # is not read back from disk
+        self.template_body = template_body
         self.aws_stack = migration_environment.aws_stack
 
     def write(self):
@@ -104,8 +123,11 @@ class ConfigFileWriter(object):
             )
 
     def _get_template_parameters(self):
-        # we use YAML only as JSON is a subset
-        template_body = yaml.load(self.migration_environment.template.body)
+        template_body = self.template_body
+        if template_body is None:
+            template_body = self.migration_environment.template.body
+        if isinstance(template_body, string_types):
+            template_body = cfn_yaml.load(template_body)
         return template_body['Parameters'] \
             if 'Parameters' in template_body else {}
 
@@ -117,24 +139,32 @@ class ConfigFileWriter(object):
                 self.aws_stack['Parameters'],
                 key=lambda x: x['ParameterKey']
             )
+            # The stack's parameters are suggested for in a single batch
+            suggestions = self.migration_environment.suggest_many([
+                parameter['ParameterValue']
+                for parameter in aws_stack_parameter_list
+                if not self._is_default(parameter, template_parameters)
+            ])
             for parameter in aws_stack_parameter_list:
                 key = parameter['ParameterKey']
                 value = parameter['ParameterValue']
-                template_parameter = template_parameters[key]
-                if 'Default' in template_parameter \
-                        and value == template_parameter['Default']:
+                if self._is_default(parameter, template_parameters):
                     print(
                         "  #{}: '{}'".format(key, value),
                         file=self.config_fobj
                     )
                 else:
-                    suggested_value = \
-                        self.migration_environment.suggest(value)
                     print(
-                        "  {}: {}".format(key, suggested_value),
+                        "  {}: {}".format(key, suggestions[value]),
                         file=self.config_fobj
                     )
 
+    @staticmethod
+    def _is_default(parameter, template_parameters):
+        template_parameter = template_parameters[parameter['ParameterKey']]
+        return 'Default' in template_parameter \
+            and parameter['ParameterValue'] == template_parameter['Default']
+
     def _write_stack_tags(self):
         if 'Tags' in self.aws_stack and len(self.aws_stack['Tags']) > 0:
             print('stack_tags:', file=self.config_fobj)
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.connection_manager
+
+This module extends Sceptre's ConnectionManager with the call handling the
+migration tool needs when many calls are made at once, and pools connection
+managers, and so their sessions and clients, by account and region.
+"""
+
+import threading
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from sceptre import connection_manager
+from sceptre.exceptions import RetryLimitExceededError
+
+from .cassette import get_cassette
+from .credential_cache import get_credential_cache, RENEWAL_MARGIN
+from .rate_limiter import get_rate_limiter
+from .response_cache import get_response_cache
+from .response_cache import CACHEABLE_COMMANDS, VERSIONED_COMMANDS
+
+
+THROTTLING_ERROR_CODES = (
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded"
+)
+
+# botocore's default size of a client's HTTP connection pool
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+_max_pool_connections = DEFAULT_MAX_POOL_CONNECTIONS
+
+
+def configure_pool(max_pool_connections):
+    """
+    Sizes the HTTP connection pool of the clients created from now on, so
+    that concurrent callers reuse kept-alive connections rather than open
+    new ones. The pool is never made smaller than botocore's default.
+
+    :param max_pool_connections: The number of concurrent callers.
+    :type max_pool_connections: int
+    """
+    global _max_pool_connections
+    _max_pool_connections = max(
+        DEFAULT_MAX_POOL_CONNECTIONS, max_pool_connections
+    )
+
+
+class ConnectionManager(connection_manager.ConnectionManager):
+    """
+    A Sceptre ConnectionManager whose calls go through an adaptive rate
+    limiter shared by all connection managers of the same account, region
+    and service. Throttled calls lower the limiter's rate and are retried.
+
+    :param profile: The aws credential profile that should be used.
+    :type profile: str
+    :param iam_role: The iam_role that should be assumed in the account.
+    :type iam_role: str
+    :param region: The region to use.
+    :type region: str
+    """
+
+    MAX_RETRIES = 30
+
+    def __init__(self, region, iam_role=None, profile=None):
+        super(ConnectionManager, self).__init__(region, iam_role, profile)
+        # Sceptre's locks are class-wide; per instance, connection managers
+        # of different accounts do not wait on each other's session setup
+        self._session_lock = threading.Lock()
+        self._client_lock = threading.Lock()
+
+    def call(self, service, command, kwargs=None, cache_version=None):
+        """
+        Makes a threadsafe, rate limited Boto3 client call.
+
+        Equivalent to ``boto3.client(<service>).<command>(**kwargs)``.
+
+        When a cassette is recording, the call is appended to it; when one is
+        replaying, the recorded response is returned without calling AWS.
+
+        When the response cache is enabled, cacheable commands are answered
+        from it while fresh. Versioned commands, such as ``get_template``,
+        are only cached when ``cache_version`` is given and are only served
+        while it is unchanged.
+
+        :param service: The Boto3 service to return a client for.
+        :type service: str
+        :param command: The Boto3 command to call.
+        :type command: str
+        :param kwargs: The keyword arguments to supply to <command>.
+        :type kwargs: dict
+        :param cache_version: The version of a versioned command's response.
+        :type cache_version: str
+        :returns: The response from the Boto3 call.
+        :rtype: dict
+        :raises: sceptre.exceptions.RetryLimitExceededException
+        """
+        if kwargs is None:
+            kwargs = {}
+        key = (self.region, self.profile, self.iam_role, service, command,
+               kwargs)
+        cassette = get_cassette()
+        if cassette is None:
+            return self._cached_call(key, cache_version)
+        if cassette.is_replaying:
+            return cassette.play(key)
+        try:
+            response = self._cached_call(key, cache_version)
+        except ClientError as e:
+            cassette.record(key, error=e)
+            raise
+        cassette.record(key, response)
+        return response
+
+    def _cached_call(self, key, cache_version):
+        service, command, kwargs = key[3:]
+        cache = get_response_cache()
+        if cache is not None:
+            if (service, command) in CACHEABLE_COMMANDS:
+                cache_version = None
+            elif (service, command) not in VERSIONED_COMMANDS \
+                    or cache_version is None:
+                cache = None
+        if cache is None:
+            return self._call(service, command, kwargs)
+
+        response = cache.get(key, cache_version)
+        if response is None:
+            response = self._call(service, command, kwargs)
+            cache.put(key, response, cache_version)
+        return response
+
+    @property
+    def boto_session(self):
+        """
+        Returns a boto session in the target account, like Sceptre's.
+
+        When the credential cache is enabled, the temporary credentials of
+        an ``iam_role`` are taken from it while they are fresh, and cached
+        when the role is assumed, so that later runs skip STS. The session
+        is then renewed shortly before its credentials expire.
+
+        :returns: The Boto3 session.
+        :rtype: boto3.session.Session
+        :raises: botocore.exceptions.ClientError
+        """
+        credential_cache = get_credential_cache()
+        if credential_cache is None or not self.iam_role:
+            return super(ConnectionManager, self).boto_session
+
+        with self._session_lock:
+            self._clear_session_cache_if_expired()
+            if self._boto_session is None:
+                credentials = credential_cache.get(
+                    self.profile, self.iam_role
+                )
+                if credentials is None:
+                    credentials = self._assume_role()
+                    credential_cache.put(
+                        self.profile, self.iam_role, credentials
+                    )
+                self._boto_session = boto3.session.Session(
+                    aws_access_key_id=credentials["AccessKeyId"],
+                    aws_secret_access_key=credentials["SecretAccessKey"],
+                    aws_session_token=credentials["SessionToken"],
+                    region_name=self.region
+                )
+                self._boto_session_expiration = \
+                    credentials["Expiration"] - RENEWAL_MARGIN
+            return self._boto_session
+
+    def _assume_role(self):
+        self.logger.debug("Assuming role '%s'...", self.iam_role)
+        sts_session = boto3.session.Session(
+            profile_name=self.profile,
+            region_name=self.region
+        )
+        sts_response = sts_session.client("sts").assume_role(
+            RoleArn=self.iam_role,
+            RoleSessionName="{0}-session".format(
+                self.iam_role.split("/")[-1]
+            )
+        )
+        return sts_response["Credentials"]
+
+    def _get_client(self, service):
+        """
+        Returns the thread safe Boto3 client of a service, creating it with
+        a connection pool of the configured size.
+
+        :param service: The Boto3 service to return a client for.
+        :type service: str
+        :returns: The Boto3 client.
+        :rtype: boto3.client.Client
+        """
+        with self._client_lock:
+            self._clear_session_cache_if_expired()
+            if self.clients.get(service) is None:
+                self.logger.debug(
+                    "No %s client found, creating one...", service
+                )
+                self.clients[service] = self.boto_session.client(
+                    service,
+                    config=Config(max_pool_connections=_max_pool_connections)
+                )
+            return self.clients[service]
+
+    def _call(self, service, command, kwargs):
+        rate_limiter = get_rate_limiter(
+            self.region, self.profile, self.iam_role, service
+        )
+        for _ in range(self.MAX_RETRIES):
+            rate_limiter.acquire()
+            try:
+                response = getattr(self._get_client(service), command)(
+                    **kwargs
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in THROTTLING_ERROR_CODES:
+                    raise
+                rate_limiter.throttled()
+            else:
+                rate_limiter.succeeded()
+                return response
+        raise RetryLimitExceededError(
+            "Exceeded request limit {0} times. Aborting.".format(
+                self.MAX_RETRIES
+            )
+        )
+
+
+connection_managers = {}
+connection_managers_lock = threading.Lock()
+
+
+def get_connection_manager(region, profile, iam_role):
+    """
+    Returns the connection manager shared by everything that calls one
+    account and region, so that its session is set up, and its credentials
+    resolved, once, and its clients' connections are reused. The account is
+    identified by the profile and IAM role used to reach it.
+
+    :returns: The connection manager.
+    :rtype: ConnectionManager
+    """
+    key = (region, profile, iam_role)
+    with connection_managers_lock:
+        if key not in connection_managers:
+            connection_managers[key] = ConnectionManager(
+                region=region,
+                iam_role=iam_role,
+                profile=profile
+            )
+        return connection_managers[key]
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.credential_cache
+
+This module implements an on-disk cache of the temporary credentials of
+assumed IAM roles, so that consecutive runs reuse them instead of each
+calling STS.
+"""
+
+from datetime import datetime, timedelta
+import hashlib
+import json
+import logging
+import os
+
+from dateutil import tz
+
+from .atomic_file import atomic_open, ensure_dir_exists
+from .response_cache import encode_value, decode_object
+
+
+# Credentials are renewed this long before they expire, so that they never
+# expire during a call
+RENEWAL_MARGIN = timedelta(minutes=5)
+
+_credential_cache = None
+
+
+def configure(cache_dir):
+    """
+    Enables the process-wide credential cache.
+
+    :param cache_dir: The directory the cache is kept in.
+    :type cache_dir: str
+    """
+    global _credential_cache
+    _credential_cache = CredentialCache(cache_dir)
+
+
+def get_credential_cache():
+    """
+    :returns: The process-wide credential cache, or None if it is disabled.
+    :rtype: CredentialCache
+    """
+    return _credential_cache
+
+
+class CredentialCache(object):
+    """
+    CredentialCache stores the temporary credentials returned by STS
+    ``assume_role``, one JSON file per profile and role, until shortly
+    before they expire.
+
+    The cache directory, when the cache creates it, is only accessible by
+    its owner, and each file is only readable by its owner.
+
+    :param cache_dir: The directory the cache is kept in.
+    :type cache_dir: str
+    """
+
+    def __init__(self, cache_dir):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir
+
+    def get(self, profile, iam_role):
+        """
+        Returns the cached credentials of a role.
+
+        :param profile: The profile the role was assumed with.
+        :type profile: str
+        :param iam_role: The role.
+        :type iam_role: str
+        :returns: The credentials, as returned by ``assume_role``, or None
+            if none are cached or they are about to expire.
+        :rtype: dict
+        """
+        path = self._get_path(profile, iam_role)
+        try:
+            with open(path, "r") as cache_file:
+                credentials = json.load(
+                    cache_file, object_pairs_hook=decode_object
+                )
+            expiration = credentials["Expiration"]
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+        if expiration - RENEWAL_MARGIN <= datetime.now(tz.tzutc()):
+            return None
+        self.logger.debug("Using cached credentials of %s", iam_role)
+        return credentials
+
+    def put(self, profile, iam_role, credentials):
+        """
+        Caches the credentials of a role. The cache file is replaced
+        atomically.
+
+        :param profile: The profile the role was assumed with.
+        :type profile: str
+        :param iam_role: The role.
+        :type iam_role: str
+        :param credentials: The credentials, as returned by ``assume_role``.
+        :type credentials: dict
+        """
+        # An existing directory, e.g. a shared one, keeps its permissions
+        ensure_dir_exists(self.cache_dir, 0o700)
+        body = json.dumps(
+            {
+                key: credentials[key]
+                for key in (
+                    "AccessKeyId", "SecretAccessKey", "SessionToken",
+                    "Expiration"
+                )
+            },
+            default=encode_value
+        )
+        with atomic_open(
+            self._get_path(profile, iam_role), permissions=0o600
+        ) as cache_file:
+            cache_file.write(body)
+
+    def _get_path(self, profile, iam_role):
+        digest = hashlib.sha256(
+            json.dumps([profile, iam_role]).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.cache_dir, digest + ".json")
@@ -7,3 +7,9 @@ class ImportFailureError(SceptreException):
     """
     Error raised when import of a stack from AWS fails.
     """
+
+
+class CassetteMismatchError(SceptreException):
+    """
+    Error raised when a replayed AWS call was not recorded in the cassette.
+    """
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.executor
+
+This module runs stack imports, either one at a time or concurrently on a
+bounded pool of worker threads.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+
+from .exceptions import ImportFailureError
+
+
+StackImportResult = namedtuple(
+    "StackImportResult",
+    ["config_path", "error", "duration", "log_record_count"]
+)
+
+
+def run_stack_imports(import_tasks, jobs=1, journal=None):
+    """
+    Runs stack imports.
+
+    With a single job the imports run in order on the calling thread and the
+    first failure is raised immediately. With more jobs the imports run on a
+    pool of ``jobs`` threads; the log records of each stack are gathered and
+    emitted together when that stack finishes, every stack is attempted, and
+    a summary is logged at the end.
+
+    When a journal is given, stacks it holds are skipped and every stack
+    imported is recorded in it as soon as it completes. If the imports are
+    interrupted, the stacks already started are finished and journalled
+    before the interrupt is raised.
+
+    :param import_tasks: (config_path, function) pairs, where calling the
+        function imports the stack.
+    :type import_tasks: iterable
+    :param jobs: The number of stacks to import concurrently.
+    :type jobs: int
+    :param journal: The journal of completed imports.
+    :type journal: sceptre_migration_tool.journal.ImportJournal
+    :returns: The result of each import, in the order of ``import_tasks``.
+    :rtype: list
+    :raises: sceptre_migration_tool.exceptions.ImportFailureError
+    """
+    return run_stack_import_groups(
+        [[import_task] for import_task in import_tasks], jobs, journal
+    )
+
+
+def run_stack_import_groups(import_task_groups, jobs=1, journal=None):
+    """
+    Runs groups of stack imports. The imports of a group always run in order,
+    one at a time, while up to ``jobs`` groups run concurrently. Otherwise it
+    behaves like ``run_stack_imports``.
+
+    :param import_task_groups: Lists of (config_path, function) pairs.
+    :type import_task_groups: iterable
+    :param jobs: The number of groups to import concurrently.
+    :type jobs: int
+    :param journal: The journal of completed imports.
+    :type journal: sceptre_migration_tool.journal.ImportJournal
+    :returns: The result of each import, group by group.
+    :rtype: list
+    :raises: sceptre_migration_tool.exceptions.ImportFailureError
+    """
+    import_task_groups = _skip_completed(import_task_groups, journal)
+
+    if jobs <= 1:
+        results = []
+        try:
+            for import_tasks in import_task_groups:
+                for config_path, import_function in import_tasks:
+                    start = time.time()
+                    import_function()
+                    _record(journal, config_path)
+                    results.append(StackImportResult(
+                        config_path, None, time.time() - start, 0
+                    ))
+        except KeyboardInterrupt:
+            _log_interrupted(results, journal)
+            raise
+        return results
+
+    start = time.time()
+    interrupted = threading.Event()
+    with _StackLogBuffer() as log_buffer:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(
+                    _run_group, log_buffer, import_tasks, journal, interrupted
+                )
+                for import_tasks in import_task_groups
+            ]
+            try:
+                results = [
+                    result
+                    for future in futures for result in future.result()
+                ]
+            except KeyboardInterrupt:
+                # Let the running imports finish; start no others
+                interrupted.set()
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=True)
+                _log_interrupted(
+                    [
+                        result for future in futures
+                        if future.done() and not future.cancelled()
+                        for result in future.result()
+                        if result.error is None
+                    ],
+                    journal
+                )
+                raise
+    log_summary(results, time.time() - start)
+
+    failures = [result for result in results if result.error is not None]
+    if failures:
+        raise ImportFailureError(
+            "Unable to import {} of {} stacks: {}".format(
+                len(failures),
+                len(results),
+                ", ".join(result.config_path for result in failures)
+            )
+        )
+    return results
+
+
+def log_summary(results, duration):
+    """
+    Logs how many stacks were imported and why any of them failed.
+
+    :param results: The results of the stack imports.
+    :type results: list
+    :param duration: The wall-clock time taken by the imports, in seconds.
+    :type duration: float
+    """
+    logger = logging.getLogger(__name__)
+    failures = [result for result in results if result.error is not None]
+    logger.info(
+        "Imported %d of %d stacks in %.1fs",
+        len(results) - len(failures),
+        len(results),
+        duration
+    )
+    for result in failures:
+        logger.error(
+            "%s - Import failed: %s", result.config_path, result.error
+        )
+
+
+def _skip_completed(import_task_groups, journal):
+    if journal is None:
+        return import_task_groups
+    pending_groups = []
+    skipped = 0
+    for import_tasks in import_task_groups:
+        pending_tasks = []
+        for import_task in import_tasks:
+            if journal.is_completed(import_task[0]):
+                skipped += 1
+            else:
+                pending_tasks.append(import_task)
+        if pending_tasks:
+            pending_groups.append(pending_tasks)
+    if skipped:
+        logging.getLogger(__name__).info(
+            "Skipping %d stacks already imported", skipped
+        )
+    return pending_groups
+
+
+def _record(journal, config_path):
+    if journal is not None:
+        journal.record(config_path)
+
+
+def _log_interrupted(results, journal):
+    logging.getLogger(__name__).warning(
+        "Interrupted after importing %d stacks%s",
+        len(results),
+        "; re-run with --resume to continue" if journal is not None else ""
+    )
+
+
+def _run_group(log_buffer, import_tasks, journal=None, interrupted=None):
+    results = []
+    for config_path, import_function in import_tasks:
+        if interrupted is not None and interrupted.is_set():
+            break
+        results.append(_run_buffered(
+            log_buffer, config_path, import_function, journal
+        ))
+    return results
+
+
+def _run_buffered(log_buffer, config_path, import_function, journal=None):
+    error = None
+    start = time.time()
+    log_buffer.start()
+    try:
+        import_function()
+        _record(journal, config_path)
+    except Exception as e:
+        error = e
+        logging.getLogger(__name__).debug(
+            "%s - Import failed", config_path, exc_info=True
+        )
+    finally:
+        log_record_count = log_buffer.stop()
+    return StackImportResult(
+        config_path, error, time.time() - start, log_record_count
+    )
+
+
+class _StackLogBuffer(logging.Filter):
+    """
+    Holds back the log records of each worker thread while it imports a
+    stack, then emits them as one uninterrupted block, so that the logs of
+    concurrently imported stacks do not interleave.
+
+    The buffer is attached as a filter to the handlers of the
+    ``sceptre_migration_tool`` and ``sceptre`` loggers for the duration of
+    a ``with`` block.
+    """
+
+    LOGGER_NAMES = ("sceptre_migration_tool", "sceptre")
+
+    def __init__(self):
+        super(_StackLogBuffer, self).__init__()
+        self._local = threading.local()
+        self._emit_lock = threading.Lock()
+        self._handlers = []
+
+    def __enter__(self):
+        for logger_name in self.LOGGER_NAMES:
+            for handler in logging.getLogger(logger_name).handlers:
+                if handler not in self._handlers:
+                    handler.addFilter(self)
+                    self._handlers.append(handler)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for handler in self._handlers:
+            handler.removeFilter(self)
+        self._handlers = []
+
+    def start(self):
+        self._local.records = []
+
+    def stop(self):
+        """
+        Emits the records held back for this thread and releases them.
+
+        :returns: The number of records emitted.
+        :rtype: int
+        """
+        records = self._local.records
+        self._local.records = None
+        with self._emit_lock:
+            for record in records:
+                logging.getLogger(record.name).handle(record)
+        return len(records)
+
+    def filter(self, record):
+        records = getattr(self._local, "records", None)
+        if records is None:
+            return True
+        # A record reaches each handler it propagates to in turn; keep one.
+        if not records or records[-1] is not record:
+            records.append(record)
+        return False
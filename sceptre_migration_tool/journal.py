@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.journal
+
+This module implements the journal of completed stack imports that lets an
+interrupted migration be resumed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+
+JOURNAL_FILE = ".migration-journal"
+
+
+def get_journal_path(sceptre_dir, command, target):
+    """
+    Returns the path of the journal of one command run against one target,
+    e.g. ``import-env`` of an environment path, or ``import-list`` of the
+    items of a list. A fresh run of one command and target empties only its
+    own journal, so every other interrupted run can still be resumed.
+
+    :param sceptre_dir: The Sceptre project directory.
+    :type sceptre_dir: str
+    :param command: The command, e.g. ``import-env``.
+    :type command: str
+    :param target: What the command imports, which must be serialisable
+        as JSON.
+    :returns: The journal file.
+    :rtype: str
+    """
+    digest = hashlib.sha256(
+        json.dumps([command, target]).encode("utf-8")
+    ).hexdigest()
+    return os.path.join(
+        sceptre_dir, "{}-{}-{}".format(JOURNAL_FILE, command, digest[:16])
+    )
+
+
+class ImportJournal(object):
+    """
+    ImportJournal is an append-only file holding the config path of every
+    stack imported so far, one JSON object per line. Each entry is flushed to
+    disk before the next stack is started, so the journal survives a crash
+    or an interrupt.
+
+    A torn last line, left by a crash mid-append, is ignored.
+
+    :param path: The journal file.
+    :type path: str
+    :param resume: Whether to keep the stacks already in the journal. If
+        False, the journal is emptied.
+    :type resume: bool
+    """
+
+    def __init__(self, path, resume=False):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.completed = set()
+        self._lock = threading.Lock()
+        if resume and os.path.isfile(path):
+            self._load()
+        else:
+            open(path, "w").close()
+
+    def is_completed(self, config_path):
+        return config_path in self.completed
+
+    def record(self, config_path):
+        """
+        Records that a stack has been imported.
+
+        :param config_path: The config path of the imported stack.
+        :type config_path: str
+        """
+        line = json.dumps({"config_path": config_path})
+        with self._lock:
+            with open(self.path, "a") as journal_file:
+                journal_file.write(line + "\n")
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+            self.completed.add(config_path)
+
+    def _load(self):
+        with open(self.path, "r") as journal_file:
+            content = journal_file.read()
+        for line in content.splitlines():
+            try:
+                self.completed.add(json.loads(line)["config_path"])
+            except (ValueError, KeyError):
+                self.logger.warning(
+                    "Ignoring damaged journal entry: %s", line.strip()
+                )
+        if content and not content.endswith("\n"):
+            # Terminate the torn line so the next entry starts on its own
+            with open(self.path, "a") as journal_file:
+                journal_file.write("\n")
+        self.logger.info(
+            "Resuming; %d stacks already imported", len(self.completed)
+        )
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.lru_cache
+
+This module implements a bounded, thread-safe least-recently-used cache.
+"""
+
+from collections import OrderedDict
+import threading
+
+
+class LruCache(object):
+    """
+    LruCache maps keys to values, discarding the least recently used entry
+    once it holds ``maxsize`` entries. Any value, including None, can be
+    cached; ``get`` tells a miss apart by returning ``LruCache.MISSING``.
+
+    :param maxsize: The greatest number of entries held.
+    :type maxsize: int
+    """
+
+    MISSING = object()
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.0
+
+    def get(self, key):
+        """
+        :param key: The key.
+        :type key: hashable
+        :returns: The cached value, or ``LruCache.MISSING``.
+        """
+        with self._lock:
+            value = self._entries.pop(key, self.MISSING)
+            if value is self.MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                # Re-inserted as the most recently used entry
+                self._entries[key] = value
+            return value
+
+    def put(self, key, value):
+        """
+        :param key: The key.
+        :type key: hashable
+        :param value: The value.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.manifest
+
+This module implements the manifest of files written by imports, which lets a
+re-run recognise unchanged templates and configs without parsing them.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from .atomic_file import atomic_open
+
+
+MANIFEST_FILE = ".migration-manifest"
+
+
+class Manifest(object):
+    """
+    Manifest records, for every template and config written by an import,
+    the SHA-256 hash, size and modification time of the file, and the hash of
+    the body it was last found to be equivalent to. A file whose size and
+    modification time still match its entry is known to hold that content
+    without being read.
+
+    Entries are appended to the manifest file, one JSON object per line, as
+    files are written; later entries replace earlier ones. The file is
+    compacted when loaded.
+
+    :param path: The manifest file.
+    :type path: str
+    """
+
+    def __init__(self, path):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.root = os.path.dirname(path)
+        self._entries = {}
+        self._lock = threading.Lock()
+        if os.path.isfile(path):
+            self._load()
+
+    def is_current(self, path, body):
+        """
+        Returns whether the file at ``path`` is known to hold ``body``, or a
+        body equivalent to it, without reading or parsing the file.
+
+        :param path: The file.
+        :type path: str
+        :param body: The body that is about to be written.
+        :type body: str
+        :returns: Whether writing ``body`` can be skipped.
+        :rtype: bool
+        """
+        return self.is_current_digest(path, hash_body(body))
+
+    def is_current_digest(self, path, sha256):
+        """
+        Like ``is_current``, given the SHA-256 hash of the body.
+
+        :param path: The file.
+        :type path: str
+        :param sha256: The hash of the body that is about to be written.
+        :type sha256: str
+        :rtype: bool
+        """
+        with self._lock:
+            entry = self._entries.get(self._get_key(path))
+        if entry is None or entry["stat"] != _stat(path):
+            return False
+        return sha256 in (entry["sha256"], entry["source_sha256"])
+
+    def record(self, path, content, body=None):
+        """
+        Records a file after it has been written or checked.
+
+        :param path: The file.
+        :type path: str
+        :param content: The content of the file.
+        :type content: str
+        :param body: The body the file was found equivalent to, if it is not
+            ``content`` itself.
+        :type body: str
+        """
+        self.record_digest(
+            path,
+            hash_body(content),
+            hash_body(body) if body is not None else None
+        )
+
+    def record_digest(self, path, sha256, source_sha256=None):
+        """
+        Like ``record``, given the SHA-256 hashes of the content and body.
+
+        :param path: The file.
+        :type path: str
+        :param sha256: The hash of the content of the file.
+        :type sha256: str
+        :param source_sha256: The hash of the body the file was found
+            equivalent to, if it is not the content itself.
+        :type source_sha256: str
+        """
+        entry = {
+            "path": self._get_key(path),
+            "sha256": sha256,
+            "source_sha256": source_sha256 or sha256,
+            "stat": _stat(path)
+        }
+        line = json.dumps(entry)
+        with self._lock:
+            self._entries[entry["path"]] = entry
+            with open(self.path, "a") as manifest_file:
+                manifest_file.write(line + "\n")
+
+    def _get_key(self, path):
+        return os.path.relpath(os.path.abspath(path), self.root)\
+            .replace("\\", "/")
+
+    def _load(self):
+        line_count = 0
+        with open(self.path, "r") as manifest_file:
+            for line in manifest_file:
+                line_count += 1
+                try:
+                    entry = json.loads(line)
+                    self._entries[entry["path"]] = entry
+                except (ValueError, KeyError):
+                    self.logger.debug("Ignoring damaged manifest entry")
+        if line_count > len(self._entries):
+            with atomic_open(self.path) as manifest_file:
+                for entry in self._entries.values():
+                    manifest_file.write(json.dumps(entry) + "\n")
+
+
+def hash_body(body):
+    """
+    :param body: A file body.
+    :type body: str
+    :returns: The SHA-256 hash of the UTF-8 encoded body.
+    :rtype: str
+    """
+    if not isinstance(body, bytes):
+        body = body.encode("utf-8")
+    return hashlib.sha256(body).hexdigest()
+
+
+def hash_file(path):
+    """
+    :param path: A file.
+    :type path: str
+    :returns: The SHA-256 hash of the file, read a block at a time.
+    :rtype: str
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as hashed_file:
+        for block in iter(lambda: hashed_file.read(64 * 1024), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime]
+
+
+manifests = {}
+manifests_lock = threading.Lock()
+
+
+def get_manifest(sceptre_dir):
+    """
+    Returns the manifest shared by all imports into a sceptre directory.
+
+    :param sceptre_dir: The sceptre directory.
+    :type sceptre_dir: str
+    :returns: The manifest.
+    :rtype: Manifest
+    """
+    key = os.path.abspath(sceptre_dir)
+    with manifests_lock:
+        if key not in manifests:
+            manifests[key] = Manifest(os.path.join(key, MANIFEST_FILE))
+        return manifests[key]
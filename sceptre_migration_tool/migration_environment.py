@@ -2,12 +2,61 @@
 
 import logging
 import os
-import re
+import threading
 
 from sceptre.helpers import get_subclasses
 from sceptre.template import Template
 
+from sceptre_migration_tool.lru_cache import LruCache
+from sceptre_migration_tool.resolver_registry import \
+    get_reverse_resolver_entry_points, LazyReverseResolver, \
+    BUILTIN_REVERSE_RESOLVERS
 from sceptre_migration_tool.reverse_resolvers import ReverseResolver
+from sceptre_migration_tool.stack_inventory import StackInventory
+from sceptre_migration_tool.string_matcher import MultiStringMatcher
+
+
+# The signature and reverse resolver classes of each directory scanned
+reverse_resolver_classes = {}
+reverse_resolver_classes_lock = threading.Lock()
+
+
+def get_reverse_resolver_classes(directory):
+    """
+    Returns the reverse resolver classes defined in the python files of a
+    directory. The directory is only scanned, and its modules only imported,
+    again when it or one of its python files has changed.
+
+    :param directory: The directory.
+    :type directory: str
+    :returns: The classes, keyed by their snake case names.
+    :rtype: dict
+    """
+    signature = _get_directory_signature(directory)
+    with reverse_resolver_classes_lock:
+        cached = reverse_resolver_classes.get(directory)
+        if cached is None or cached[0] != signature:
+            cached = (
+                signature,
+                get_subclasses(
+                    directory=directory, class_type=ReverseResolver
+                )
+            )
+            reverse_resolver_classes[directory] = cached
+        return cached[1]
+
+
+def _get_directory_signature(directory):
+    try:
+        names = sorted(
+            name for name in os.listdir(directory) if name.endswith(".py")
+        )
+        return (os.stat(directory).st_mtime, tuple(
+            (name, os.stat(os.path.join(directory, name)).st_mtime)
+            for name in names
+        ))
+    except OSError:
+        return None
 
 
 class MigrationEnvironment(object):
@@ -16,6 +65,9 @@ class MigrationEnvironment(object):
     PART_AWS_STACK_NAME = 2
     PART_TEMPLATE_PATH = 3
 
+    # The number of suggestions memoised per migration environment
+    SUGGESTION_CACHE_SIZE = 10000
+
     @classmethod
     def read_import_stack_list(cls, list_fobj):
         import_stack_list = []
@@ -45,51 +97,108 @@ class MigrationEnvironment(object):
         )
 
     def __init__(self,
-                 connection_manager, environment_config, import_stack_list=[]
+                 connection_manager, environment_config, import_stack_list=[],
+                 stack_inventory=None
                  ):
         self.logger = logging.getLogger(__name__)
         self.connection_manager = connection_manager
         self.environment_config = environment_config
         self.import_stack_list = import_stack_list
+        self.stack_inventory = stack_inventory \
+            if stack_inventory is not None \
+            else StackInventory(connection_manager)
         self._reversed_env_config = {
             str(v): "{{ var." + str(k) + " }}"
             for k, v
             in self.environment_config['user_variables'].items()
         }
-        self._config_re_pattern = '|'.join(
-            [
-                re.escape(str(config_value))
-                for config_value
-                in self.environment_config['user_variables'].values()
-            ]
-        )
+        # Built once; substitutes every user variable value in one pass
+        self._env_config_matcher = \
+            MultiStringMatcher(self._reversed_env_config)
         self._reverse_resolver_list = None
-        self.config_path = ""
-        self.aws_stack_name = ""
-        self.aws_stack = {}
-        self.template = Template("", {})
+        self._reverse_resolver_list_lock = threading.Lock()
+        # Suggestions that depend on the value alone, and those memoised per
+        # resolution context
+        self._suggestions = LruCache(self.SUGGESTION_CACHE_SIZE)
+        self._context_suggestions = LruCache(self.SUGGESTION_CACHE_SIZE)
+        # The resolution context is per thread, so that stacks can be
+        # imported concurrently against one migration environment.
+        self._resolution_context = threading.local()
+
+    @property
+    def config_path(self):
+        return getattr(self._resolution_context, "config_path", "")
+
+    @config_path.setter
+    def config_path(self, config_path):
+        self._resolution_context.config_path = config_path
+
+    @property
+    def aws_stack_name(self):
+        return getattr(self._resolution_context, "aws_stack_name", "")
+
+    @aws_stack_name.setter
+    def aws_stack_name(self, aws_stack_name):
+        self._resolution_context.aws_stack_name = aws_stack_name
+
+    @property
+    def aws_stack(self):
+        if not hasattr(self._resolution_context, "aws_stack"):
+            self._resolution_context.aws_stack = {}
+        return self._resolution_context.aws_stack
+
+    @aws_stack.setter
+    def aws_stack(self, aws_stack):
+        self._resolution_context.aws_stack = aws_stack
+
+    @property
+    def template(self):
+        if not hasattr(self._resolution_context, "template"):
+            self._resolution_context.template = Template("", {})
+        return self._resolution_context.template
+
+    @template.setter
+    def template(self, template):
+        self._resolution_context.template = template
 
     @property
     def reverse_resolver_list(self):
-        if self._reverse_resolver_list is None:
-            self._reverse_resolver_list = []
-            self._add_reverse_resolvers(
-                os.path.join(
-                    os.path.dirname(__file__),
-                    "reverse_resolvers"
+        with self._reverse_resolver_list_lock:
+            if self._reverse_resolver_list is None:
+                registered = [
+                    LazyReverseResolver(self, entry_point)
+                    for entry_point in get_reverse_resolver_entry_points()
+                ]
+                self._reverse_resolver_list = list(registered)
+                registered_names = set(
+                    reverse_resolver.name for reverse_resolver in registered
                 )
-            )
-            self._add_reverse_resolvers(
-                os.path.join(
-                    self.environment_config.sceptre_dir,
-                    "reverse_resolvers"
+                if not registered_names.issuperset(
+                        BUILTIN_REVERSE_RESOLVERS
+                ):
+                    # This package's own entry points are missing, e.g. when
+                    # run from a source checkout, possibly alongside other
+                    # packages' entry points
+                    self._add_reverse_resolvers(
+                        os.path.join(
+                            os.path.dirname(__file__),
+                            "reverse_resolvers"
+                        ),
+                        registered
+                    )
+                self._add_reverse_resolvers(
+                    os.path.join(
+                        self.environment_config.sceptre_dir,
+                        "reverse_resolvers"
+                    )
+                )
+                self._reverse_resolver_list.sort(
+                    key=lambda r: r.precendence()
+                )
+                self.logger.debug(
+                    "reverse_resolver_list = %s",
+                    str(self._reverse_resolver_list)
                 )
-            )
-            self._reverse_resolver_list.sort(key=lambda r: r.precendence())
-            self.logger.debug(
-                "reverse_resolver_list = %s",
-                str(self._reverse_resolver_list)
-            )
         return self._reverse_resolver_list
 
     def get_internal_stack(self, stack):
@@ -101,16 +210,19 @@ class MigrationEnvironment(object):
                 )
         return None
 
-    def _add_reverse_resolvers(self, directory):
-        classes = get_subclasses(
-            directory=directory, class_type=ReverseResolver
-        )
+    def _add_reverse_resolvers(self, directory, registered=()):
+        classes = get_reverse_resolver_classes(directory)
         self.logger.debug(
             "_add_reverse_resolvers for directory %s are %s",
             directory,
             str(classes)
         )
-        for node_class in classes.values():
+        for name, node_class in classes.items():
+            if any(
+                reverse_resolver.registers(name, node_class)
+                for reverse_resolver in registered
+            ):
+                continue
             self._reverse_resolver_list.append(
                 node_class(
                     self
@@ -126,29 +238,124 @@ class MigrationEnvironment(object):
         self.template = template
 
     def suggest(self, value):
-        if value in self._reversed_env_config:
-            suggestion = "'" + self._reversed_env_config[value] + "'"
-        else:
-            suggestion = self._scan_resolvers_for_suggestion(value)
-            suggestion = self._reverse_env_config(suggestion) \
-                if suggestion else "'" + value + "'"
-        self.logger.debug("Resolution for '%s' is %s", value, suggestion)
-        return suggestion
-
-    def _scan_resolvers_for_suggestion(self, value):
+        """
+        Suggests a config value, such as a resolver call or a user variable
+        reference, for a value of the stack being imported.
+
+        Suggestions are memoised, including values nothing could be
+        suggested for. A suggestion that may depend on the stack being
+        imported, i.e. one that a resolver asked about the value declares
+        context dependent, is memoised for that stack only.
+
+        :param value: The value.
+        :type value: str
+        :returns: The suggested config value.
+        :rtype: str
+        """
+        return self.suggest_many([value])[value]
+
+    def suggest_many(self, values):
+        """
+        Suggests config values for several values of the stack being
+        imported, passing those not memoised down the resolver chain with
+        one call per resolver.
+
+        :param values: The values.
+        :type values: iterable
+        :returns: The suggested config value of each value.
+        :rtype: dict
+        """
+        suggestions = {}
+        pending = []
+        seen = set()
+        for value in values:
+            if value in seen:
+                continue
+            seen.add(value)
+            suggestion = self._suggestions.get(value)
+            if suggestion is LruCache.MISSING:
+                suggestion = self._context_suggestions.get(
+                    self._get_context_key(value)
+                )
+            if suggestion is LruCache.MISSING:
+                pending.append(value)
+            else:
+                suggestions[value] = suggestion
+
+        resolved, context_dependent = self._suggest_many(pending)
+        for value in pending:
+            suggestions[value] = resolved[value]
+            if value in context_dependent:
+                self._context_suggestions.put(
+                    self._get_context_key(value), resolved[value]
+                )
+            else:
+                self._suggestions.put(value, resolved[value])
+        return suggestions
+
+    def log_statistics(self):
+        # Every lookup tries the context-free memo first
+        lookups = self._suggestions.hits + self._suggestions.misses
+        hits = self._suggestions.hits + self._context_suggestions.hits
+        self.logger.info(
+            "Suggestions: %d lookups, %.0f%% answered from memo",
+            lookups,
+            float(hits) / lookups * 100 if lookups else 0.0
+        )
+
+    def _get_context_key(self, value):
+        return (value, self.config_path, self.aws_stack_name)
+
+    def _suggest_many(self, values):
+        """
+        Passes values down the resolvers in precedence order. Each resolver
+        is only asked about, and so only loaded for, the values no resolver
+        before it suggested for; once every value has a suggestion, the
+        remaining resolvers are not touched. A resolver that publishes a
+        reverse lookup table is looked up rather than asked.
+
+        :param values: The values.
+        :type values: list
+        :returns: The suggestion of each value, and the set of values whose
+            suggestion depends on the resolution context, because a resolver
+            asked about them says it does.
+        :rtype: tuple
+        """
+        suggestions = {}
+        context_dependent = set()
+        pending = []
+        for value in values:
+            if value in self._reversed_env_config:
+                suggestions[value] = \
+                    "'" + self._reversed_env_config[value] + "'"
+            else:
+                pending.append(value)
+
         for reverse_resolver in self.reverse_resolver_list:
-            suggestion = reverse_resolver.suggest(value)
-            if suggestion:
-                return suggestion
-        return None
+            if not pending:
+                break
+            table = reverse_resolver.reverse_lookup_table()
+            if table is None:
+                resolver_suggestions = reverse_resolver.suggest_many(pending)
+            else:
+                resolver_suggestions = table
+            context_dependent.update(
+                value for value in pending
+                if reverse_resolver.depends_on_context(value)
+            )
+            for value in pending:
+                suggestion = resolver_suggestions.get(value)
+                if suggestion:
+                    suggestions[value] = self._reverse_env_config(suggestion)
+            pending = [value for value in pending if value not in suggestions]
 
-    def _reverse_env_config(self, value):
-        def reverse(m):
-            return self._reversed_env_config[m.group(0)]
-        if self._config_re_pattern:
-            return re.sub(
-                self._config_re_pattern,
-                reverse,
-                value
+        for value in pending:
+            suggestions[value] = "'" + value + "'"
+        for value in values:
+            self.logger.debug(
+                "Resolution for '%s' is %s", value, suggestions[value]
             )
-        return value
+        return suggestions, context_dependent
+
+    def _reverse_env_config(self, value):
+        return self._env_config_matcher.sub(value)
@@ -8,28 +8,54 @@ AWS for a given stack or environment.
 
 """
 
-from __future__ import print_function
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import os
 import logging
 import sys
+import threading
 
-from sceptre.connection_manager import ConnectionManager
 from sceptre.environment import Environment
+from . import rate_limiter
 from . import stack
+from .connection_manager import configure_pool, get_connection_manager
+from .executor import run_stack_imports, run_stack_import_groups
+from .journal import ImportJournal, get_journal_path
 from .migration_environment import MigrationEnvironment
+from .stack_inventory import StackInventory
 
 
 import_stack_list = []
 
+# Stack inventories shared by every environment that points at the same
+# account and region, keyed by (region, profile, iam_role).
+stack_inventories = {}
+stack_inventories_lock = threading.Lock()
+
 
 def import_stack(env, aws_stack_name, sceptre_stack_path, template_path):
+    migration_environment = _create_migration_environment(env)
+    _import_stack(
+        env,
+        migration_environment,
+        aws_stack_name,
+        sceptre_stack_path,
+        template_path
+    )
+    migration_environment.log_statistics()
+    rate_limiter.log_statistics()
+
+
+def _import_stack(
+        env, migration_environment,
+        aws_stack_name, sceptre_stack_path, template_path
+):
     config_path = "/".join([env.path, sceptre_stack_path])
 
     logger = logging.getLogger(__name__)
     logger.info("%s - Importing stack", config_path)
 
-    migration_environment = _create_migration_environment(env)
-
     stack.import_stack(
         migration_environment=migration_environment,
         aws_stack_name=aws_stack_name,
@@ -40,35 +66,46 @@ def import_stack(env, aws_stack_name, sceptre_stack_path, template_path):
     logger.info("%s - Stack imported", config_path)
 
 
-def import_env(env):
+def import_env(env, jobs=1, resume=False):
     logger = logging.getLogger(__name__)
     logger.info("%s - Importing environment", env.path)
 
+    journal = _create_journal(
+        env.sceptre_dir, resume, "import-env", env.path
+    )
+    # All jobs call through the environment's one connection manager
+    configure_pool(jobs)
     migration_environment = _create_migration_environment(env)
 
-    describe_stacks_kwargs = {}
-    while True:
-        response = migration_environment.connection_manager.call(
-            service='cloudformation',
-            command='describe_stacks',
-            kwargs=describe_stacks_kwargs
-        )
-        for aws_stack in response['Stacks']:
-            stack.import_stack(
+    stack_inventory = migration_environment.stack_inventory
+    if not resume:
+        # Every stack is imported, and the stack output resolver reads every
+        # stack's outputs, so one scan describes them all for both
+        stack_inventory.load()
+    # On resume, stacks are only listed here; each is described when it is
+    # imported, so stacks skipped are never described.
+    import_tasks = []
+    for aws_stack_name in stack_inventory.stack_names:
+        config_path = "/".join([env.path, aws_stack_name])
+        import_tasks.append((
+            config_path,
+            functools.partial(
+                stack.import_stack,
                 migration_environment=migration_environment,
-                aws_stack_name=aws_stack['StackName'],
+                aws_stack_name=aws_stack_name,
                 template_path=os.path.join(
                     'templates',
                     'aws-import',
-                    aws_stack['StackName'] + '.yaml'
+                    aws_stack_name + '.yaml'
                 ),
-                config_path="/".join([env.path, aws_stack['StackName']])
+                config_path=config_path
             )
-        if 'NextToken' not in response or not response['NextToken']:
-            break
-        describe_stacks_kwargs['NextToken'] = response['NextToken']
+        ))
+    run_stack_imports(import_tasks, jobs, journal)
 
     logger.info("%s - Environment imported", env.path)
+    migration_environment.log_statistics()
+    rate_limiter.log_statistics()
 
 
 def _ensure_env_dir_exists(sceptre_dir, env_path):
@@ -80,24 +117,62 @@ def _ensure_env_dir_exists(sceptre_dir, env_path):
         os.makedirs(abs_path)
 
 
-def import_list(sceptre_dir, options, list_fobj):
+def import_list(sceptre_dir, options, list_fobj, jobs=1, resume=False):
     logger = logging.getLogger(__name__)
     logger.info("Importing from list")
 
     global import_stack_list
     import_stack_list = MigrationEnvironment.read_import_stack_list(list_fobj)
 
+    journal = _create_journal(
+        sceptre_dir, resume, "import-list", import_stack_list
+    )
+
+    # One warm migration environment, with its resolvers and their indexes,
+    # is kept per environment and reused by all of its items. Environments
+    # sharing a connection form a group; groups are independent of each
+    # other and may be imported concurrently. Run one at a time, the items
+    # keep the order of the list.
+    migration_environments = {}
+    import_tasks = []
+    import_task_groups = OrderedDict()
     for item in import_stack_list:
-        import_stack(
-            Environment(
+        env_path = item[MigrationEnvironment.PART_ENV]
+        if env_path not in migration_environments:
+            env = Environment(
                 sceptre_dir=sceptre_dir,
-                environment_path=item[MigrationEnvironment.PART_ENV],
+                environment_path=env_path,
                 options=options
-            ),
-            item[MigrationEnvironment.PART_AWS_STACK_NAME],
-            item[MigrationEnvironment.PART_SCEPTRE_STACK_NAME],
-            item[MigrationEnvironment.PART_TEMPLATE_PATH]
+            )
+            migration_environments[env_path] = \
+                (env, _create_migration_environment(env))
+        env, migration_environment = migration_environments[env_path]
+        import_task = (
+            "/".join([env.path, item[
+                MigrationEnvironment.PART_SCEPTRE_STACK_NAME
+            ]]),
+            functools.partial(
+                _import_stack,
+                env,
+                migration_environment,
+                item[MigrationEnvironment.PART_AWS_STACK_NAME],
+                item[MigrationEnvironment.PART_SCEPTRE_STACK_NAME],
+                item[MigrationEnvironment.PART_TEMPLATE_PATH]
+            )
+        )
+        import_tasks.append(import_task)
+        import_task_groups.setdefault(
+            migration_environment.connection_manager, []
+        ).append(import_task)
+    if jobs <= 1:
+        run_stack_imports(import_tasks, journal=journal)
+    else:
+        run_stack_import_groups(
+            list(import_task_groups.values()), jobs, journal
         )
+    for env, migration_environment in migration_environments.values():
+        migration_environment.log_statistics()
+    rate_limiter.log_statistics()
 
 
 def generate_import_list(env, list_file_obj=sys.stdout):
@@ -106,44 +181,119 @@ def generate_import_list(env, list_file_obj=sys.stdout):
 
     migration_environment = _create_migration_environment(env)
 
-    describe_stacks_kwargs = {}
-    while True:
-        response = migration_environment.connection_manager.call(
-            service='cloudformation',
-            command='describe_stacks',
-            kwargs=describe_stacks_kwargs
+    # Each page is written, and flushed, as soon as it arrives, so that a
+    # reader of the list, e.g. a pipe, sees it while the next page is listed
+    for page in migration_environment.stack_inventory.iter_stack_name_pages():
+        list_file_obj.write("".join(
+            _format_list_line(env.path, aws_stack_name)
+            for aws_stack_name in page
+        ))
+        list_file_obj.flush()
+    rate_limiter.log_statistics()
+
+
+def generate_project_import_list(
+        sceptre_dir, options, list_file_obj=sys.stdout, jobs=1
+):
+    """
+    Generates one import list for every leaf environment of a project.
+
+    Environments sharing a region, profile and IAM role share one stack
+    inventory, so each account and region is listed once; the distinct
+    inventories are listed concurrently. Each AWS stack is listed once, under
+    the first environment, in path order, that can see it.
+    """
+    logger = logging.getLogger(__name__)
+    logger.info("Generating Project Import List")
+
+    migration_environments = []
+    for env_path in _find_leaf_environment_paths(sceptre_dir):
+        env = Environment(
+            sceptre_dir=sceptre_dir,
+            environment_path=env_path,
+            options=options
+        )
+        migration_environments.append(
+            (env, _create_migration_environment(env))
         )
-        for aws_stack in response['Stacks']:
-            _output_list_line(env.path, aws_stack, list_file_obj)
-        if 'NextToken' not in response or not response['NextToken']:
-            break
-        describe_stacks_kwargs['NextToken'] = response['NextToken']
-
 
-def _output_list_line(env_path, aws_stack, list_file_obj):
-    print(
+    distinct_inventories = []
+    for env, migration_environment in migration_environments:
+        if migration_environment.stack_inventory not in distinct_inventories:
+            distinct_inventories.append(migration_environment.stack_inventory)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        stack_names = dict(zip(
+            distinct_inventories,
+            executor.map(
+                lambda stack_inventory: stack_inventory.stack_names,
+                distinct_inventories
+            )
+        ))
+
+    listed = set()
+    for env, migration_environment in migration_environments:
+        stack_inventory = migration_environment.stack_inventory
+        if stack_inventory in listed:
+            logger.info(
+                "%s - Stacks already listed for an environment sharing its "
+                "account and region",
+                env.path
+            )
+            continue
+        listed.add(stack_inventory)
+        list_file_obj.write("".join(
+            _format_list_line(env.path, aws_stack_name)
+            for aws_stack_name in stack_names[stack_inventory]
+        ))
+        list_file_obj.flush()
+    rate_limiter.log_statistics()
+
+
+def _find_leaf_environment_paths(sceptre_dir):
+    config_dir = os.path.join(sceptre_dir, "config")
+    for directory, sub_directories, _ in os.walk(config_dir):
+        sub_directories.sort()
+        if not sub_directories and directory != config_dir:
+            yield os.path.relpath(directory, config_dir).replace("\\", "/")
+
+
+def _format_list_line(env_path, aws_stack_name):
+    return " ".join([
         env_path,
-        aws_stack['StackName'],
-        aws_stack['StackName'],
+        aws_stack_name,
+        aws_stack_name,
         os.path.join(
             'templates',
             'aws-import',
-            aws_stack['StackName'] + '.yaml'
-        ),
-        file=list_file_obj
+            aws_stack_name + '.yaml'
+        )
+    ]) + "\n"
+
+
+def _create_journal(sceptre_dir, resume, command, target):
+    return ImportJournal(
+        get_journal_path(sceptre_dir, command, target), resume
     )
 
 
 def _create_migration_environment(env):
     env_config = env._get_config()
 
-    connection_manager = ConnectionManager(
-        region=env_config.get("region"),
-        iam_role=env_config.get("iam_role"),
-        profile=env_config.get("profile")
+    key = (
+        env_config.get("region"),
+        env_config.get("profile"),
+        env_config.get("iam_role")
+    )
+    connection_manager = get_connection_manager(*key)
+    with stack_inventories_lock:
+        if key not in stack_inventories:
+            stack_inventories[key] = StackInventory(connection_manager)
+
+    migration_environment = MigrationEnvironment(
+        connection_manager,
+        env_config,
+        import_stack_list,
+        stack_inventories[key]
     )
-
-    migration_environment = \
-        MigrationEnvironment(connection_manager, env_config, import_stack_list)
 
     return migration_environment
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.process_pool
+
+This module runs CPU-bound work, such as converting large templates, in a
+pool of worker processes, so that it is not serialised by the GIL.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+
+
+_process_pool = None
+
+
+def configure(processes):
+    """
+    Enables the process-wide pool of worker processes.
+
+    Workers are not forked from the calling process once it runs import
+    threads and holds open connections, which a forked child would inherit
+    in whatever state they were in. Where the start method can be chosen,
+    they are started by a forkserver, or spawned where there is none;
+    otherwise, all of them are started here, so call this before starting
+    any threads.
+
+    :param processes: The number of worker processes.
+    :type processes: int
+    """
+    global _process_pool
+    context = _get_start_context()
+    if context is not None:
+        try:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=processes, mp_context=context
+            )
+            return
+        except TypeError:
+            # ProcessPoolExecutor takes no mp_context before Python 3.7
+            pass
+    _process_pool = ProcessPoolExecutor(max_workers=processes)
+    # The first task starts every worker, while there are no threads yet
+    _process_pool.submit(os.getpid).result()
+
+
+def _get_start_context():
+    try:
+        start_methods = multiprocessing.get_all_start_methods()
+    except AttributeError:
+        # Python 2 only forks
+        return None
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in start_methods else "spawn"
+    )
+
+
+def get_process_pool():
+    """
+    :returns: The process-wide pool, or None if it is disabled.
+    :rtype: concurrent.futures.ProcessPoolExecutor
+    """
+    return _process_pool
+
+
+def run(func, *args):
+    """
+    Calls ``func(*args)`` in a worker process when the pool is enabled, and
+    in the calling thread otherwise. The calling thread waits for the result
+    without holding the GIL, so other threads, e.g. fetching the next
+    templates, keep running.
+
+    ``func``, its arguments and its result must be picklable; ``func`` must
+    be a module-level function.
+
+    :param func: The function.
+    :type func: function
+    :returns: The result of the call.
+    """
+    if _process_pool is None:
+        return func(*args)
+    return _process_pool.submit(func, *args).result()
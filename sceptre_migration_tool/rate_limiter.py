@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.rate_limiter
+
+This module implements an adaptive rate limiter for AWS API calls.
+"""
+
+import logging
+import threading
+import time
+
+
+class AdaptiveRateLimiter(object):
+    """
+    AdaptiveRateLimiter is a token bucket whose refill rate is tuned with
+    additive-increase/multiplicative-decrease (AIMD): every successful call
+    raises the rate a little, and every throttled call halves it. It settles
+    on the highest request rate AWS will sustain, without fixed sleeps.
+
+    One limiter is shared by all callers of a service in an account and
+    region; see ``get_rate_limiter``.
+
+    :param name: A name used when reporting statistics.
+    :type name: str
+    :param rate: The initial number of calls per second.
+    :type rate: float
+    :param min_rate: The lowest number of calls per second.
+    :type min_rate: float
+    :param max_rate: The highest number of calls per second.
+    :type max_rate: float
+    :param increase: Calls per second added after each successful call.
+    :type increase: float
+    :param decrease: The factor the rate is multiplied by when throttled.
+    :type decrease: float
+    """
+
+    def __init__(
+            self, name, rate=5.0, min_rate=0.2, max_rate=50.0,
+            increase=0.1, decrease=0.5
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.calls = 0
+        self.throttles = 0
+        self.wait_time = 0.0
+        self._tokens = 1.0
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until the caller may make a call.
+        """
+        start = time.time()
+        while True:
+            with self._lock:
+                self._refill()
+                # Allow for rounding in the refill arithmetic
+                if self._tokens >= 1.0 - 1e-9:
+                    self._tokens = max(0.0, self._tokens - 1.0)
+                    self.calls += 1
+                    self.wait_time += self._updated - start
+                    return
+                delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def succeeded(self):
+        """
+        Records a successful call and raises the rate.
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def throttled(self):
+        """
+        Records a throttled call, lowers the rate and drains the bucket.
+        """
+        with self._lock:
+            self.throttles += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = 0.0
+            self.logger.debug(
+                "%s - Throttled, lowering rate to %.2f calls/s",
+                self.name,
+                self.rate
+            )
+
+    def log_statistics(self):
+        self.logger.info(
+            "%s - %d calls, %d throttled, %.1fs spent waiting, "
+            "final rate %.2f calls/s",
+            self.name,
+            self.calls,
+            self.throttles,
+            self.wait_time,
+            self.rate
+        )
+
+    def _refill(self):
+        now = time.time()
+        # The bucket holds at most one second's worth of calls
+        self._tokens = min(
+            max(self.rate, 1.0),
+            self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+
+rate_limiters = {}
+rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(region, profile, iam_role, service):
+    """
+    Returns the rate limiter shared by all calls to ``service`` in one account
+    and region. The account is identified by the profile and IAM role used to
+    reach it.
+
+    :returns: The rate limiter.
+    :rtype: AdaptiveRateLimiter
+    """
+    key = (region, profile, iam_role, service)
+    with rate_limiters_lock:
+        if key not in rate_limiters:
+            rate_limiters[key] = AdaptiveRateLimiter(
+                "/".join(str(part) for part in key if part)
+            )
+        return rate_limiters[key]
+
+
+def log_statistics():
+    """
+    Logs the statistics of every rate limiter that has been used.
+    """
+    with rate_limiters_lock:
+        limiters = list(rate_limiters.values())
+    for limiter in limiters:
+        if limiter.calls:
+            limiter.log_statistics()
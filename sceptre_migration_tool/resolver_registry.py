@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.resolver_registry
+
+This module finds the reverse resolvers registered by installed packages
+through entry points, and wraps each in a proxy that only imports the
+resolver's module when the resolver is first used.
+"""
+
+import threading
+
+from sceptre_migration_tool.reverse_resolvers import ReverseResolver
+
+
+ENTRY_POINT_GROUP = "sceptre_migration_tool.reverse_resolvers"
+
+# The names of the reverse resolvers this package registers itself
+BUILTIN_REVERSE_RESOLVERS = (
+    "reverse_exports",
+    "reverse_stack_output",
+    "reverse_intuit_ami"
+)
+
+_entry_points = None
+_entry_points_lock = threading.Lock()
+
+
+def get_reverse_resolver_entry_points():
+    """
+    Returns the entry points registered in the reverse resolver group by the
+    installed distributions.
+
+    An entry point is named ``<name>@<precedence>[:<traits>]``, e.g.
+    ``reverse_exports@10:table = my_package.resolvers:ReverseExports``, so
+    that resolvers can be ordered, and passed over, without being imported.
+    The traits are those of ``table``, if the resolver may publish a reverse
+    lookup table, and ``context``, if its suggestions may depend on the
+    resolution context, separated by commas, or ``none``. Without a
+    precedence or traits, the resolver is imported to ask it.
+
+    :returns: The entry points.
+    :rtype: list
+    """
+    global _entry_points
+    with _entry_points_lock:
+        if _entry_points is None:
+            # pkg_resources is slow to import; only pay for it when needed
+            import pkg_resources
+            _entry_points = list(
+                pkg_resources.iter_entry_points(ENTRY_POINT_GROUP)
+            )
+        return _entry_points
+
+
+class LazyReverseResolver(ReverseResolver):
+    """
+    LazyReverseResolver stands in for a reverse resolver registered through
+    an entry point. The resolver's module is imported, and the resolver
+    created, on the first call that needs it.
+
+    :param migration_environment: The migration environment.
+    :type migration_environment: MigrationEnvironment
+    :param entry_point: The resolver's entry point.
+    :type entry_point: pkg_resources.EntryPoint
+    """
+
+    def __init__(self, migration_environment, entry_point):
+        super(LazyReverseResolver, self).__init__(migration_environment)
+        self.entry_point = entry_point
+        self.name, _, metadata = entry_point.name.partition("@")
+        precedence, has_traits, traits = metadata.partition(":")
+        self._precedence = int(precedence) if precedence else None
+        self._traits = frozenset(
+            trait.strip() for trait in traits.split(",")
+        ) if has_traits else None
+        self._resolver = None
+        self._resolver_lock = threading.Lock()
+
+    def __repr__(self):
+        return "LazyReverseResolver({}, loaded={})".format(
+            self.name, self._resolver is not None
+        )
+
+    @property
+    def resolver(self):
+        with self._resolver_lock:
+            if self._resolver is None:
+                self.logger.debug("Loading reverse resolver %s", self.name)
+                resolver_class = self.entry_point.resolve()
+                self._resolver = resolver_class(self.migration_environment)
+        return self._resolver
+
+    def registers(self, name, resolver_class):
+        """
+        Whether this entry point registers a resolver, by name or by class,
+        so that a resolver found by scanning a directory is not added twice.
+        Classes are matched by module and class name, without importing the
+        entry point's module.
+
+        :param name: The resolver's snake case name.
+        :type name: str
+        :param resolver_class: The resolver's class.
+        :type resolver_class: type
+        :rtype: bool
+        """
+        if name == self.name:
+            return True
+        # Modules scanned from a directory are named after their file alone
+        return (
+            self.entry_point.module_name.rpartition(".")[2],
+            ".".join(self.entry_point.attrs)
+        ) == (
+            resolver_class.__module__.rpartition(".")[2],
+            resolver_class.__name__
+        )
+
+    def precendence(self):
+        if self._precedence is None:
+            return self.resolver.precendence()
+        return self._precedence
+
+    def suggest(self, argument):
+        return self.resolver.suggest(argument)
+
+    def suggest_many(self, values):
+        return self.resolver.suggest_many(values)
+
+    def reverse_lookup_table(self):
+        if not self._has_trait("table"):
+            return None
+        return self.resolver.reverse_lookup_table()
+
+    def depends_on_context(self, value):
+        if not self._has_trait("context"):
+            return False
+        return self.resolver.depends_on_context(value)
+
+    def _has_trait(self, trait):
+        # Unless the traits are declared, the resolver is asked
+        return self._traits is None or trait in self._traits
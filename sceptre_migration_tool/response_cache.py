@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.response_cache
+
+This module implements a persistent, compressed on-disk cache of AWS API
+responses, so that re-running a migration mostly reads from local disk.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+
+from dateutil import parser
+
+from .atomic_file import atomic_open, ensure_dir_exists
+
+
+# Commands whose responses are cached for the cache's time-to-live.
+# list_stacks is left out: its summaries are small, and their update times
+# are what tell whether a cached template is still current.
+CACHEABLE_COMMANDS = (
+    ("cloudformation", "describe_stacks"),
+    ("cloudformation", "list_exports")
+)
+
+# Commands whose responses are cached for as long as the version they were
+# cached with (e.g. a stack's last update time) is still current.
+VERSIONED_COMMANDS = (
+    ("cloudformation", "get_template"),
+)
+
+_response_cache = None
+
+
+def configure(cache_dir, ttl=3600, refresh=False):
+    """
+    Enables the process-wide response cache.
+
+    :param cache_dir: The directory the cache is kept in.
+    :type cache_dir: str
+    :param ttl: How long, in seconds, unversioned responses stay fresh.
+    :type ttl: int
+    :param refresh: Whether to ignore cached responses, refreshing them.
+    :type refresh: bool
+    """
+    global _response_cache
+    _response_cache = ResponseCache(cache_dir, ttl, refresh)
+
+
+def get_response_cache():
+    """
+    :returns: The process-wide response cache, or None if it is disabled.
+    :rtype: ResponseCache
+    """
+    return _response_cache
+
+
+class ResponseCache(object):
+    """
+    ResponseCache stores AWS API responses as gzip-compressed JSON files,
+    keyed by account, region, command and arguments.
+
+    :param cache_dir: The directory the cache is kept in.
+    :type cache_dir: str
+    :param ttl: How long, in seconds, unversioned responses stay fresh.
+    :type ttl: int
+    :param refresh: Whether to ignore cached responses, refreshing them.
+    :type refresh: bool
+    """
+
+    def __init__(self, cache_dir, ttl=3600, refresh=False):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.refresh = refresh
+
+    def get(self, key, version=None):
+        """
+        Returns a cached response.
+
+        :param key: The account, region, command and arguments of the call.
+        :type key: tuple
+        :param version: The version the response must have been cached with.
+            Versioned responses do not expire; unversioned ones expire after
+            the time-to-live.
+        :type version: str
+        :returns: The response, or None if it is not cached or is stale.
+        :rtype: dict
+        """
+        if self.refresh:
+            return None
+        path = self._get_path(key)
+        try:
+            with gzip.open(path, "rb") as cache_file:
+                entry = json.loads(
+                    cache_file.read().decode("utf-8"),
+                    object_pairs_hook=decode_object
+                )
+        except (IOError, OSError, ValueError):
+            return None
+        if entry["version"] != version:
+            return None
+        if version is None and time.time() - entry["created"] > self.ttl:
+            return None
+        self.logger.debug("Cache hit for %s", key)
+        return entry["response"]
+
+    def put(self, key, response, version=None):
+        """
+        Caches a response. The cache file is replaced atomically.
+
+        :param key: The account, region, command and arguments of the call.
+        :type key: tuple
+        :param response: The response to cache.
+        :type response: dict
+        :param version: The version of the response.
+        :type version: str
+        """
+        path = self._get_path(key)
+        ensure_dir_exists(os.path.dirname(path))
+        body = json.dumps(
+            {
+                "created": time.time(),
+                "version": version,
+                "response": response
+            },
+            default=encode_value
+        ).encode("utf-8")
+        with atomic_open(path, "wb") as cache_file:
+            with gzip.GzipFile(fileobj=cache_file, mode="wb") as gz:
+                gz.write(body)
+
+    def _get_path(self, key):
+        digest = hashlib.sha256(
+            json.dumps(key, sort_keys=True, default=encode_value)
+            .encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + ".json.gz")
+
+
+def encode_value(value):
+    """
+    Encodes the values of AWS responses that JSON cannot represent.
+    Use as the ``default`` of ``json.dumps``.
+    """
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError("{!r} is not JSON serializable".format(value))
+
+
+def decode_object(pairs):
+    """
+    Decodes objects encoded by ``encode_value``, keeping key order.
+    Use as the ``object_pairs_hook`` of ``json.loads``.
+    """
+    value = OrderedDict(pairs)
+    if "__datetime__" in value:
+        return parser.parse(value["__datetime__"])
+    return value
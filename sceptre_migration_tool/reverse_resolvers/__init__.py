@@ -44,3 +44,45 @@ class ReverseResolver():
         string, or None to indicate they are unable to resolve.
         """
         pass  # pragma: no cover
+
+    def reverse_lookup_table(self):
+        """
+        Resolvers whose suggestions are a fixed map of values to suggestions
+        can publish that map, so that values are looked up in it rather than
+        the resolver being asked value by value. The map must not depend on
+        the resolution context. It is only requested once values reach the
+        resolver, i.e. no resolver of higher precedence suggested for them.
+
+        :returns: A map of each value to its suggestion, or None if the
+            resolver must be asked value by value.
+        :rtype: dict
+        """
+        return None
+
+    def suggest_many(self, values):
+        """
+        Reverse resolves several values at once. Resolvers that look values
+        up in AWS can override this to batch their calls; by default, each
+        value is passed to ``suggest`` in turn.
+
+        :param values: The values to reverse resolve.
+        :type values: list
+        :returns: The suggestion for each value, or None where there is none.
+        :rtype: dict
+        """
+        return {value: self.suggest(value) for value in values}
+
+    def depends_on_context(self, value):
+        """
+        Whether the suggestion for a value depends on the resolution context,
+        i.e. on the stack being imported, rather than on the value alone.
+        Suggestions are memoised per value only if no resolver returns True
+        here; otherwise they are memoised per stack. Any resolver may read
+        the resolution context, so this is True unless overridden by
+        resolvers known not to.
+
+        :param value: The value to reverse resolve.
+        :type value: str
+        :rtype: bool
+        """
+        return True
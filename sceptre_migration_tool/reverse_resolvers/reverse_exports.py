@@ -3,6 +3,7 @@ Created on Nov 29, 2017
 
 @author: Omer Azmon
 '''
+import threading
 
 from sceptre_migration_tool.reverse_resolvers import ReverseResolver
 
@@ -12,14 +13,20 @@ class ReverseExports(ReverseResolver):
     def __init__(self, *args, **kwargs):
         super(ReverseExports, self).__init__(*args, **kwargs)
         self._exports = None
+        self._exports_lock = threading.Lock()
 
     def precendence(self):
         return 10
 
-    def suggest(self, value):
+    def depends_on_context(self, value):
+        return False
+
+    def reverse_lookup_table(self):
+        self._load_exports()
+        return self._exports
 
-        if self._exports is None:
-            self._exports = self._get_exports()
+    def suggest(self, value):
+        self._load_exports()
         suggestion = self._exports[value] if value in self._exports else None
         self.logger.debug(
             "Export Suggestion for '%s' is '%s'",
@@ -28,39 +35,31 @@ class ReverseExports(ReverseResolver):
         )
         return suggestion
 
+    def _load_exports(self):
+        with self._exports_lock:
+            if self._exports is None:
+                self._exports = self._get_exports()
+
     def _get_exports(self):
         """
-        Communicates with AWS Cloudformation to fetch exports.
+        Reads exports from the account-wide stack inventory.
 
         :returns: A formatted version of the stack exports.
         :rtype: dict
         """
-        self.logger.debug("Collecting exports...")
         exports = {}
-        list_exports_kwargs = {}
-        while True:
-            response = self.migration_environment.connection_manager.call(
-                service="cloudformation",
-                command="list_exports",
-                kwargs=list_exports_kwargs
-            )
-            for export in response["Exports"]:
-                if export["Value"] in exports:
-                    self.logger.warning(
-                        "Skipping %s export reverse lookup."
-                        " Duplicate Value=%s",
-                        export["Name"],
-                        export["Value"]
-                    )
-                else:
-                    key = export["Value"]
-                    export_key = export["Name"]
-                    exports[key] = "!stack_export '" + export_key + "'"
-            if 'NextToken' in response \
-                    and response['NextToken'] is not None:
-                list_exports_kwargs = {'NextToken': response['NextToken']}
+        for export in self.migration_environment.stack_inventory.exports:
+            if export["Value"] in exports:
+                self.logger.warning(
+                    "Skipping %s export reverse lookup."
+                    " Duplicate Value=%s",
+                    export["Name"],
+                    export["Value"]
+                )
             else:
-                break
+                key = export["Value"]
+                export_key = export["Name"]
+                exports[key] = "!stack_export '" + export_key + "'"
 
         self.logger.debug("Exports: %s", exports)
         return exports
@@ -16,6 +16,9 @@ class ReverseIntuitAmi(ReverseResolver):
     def precendence(self):
         return 90
 
+    def depends_on_context(self, value):
+        return False
+
     def suggest(self, value):
         suggestion = '!intuit_ami' \
             if re.match('ami-[0-9a-f]+$', value) else None
@@ -3,6 +3,7 @@ Created on Nov 29, 2017
 
 @author: Omer Azmon
 '''
+import threading
 
 from sceptre_migration_tool.reverse_resolvers import ReverseResolver
 
@@ -13,13 +14,29 @@ class ReverseStackOutput(ReverseResolver):
         super(ReverseStackOutput, self).__init__(*args, **kwargs)
         self._stack_output = None
         self._stack_output_external = None
+        self._stack_output_lock = threading.Lock()
 
     def precendence(self):
         return 20
 
+    def reverse_lookup_table(self):
+        self._load_stack_output()
+        # Internal outputs depend on the stack being imported
+        if self._stack_output:
+            return None
+        return {
+            value: suggestion
+            for value, (stack_name, suggestion)
+            in self._stack_output_external.items()
+        }
+
+    def depends_on_context(self, value):
+        # Internal outputs are not suggested to the stack that exports them
+        self._load_stack_output()
+        return value in self._stack_output
+
     def suggest(self, value):
-        if self._stack_output is None:
-            self._get_stack_output()
+        self._load_stack_output()
 
         if value in self._stack_output:
             stack_name, suggestion = self._stack_output[value]
@@ -50,29 +67,22 @@ class ReverseStackOutput(ReverseResolver):
         )
         return None
 
+    def _load_stack_output(self):
+        with self._stack_output_lock:
+            if self._stack_output is None:
+                self._get_stack_output()
+
     def _get_stack_output(self):
         """
-        Communicates with AWS Cloudformation to fetch stack outputs.
+        Reads stack outputs from the account-wide stack inventory.
         It updates both self._stack_outputs and self._stack_output_external
         with reverse indexes of stack output
         """
         self.logger.debug("Collecting stack outputs...")
         self._stack_output = {}
         self._stack_output_external = {}
-        list_stacks_kwargs = {}
-        while True:
-            response = self.migration_environment.connection_manager.call(
-                service="cloudformation",
-                command="describe_stacks",
-                kwargs=list_stacks_kwargs
-            )
-            for stack in response["Stacks"]:
-                self._build_reverse_lookup(stack)
-            if 'NextToken' in response \
-                    and response['NextToken'] is not None:
-                list_stacks_kwargs = {'NextToken': response['NextToken']}
-            else:
-                break
+        for stack in self.migration_environment.stack_inventory.stacks:
+            self._build_reverse_lookup(stack)
 
         self.logger.debug("Outputs: %s", self._stack_output)
         self.logger.debug("Outputs external: %s", self._stack_output)
@@ -24,7 +24,7 @@ def import_stack(
         template_path,
         config_path):
 
-    template = import_template(
+    template, template_body = import_template(
         migration_environment,
         aws_stack_name,
         template_path
@@ -37,7 +37,8 @@ def import_stack(
         migration_environment,
         aws_stack_name,
         config_path,
-        template
+        template,
+        template_body
     )
 
     logger.info(
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.stack_inventory
+
+This module implements an account-wide inventory of AWS CloudFormation stacks.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+
+
+# Every stack status except DELETE_COMPLETE, i.e. the stacks describe_stacks
+# lists when no stack name is given
+STACK_STATUS_FILTER = [
+    "CREATE_IN_PROGRESS",
+    "CREATE_FAILED",
+    "CREATE_COMPLETE",
+    "ROLLBACK_IN_PROGRESS",
+    "ROLLBACK_FAILED",
+    "ROLLBACK_COMPLETE",
+    "DELETE_IN_PROGRESS",
+    "DELETE_FAILED",
+    "UPDATE_IN_PROGRESS",
+    "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS",
+    "UPDATE_COMPLETE",
+    "UPDATE_FAILED",
+    "UPDATE_ROLLBACK_IN_PROGRESS",
+    "UPDATE_ROLLBACK_FAILED",
+    "UPDATE_ROLLBACK_COMPLETE_CLEANUP_IN_PROGRESS",
+    "UPDATE_ROLLBACK_COMPLETE",
+    "REVIEW_IN_PROGRESS",
+    "IMPORT_IN_PROGRESS",
+    "IMPORT_COMPLETE",
+    "IMPORT_ROLLBACK_IN_PROGRESS",
+    "IMPORT_ROLLBACK_FAILED",
+    "IMPORT_ROLLBACK_COMPLETE"
+]
+
+
+class StackInventory(object):
+    """
+    StackInventory holds the description, outputs and parameters of every
+    AWS CloudFormation stack in one account and region, together with the
+    account's exports. Each is loaded with a single paged scan the first time
+    it is needed and is then shared by everything that reads stacks.
+
+    Stacks can also be enumerated by name alone, with the much smaller
+    ``list_stacks`` summaries, leaving each stack to be described only when
+    it is imported. The summaries are never served from the response cache,
+    so they also tell when each stack was last updated.
+
+    :param connection_manager: A connection manager.
+    :type connection_manager: sceptre.connection_manager.ConnectionManager
+    """
+
+    def __init__(self, connection_manager):
+        self.logger = logging.getLogger(__name__)
+        self.connection_manager = connection_manager
+        self._stacks = None
+        self._stack_summaries = None
+        self._exports = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self):
+        return self._stacks is not None
+
+    @property
+    def stacks(self):
+        """
+        The description of every stack in the account and region.
+
+        :returns: The stack descriptions in the order AWS returned them.
+        :rtype: list
+        """
+        self.load()
+        return list(self._stacks.values())
+
+    @property
+    def stack_names(self):
+        """
+        The name of every stack in the account and region. When the
+        inventory is loaded, its stacks are used; otherwise the stacks are
+        listed without their details.
+
+        :returns: The stack names in the order AWS returned them.
+        :rtype: list
+        """
+        with self._lock:
+            if self._stacks is not None:
+                return list(self._stacks)
+            if self._stack_summaries is None:
+                self._stack_summaries = self._list_all_stack_summaries()
+            return list(self._stack_summaries)
+
+    def iter_stack_name_pages(self):
+        """
+        Yields the name of every stack in the account and region, a page at
+        a time, as ``list_stacks`` returns them. The next page is requested
+        while the caller handles the current one. When the stacks are
+        already loaded or listed, they are yielded as a single page.
+
+        :returns: The pages of stack names.
+        :rtype: generator
+        """
+        with self._lock:
+            if self._stacks is not None:
+                stack_names = list(self._stacks)
+            elif self._stack_summaries is not None:
+                stack_names = list(self._stack_summaries)
+            else:
+                stack_names = None
+        if stack_names is not None:
+            yield list(stack_names)
+            return
+
+        stack_summaries = OrderedDict()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._list_stacks_page)
+            while future is not None:
+                response = future.result()
+                if response.get('NextToken'):
+                    next_future = executor.submit(
+                        self._list_stacks_page, response['NextToken']
+                    )
+                else:
+                    next_future = None
+                page = []
+                for summary in response['StackSummaries']:
+                    stack_summaries[summary['StackName']] = summary
+                    page.append(summary['StackName'])
+                yield page
+                future = next_future
+        with self._lock:
+            if self._stack_summaries is None:
+                self._stack_summaries = stack_summaries
+
+    @property
+    def exports(self):
+        """
+        Every export in the account and region.
+
+        :returns: The exports as returned by ``list_exports``.
+        :rtype: list
+        """
+        with self._lock:
+            if self._exports is None:
+                self._exports = self._list_all_exports()
+        return self._exports
+
+    def load(self):
+        """
+        Loads every stack description, unless already loaded.
+        """
+        with self._lock:
+            if self._stacks is None:
+                self._stacks = self._describe_all_stacks()
+
+    def get_stack_version(self, stack_name):
+        """
+        Returns the time a stack was last updated, or created if it never
+        was, which identifies the current version of its template. It is
+        taken from the ``list_stacks`` summaries, listed once per inventory
+        and never from the response cache, so that a stack updated since its
+        description was cached is not taken for unchanged.
+
+        :param stack_name: The AWS CloudFormation stack name.
+        :type stack_name: str
+        :returns: The time, or None if the stack was not listed.
+        :rtype: datetime.datetime
+        """
+        with self._lock:
+            if self._stack_summaries is None:
+                self._stack_summaries = self._list_all_stack_summaries()
+            summary = self._stack_summaries.get(stack_name)
+        if summary is None:
+            return None
+        return summary.get('LastUpdatedTime', summary['CreationTime'])
+
+    def describe_stack(self, stack_name):
+        """
+        Returns the description of a single stack. The loaded inventory is
+        used when available; otherwise only the requested stack is described.
+
+        :param stack_name: The AWS CloudFormation stack name.
+        :type stack_name: str
+        :returns: The stack description.
+        :rtype: dict
+        """
+        if self.is_loaded and stack_name in self._stacks:
+            return self._stacks[stack_name]
+        response = self.connection_manager.call(
+            service='cloudformation',
+            command='describe_stacks',
+            kwargs={
+                'StackName': stack_name
+            }
+        )
+        return response['Stacks'][0]
+
+    def _describe_all_stacks(self):
+        self.logger.debug("Collecting stack inventory...")
+        stacks = OrderedDict()
+        describe_stacks_kwargs = {}
+        while True:
+            response = self.connection_manager.call(
+                service='cloudformation',
+                command='describe_stacks',
+                kwargs=describe_stacks_kwargs
+            )
+            for stack in response['Stacks']:
+                stacks[stack['StackName']] = stack
+            if 'NextToken' not in response or not response['NextToken']:
+                break
+            describe_stacks_kwargs = {'NextToken': response['NextToken']}
+        self.logger.debug("Stack inventory holds %d stacks", len(stacks))
+        return stacks
+
+    def _list_all_stack_summaries(self):
+        self.logger.debug("Listing stacks...")
+        stack_summaries = OrderedDict()
+        response = self._list_stacks_page()
+        while True:
+            for summary in response['StackSummaries']:
+                stack_summaries[summary['StackName']] = summary
+            if 'NextToken' not in response or not response['NextToken']:
+                break
+            response = self._list_stacks_page(response['NextToken'])
+        return stack_summaries
+
+    def _list_stacks_page(self, next_token=None):
+        list_stacks_kwargs = {'StackStatusFilter': STACK_STATUS_FILTER}
+        if next_token:
+            list_stacks_kwargs['NextToken'] = next_token
+        return self.connection_manager.call(
+            service='cloudformation',
+            command='list_stacks',
+            kwargs=list_stacks_kwargs
+        )
+
+    def _list_all_exports(self):
+        self.logger.debug("Collecting exports...")
+        exports = []
+        list_exports_kwargs = {}
+        while True:
+            response = self.connection_manager.call(
+                service='cloudformation',
+                command='list_exports',
+                kwargs=list_exports_kwargs
+            )
+            exports.extend(response['Exports'])
+            if 'NextToken' not in response or not response['NextToken']:
+                break
+            list_exports_kwargs = {'NextToken': response['NextToken']}
+        return exports
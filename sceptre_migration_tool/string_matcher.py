@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""
+sceptre_migration_tool.string_matcher
+
+This module implements a multi-pattern string matcher, used to substitute
+many literal strings at once.
+"""
+
+from collections import deque
+import re
+
+
+class MultiStringMatcher(object):
+    """
+    MultiStringMatcher replaces occurrences of many literal strings in a text
+    with their replacements, in time linear in the length of the text,
+    however many strings there are.
+
+    Matches are chosen leftmost-longest: scanning from the left, the longest
+    string starting at the first position where any string matches is
+    replaced, and scanning resumes after it.
+
+    Below ``AUTOMATON_THRESHOLD`` strings, the common case, the matcher is a
+    regular expression alternating the strings longest first, which the C
+    regex engine runs faster than any automaton walked in Python. From the
+    threshold on, where the alternation's cost grows with the number of
+    strings, the matcher is an Aho-Corasick automaton over the reversed
+    strings. Run over the reversed text, it gives, for every position, the
+    longest string starting there in one pass; a second pass then picks the
+    matches.
+
+    :param replacements: A map of each string to its replacement. Empty
+        strings are ignored.
+    :type replacements: dict
+    """
+
+    # Measured with benchmarks/bench_reverse_env_config.py, the alternation
+    # stays faster up to about a thousand strings
+    AUTOMATON_THRESHOLD = 1000
+
+    def __init__(self, replacements):
+        self.replacements = {
+            string: replacement
+            for string, replacement in replacements.items()
+            if string
+        }
+        self._pattern = None
+        if len(self.replacements) < self.AUTOMATON_THRESHOLD:
+            # Longest first, so that the leftmost match is also the longest
+            self._pattern = re.compile("|".join(
+                re.escape(string)
+                for string in sorted(self.replacements, key=len, reverse=True)
+            ))
+        else:
+            self._build_automaton()
+
+    def __len__(self):
+        return len(self.replacements)
+
+    def sub(self, text):
+        """
+        Replaces every leftmost-longest match in a text.
+
+        :param text: The text.
+        :type text: str
+        :returns: The text with the matches replaced.
+        :rtype: str
+        """
+        if not self.replacements or not text:
+            return text
+        if self._pattern is not None:
+            return self._pattern.sub(self._replace, text)
+
+        goto = self._goto
+        fail = self._fail
+        longest = self._longest
+        longest_at = [0] * len(text)
+        state = 0
+        for position in range(len(text) - 1, -1, -1):
+            char = text[position]
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            longest_at[position] = longest[state]
+
+        parts = []
+        start = 0
+        position = 0
+        while position < len(text):
+            length = longest_at[position]
+            if length:
+                parts.append(text[start:position])
+                parts.append(
+                    self.replacements[text[position:position + length]]
+                )
+                position += length
+                start = position
+            else:
+                position += 1
+        if not parts:
+            return text
+        parts.append(text[start:])
+        return "".join(parts)
+
+    def _replace(self, match):
+        return self.replacements[match.group(0)]
+
+    def _build_automaton(self):
+        # State 0 is the root. _longest holds, for each state, the length of
+        # the longest string that is a suffix of the state's path.
+        self._goto = [{}]
+        self._fail = [0]
+        self._longest = [0]
+        for string in self.replacements:
+            self._add(string[::-1])
+        self._link()
+
+    def _add(self, string):
+        state = 0
+        for char in string:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._longest.append(0)
+                self._goto[state][char] = next_state
+            state = next_state
+        self._longest[state] = len(string)
+
+    def _link(self):
+        # Breadth first, so that each state's failure state is linked first
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail_state = self._fail[state]
+                while fail_state and char not in self._goto[fail_state]:
+                    fail_state = self._fail[fail_state]
+                if state:
+                    self._fail[next_state] = \
+                        self._goto[fail_state].get(char, 0)
+                self._longest[next_state] = max(
+                    self._longest[next_state],
+                    self._longest[self._fail[next_state]]
+                )
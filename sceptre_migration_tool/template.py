@@ -7,14 +7,35 @@ This module imports a Sceptre Template class.
 """
 
 from six import string_types
+import hashlib
 import json
 import logging
 import os
-import yaml
+import threading
 
 from sceptre.template import Template
 from sceptre.exceptions import UnsupportedTemplateFileTypeError
+from . import cfn_yaml
+from . import process_pool
+from .atomic_file import atomic_open, ensure_dir_exists
 from .exceptions import ImportFailureError
+from .manifest import get_manifest, hash_file
+from .response_cache import get_response_cache
+
+
+_stream_templates = False
+
+
+def configure_streaming(stream_templates):
+    """
+    Enables or disables streaming mode, in which converted templates are
+    serialised straight into their files rather than into strings first.
+
+    :param stream_templates: Whether to stream converted templates.
+    :type stream_templates: bool
+    """
+    global _stream_templates
+    _stream_templates = stream_templates
 
 
 def import_template(migration_environment, aws_stack_name, template_path):
@@ -25,6 +46,9 @@ def import_template(migration_environment, aws_stack_name, template_path):
     :type path: str
     :param body: The body of the imported template.
     :type region: str or dict
+    :returns: The template, and its body as imported, parsed unless it is
+        a YAML string, so that it need not be read back from disk.
+    :rtype: tuple
     :raises: UnsupportedTemplateFileTypeError
     """
     abs_template_path = os.path.join(
@@ -38,26 +62,84 @@ def import_template(migration_environment, aws_stack_name, template_path):
         abs_template_path
     )
 
+    call_kwargs = {}
+    if get_response_cache() is not None:
+        call_kwargs['cache_version'] = _get_template_version(
+            migration_environment, aws_stack_name
+        )
     response = migration_environment.connection_manager.call(
         service='cloudformation',
         command='get_template',
         kwargs={
             'StackName': aws_stack_name,
             'TemplateStage': 'Original'
-        }
+        },
+        **call_kwargs
     )
 
-    _write_template(
-        abs_template_path,
-        _normalize_template_for_write(
-            response['TemplateBody'],
-            os.path.splitext(template_path)[1]
-        )
+    template_body = response['TemplateBody']
+    ext = os.path.splitext(template_path)[1]
+    manifest = get_manifest(
+        migration_environment.environment_config.sceptre_dir
     )
+    if _stream_templates and (
+            ext == ".json" or not isinstance(template_body, string_types)
+    ):
+        if ext == ".json" and isinstance(template_body, string_types):
+            template_body = cfn_yaml.load(template_body)
+        _stream_template(abs_template_path, template_body, ext, manifest)
+    elif _needs_conversion(template_body, ext):
+        template_body, body = _run_cpu_bound(
+            _prepare_template, template_body, template_body, ext
+        )
+        _write_template(abs_template_path, body, manifest)
+    else:
+        template_body, body = _prepare_template(template_body, ext)
+        _write_template(abs_template_path, body, manifest)
 
     template = Template(abs_template_path, [])
     template.relative_template_path = template_path
-    return template
+    return template, template_body
+
+
+# A stack's template only changes when the stack is updated, so its last
+# update time identifies the cached template that is still current. The time
+# is read from the uncached stack summaries, never from a cached description.
+def _get_template_version(migration_environment, aws_stack_name):
+    version = migration_environment.stack_inventory.get_stack_version(
+        aws_stack_name
+    )
+    if version is None:
+        # Not listed, e.g. created since; the template is not cached
+        return None
+    return version.isoformat()
+
+
+# Templates at least this long, in characters, are converted and compared in
+# the process pool, when it is enabled. Smaller ones are handled faster in
+# the calling thread than they can be sent to a worker process.
+LARGE_TEMPLATE_SIZE = 100 * 1024
+
+
+def _needs_conversion(template_body, ext):
+    # A YAML string written to a .yaml file is written as it is; sending it
+    # to a worker process would only copy it there and back
+    return not isinstance(template_body, string_types) or ext == ".json"
+
+
+def _run_cpu_bound(func, body, *args):
+    # Template bodies returned as dicts are of unknown size; they need
+    # dumping, which is slow, so are treated as large
+    if isinstance(body, string_types) and len(body) < LARGE_TEMPLATE_SIZE:
+        return func(*args)
+    return process_pool.run(func, *args)
+
+
+def _prepare_template(template_body, ext):
+    if ext == ".json" and isinstance(template_body, string_types):
+        # Parsed once here, and reused by the config writer
+        template_body = cfn_yaml.load(template_body)
+    return template_body, _normalize_template_for_write(template_body, ext)
 
 
 # If body is a string it is a YAML string;
@@ -66,14 +148,14 @@ def _normalize_template_for_write(body, ext):
     if ext == ".json":
         # if it's YAML, make it a dict
         if isinstance(body, string_types):
-            body = yaml.safe_load(body)
+            body = cfn_yaml.load(body)
         # now make it a JSON string
         body = json.dumps(body)
 
     elif ext == ".yaml":
         # if it's JSON, make it a YAML string
         if not isinstance(body, string_types):
-            body = yaml.safe_dump(body, default_flow_style=False)
+            body = cfn_yaml.dump(body)
 
     else:
         raise UnsupportedTemplateFileTypeError(
@@ -83,19 +165,127 @@ def _normalize_template_for_write(body, ext):
     return body
 
 
-def _write_template(path, body):
+# Concurrent imports may target the same template path; writes to a path
+# are serialised so that the existing-file comparison stays meaningful.
+_path_locks = {}
+_path_locks_lock = threading.Lock()
+
+
+def _get_path_lock(path):
+    with _path_locks_lock:
+        return _path_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def _write_template(path, body, manifest=None):
+    with _get_path_lock(path):
+        _write_template_unlocked(path, body, manifest)
+
+
+def _stream_template(path, data, ext, manifest=None):
+    with _get_path_lock(path):
+        _stream_template_unlocked(path, data, ext, manifest)
+
+
+def _write_template_unlocked(path, body, manifest=None):
+    if manifest is not None and manifest.is_current(path, body):
+        logging.getLogger(__name__).debug(
+            "%s - Template unchanged, not rewritten", path
+        )
+        return
     if not os.path.isfile(path):
-        if not os.path.isdir(os.path.dirname(path)):
-            os.makedirs(os.path.dirname(path))
-        with open(path, 'w') as template_file:
+        ensure_dir_exists(os.path.dirname(path))
+        with atomic_open(path) as template_file:
             template_file.write(body)
+        content = body
     else:
         with open(path, 'r') as template_file:
-            existing_body = template_file.read()
-        if yaml.load(existing_body) != yaml.load(body):
+            content = template_file.read()
+        if content != body and \
+                not _run_cpu_bound(_is_equivalent, body, content, body):
             raise ImportFailureError(
                 "Unable to import template. "
                 "File already exists and is different: "
                 "file = {}, existing_body={}, new_body={}"
-                .format(path, existing_body, body)
+                .format(path, content, body)
             )
+    if manifest is not None:
+        manifest.record(path, content, body)
+
+
+def _is_equivalent(content, body):
+    return cfn_yaml.load(content) == cfn_yaml.load(body)
+
+
+# Streaming mode serialises a parsed template straight into a temporary file
+# next to its destination, hashing it as it is written, so the converted
+# document is never held in memory as a whole. The temporary file replaces
+# the destination only if the destination is missing or different.
+def _stream_template_unlocked(path, data, ext, manifest=None):
+    if ext not in (".json", ".yaml"):
+        raise UnsupportedTemplateFileTypeError(
+                "Template file has has extension {}. Only .yaml, "
+                "and .json are supported, when importing from AWS.".format(ext)
+        )
+    ensure_dir_exists(os.path.dirname(path))
+    try:
+        with atomic_open(path, "w+") as template_file:
+            hashing_file = _HashingFile(template_file)
+            if ext == ".json":
+                json.dump(data, hashing_file)
+            else:
+                cfn_yaml.dump_stream(data, hashing_file)
+            sha256 = hashing_file.hexdigest()
+            if os.path.isfile(path):
+                _check_existing_template(
+                    path, template_file, sha256, manifest
+                )
+                # The existing file is kept
+                raise _TemplateUnchanged()
+    except _TemplateUnchanged:
+        return
+    if manifest is not None:
+        manifest.record_digest(path, sha256)
+
+
+def _check_existing_template(path, template_file, sha256, manifest):
+    if manifest is not None and manifest.is_current_digest(path, sha256):
+        logging.getLogger(__name__).debug(
+            "%s - Template unchanged, not rewritten", path
+        )
+        return
+    content_sha256 = hash_file(path)
+    if content_sha256 != sha256:
+        template_file.flush()
+        template_file.seek(0)
+        with open(path, 'r') as existing_file:
+            equivalent = cfn_yaml.load(existing_file.read()) == \
+                cfn_yaml.load(template_file.read())
+        if not equivalent:
+            raise ImportFailureError(
+                "Unable to import template. "
+                "File already exists and is different: "
+                "file = {}".format(path)
+            )
+    if manifest is not None:
+        manifest.record_digest(path, content_sha256, sha256)
+
+
+class _TemplateUnchanged(Exception):
+    pass
+
+
+class _HashingFile(object):
+    """
+    Writes to a text file, keeping the SHA-256 hash of what was written.
+    """
+
+    def __init__(self, fobj):
+        self.fobj = fobj
+        self._sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self._sha256.update(data.encode("utf-8"))
+        self.fobj.write(data)
+
+    def hexdigest(self):
+        return self._sha256.hexdigest()
@@ -11,7 +11,8 @@ with open("HISTORY.rst") as history_file:
     history = history_file.read()
 
 install_requirements = [
-    "sceptre>=1.3.0"
+    "sceptre>=1.3.0",
+    "futures>=3.1.1;python_version<'3.2'"
 ]
 
 test_requirements = [
@@ -37,7 +38,8 @@ setup(
     license='Apache2',
     url="https://github.com/cloudreach/sceptre_migration_tool",
     packages=[
-        "sceptre_migration_tool"
+        "sceptre_migration_tool",
+        "sceptre_migration_tool.reverse_resolvers"
     ],
     package_dir={
         "sceptre_migration_tool": "sceptre_migration_tool"
@@ -46,6 +48,10 @@ setup(
     entry_points="""
         [console_scripts]
         sceptre_migration_tool=sceptre_migration_tool.cli:cli
+        [sceptre_migration_tool.reverse_resolvers]
+        reverse_exports@10:table=sceptre_migration_tool.reverse_resolvers.reverse_exports:ReverseExports
+        reverse_stack_output@20:table,context=sceptre_migration_tool.reverse_resolvers.reverse_stack_output:ReverseStackOutput
+        reverse_intuit_ami@90:none=sceptre_migration_tool.reverse_resolvers.reverse_intuit_ami:ReverseIntuitAmi
     """,
     data_files=[
     ],
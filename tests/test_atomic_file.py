@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import errno
+import os
+import shutil
+import stat
+import tempfile
+
+import pytest
+
+from mock import patch
+
+from sceptre_migration_tool.atomic_file import atomic_open, ensure_dir_exists
+
+
+class TestAtomicFile(object):
+
+    def setup_method(self, test_method):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'fake-file')
+
+    def teardown_method(self, test_method):
+        shutil.rmtree(self.temp_dir)
+
+    def test_atomic_open__writes_file(self):
+        with atomic_open(self.path) as fobj:
+            fobj.write('fake-body')
+        with open(self.path) as fobj:
+            assert 'fake-body' == fobj.read()
+        assert ['fake-file'] == os.listdir(self.temp_dir)
+
+    def test_atomic_open__replaces_file(self):
+        with open(self.path, 'w') as fobj:
+            fobj.write('old-body')
+        with atomic_open(self.path) as fobj:
+            fobj.write('new-body')
+        with open(self.path) as fobj:
+            assert 'new-body' == fobj.read()
+
+    def test_atomic_open__error_leaves_file_untouched(self):
+        with open(self.path, 'w') as fobj:
+            fobj.write('old-body')
+        with pytest.raises(KeyboardInterrupt):
+            with atomic_open(self.path) as fobj:
+                fobj.write('partial-')
+                raise KeyboardInterrupt()
+        with open(self.path) as fobj:
+            assert 'old-body' == fobj.read()
+        assert ['fake-file'] == os.listdir(self.temp_dir)
+
+    def test_atomic_open__default_permissions(self):
+        with atomic_open(self.path) as fobj:
+            fobj.write('fake-body')
+        umask = os.umask(0)
+        os.umask(umask)
+        assert 0o666 & ~umask == stat.S_IMODE(os.stat(self.path).st_mode)
+
+    def test_atomic_open__permissions(self):
+        with atomic_open(self.path, permissions=0o600) as fobj:
+            fobj.write('fake-body')
+        assert 0o600 == stat.S_IMODE(os.stat(self.path).st_mode)
+
+    def test_ensure_dir_exists__creates(self):
+        directory = os.path.join(self.temp_dir, 'parent', 'child')
+        assert ensure_dir_exists(directory, 0o700)
+        assert os.path.isdir(directory)
+        assert 0o700 == stat.S_IMODE(os.stat(directory).st_mode)
+
+    def test_ensure_dir_exists__existing_untouched(self):
+        os.chmod(self.temp_dir, 0o755)
+        assert not ensure_dir_exists(self.temp_dir, 0o700)
+        assert 0o755 == stat.S_IMODE(os.stat(self.temp_dir).st_mode)
+
+    def test_ensure_dir_exists__created_concurrently(self):
+        directory = os.path.join(self.temp_dir, 'child')
+
+        def makedirs(path, *args):
+            os.mkdir(path)
+            raise OSError(errno.EEXIST, 'File exists')
+        with patch('os.makedirs', side_effect=makedirs):
+            assert not ensure_dir_exists(directory)
+        assert os.path.isdir(directory)
+
+    def test_ensure_dir_exists__error(self):
+        path = os.path.join(self.temp_dir, 'fake-file')
+        with open(path, 'w'):
+            pass
+        with pytest.raises(OSError):
+            ensure_dir_exists(os.path.join(path, 'child'))
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+import os
+import shutil
+import tempfile
+
+from botocore.exceptions import ClientError
+import pytest
+
+from sceptre_migration_tool import cassette
+from sceptre_migration_tool.cassette import Cassette
+from sceptre_migration_tool.exceptions import CassetteMismatchError
+
+
+class TestCassette(object):
+
+    def setup_method(self, test_method):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'cassette.jsonl')
+        self.key = (
+            'fake-region', 'fake-profile', None,
+            'cloudformation', 'describe_stacks', {'StackName': 'fake-stack'}
+        )
+
+    def teardown_method(self, test_method):
+        shutil.rmtree(self.temp_dir)
+
+    def test_record_then_play(self):
+        response = {
+            'Stacks': [{
+                'StackName': 'fake-stack',
+                'CreationTime': datetime(2017, 1, 2, 3, 4, 5)
+            }]
+        }
+        Cassette(self.path, cassette.RECORD).record(self.key, response)
+        replaying = Cassette(self.path, cassette.REPLAY)
+        assert replaying.is_replaying
+        assert response == replaying.play(self.key)
+
+    def test_play__identical_calls_in_recorded_order(self):
+        recording = Cassette(self.path, cassette.RECORD)
+        recording.record(self.key, {'call': 1})
+        recording.record(self.key, {'call': 2})
+        replaying = Cassette(self.path, cassette.REPLAY)
+        assert {'call': 1} == replaying.play(self.key)
+        assert {'call': 2} == replaying.play(self.key)
+        with pytest.raises(CassetteMismatchError):
+            replaying.play(self.key)
+
+    def test_play__error(self):
+        error = ClientError(
+            {'Error': {'Code': 'ValidationError', 'Message': 'fake'}},
+            'DescribeStacks'
+        )
+        Cassette(self.path, cassette.RECORD).record(self.key, error=error)
+        with pytest.raises(ClientError) as excinfo:
+            Cassette(self.path, cassette.REPLAY).play(self.key)
+        assert 'ValidationError' == \
+            excinfo.value.response['Error']['Code']
+        assert 'DescribeStacks' == excinfo.value.operation_name
+
+    def test_play__not_recorded(self):
+        Cassette(self.path, cassette.RECORD)
+        with pytest.raises(CassetteMismatchError):
+            Cassette(self.path, cassette.REPLAY).play(self.key)
+
+    def test_record__truncates_existing_cassette(self):
+        Cassette(self.path, cassette.RECORD).record(self.key, {'call': 1})
+        Cassette(self.path, cassette.RECORD)
+        with pytest.raises(CassetteMismatchError):
+            Cassette(self.path, cassette.REPLAY).play(self.key)
+
+    def test_configure(self):
+        try:
+            cassette.configure(self.path, cassette.RECORD)
+            assert self.path == cassette.get_cassette().path
+            assert not cassette.get_cassette().is_replaying
+        finally:
+            cassette._cassette = None
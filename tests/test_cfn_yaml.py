@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+import datetime
+import io
+
+import yaml
+
+from sceptre_migration_tool import cfn_yaml
+
+
+class TestCfnYaml(object):
+
+    def test_load__short_form_tags(self):
+        body = (
+            'Ref: !Ref Parameter\n'
+            'Condition: !Condition IsProd\n'
+            'GetAtt: !GetAtt Stack.Outputs.Arn\n'
+            'GetAttList: !GetAtt [Resource, Arn]\n'
+            'Sub: !Sub "${AWS::Region}-name"\n'
+            'Join: !Join [",", [a, !Ref B]]\n'
+            'If: !If [IsProd, {Key: Value}, !Ref AWS::NoValue]\n'
+        )
+        assert {
+            'Ref': {'Ref': 'Parameter'},
+            'Condition': {'Condition': 'IsProd'},
+            'GetAtt': {'Fn::GetAtt': ['Stack', 'Outputs.Arn']},
+            'GetAttList': {'Fn::GetAtt': ['Resource', 'Arn']},
+            'Sub': {'Fn::Sub': '${AWS::Region}-name'},
+            'Join': {'Fn::Join': [',', ['a', {'Ref': 'B'}]]},
+            'If': {'Fn::If': [
+                'IsProd', {'Key': 'Value'}, {'Ref': 'AWS::NoValue'}
+            ]}
+        } == cfn_yaml.load(body)
+
+    def test_load__json(self):
+        assert {'Key': ['Value']} == cfn_yaml.load(' {"Key": ["Value"]}')
+
+    def test_load__flow_mapping(self):
+        assert {'Key': 'Value'} == cfn_yaml.load('{Key: Value}')
+
+    def test_load__bytes(self):
+        assert {'Key': 'Value'} == cfn_yaml.load(b'Key: Value\n')
+
+    def test_load__does_not_change_global_loaders(self):
+        cfn_yaml.load('Key: !Ref Value\n')
+        assert '!' not in yaml.SafeLoader.yaml_multi_constructors
+        assert '!' not in yaml.Loader.yaml_multi_constructors
+
+    def test_dump__ordered_dict(self):
+        assert 'B: 1\nA:\n- x\n' == \
+            cfn_yaml.dump(OrderedDict([('B', 1), ('A', ['x'])]))
+
+    def test_dump_then_load(self):
+        data = {'Resources': {'Queue': {'Type': 'AWS::SQS::Queue'}}}
+        assert data == cfn_yaml.load(cfn_yaml.dump(data))
+
+    def test_dump_stream__same_as_dump(self):
+        data = {
+            'B': OrderedDict([('Z', {}), ('Y', [])]),
+            'A': [
+                None, True, 1, 1.5, '123', 'yes', 'a: b', '', 'multi\nline',
+                u'ünï', datetime.date(2017, 1, 1),
+                {'Ref': 'Parameter'}
+            ]
+        }
+        stream = io.StringIO()
+        cfn_yaml.dump_stream(data, stream)
+        assert cfn_yaml.dump(data) == stream.getvalue()
+
+    def test_dump_stream__scalar(self):
+        stream = io.StringIO()
+        cfn_yaml.dump_stream('value', stream)
+        assert cfn_yaml.dump('value') == stream.getvalue()
@@ -1,9 +1,12 @@
 
 import logging
 import os
+import subprocess
+import sys
 
 from click.testing import CliRunner
 from mock import patch, sentinel
+import pytest
 
 from sceptre_migration_tool import cli
 
@@ -33,7 +36,7 @@ class TestCli(object):
 
     @patch("sceptre_migration_tool.migrator.import_stack")
     @patch("sceptre_migration_tool.cli.os.getcwd")
-    @patch("sceptre_migration_tool.cli.Environment")
+    @patch("sceptre.environment.Environment")
     def test_import_stack_default_template_dir(
             self, mock_env, mock_getcwd, mock_import_stack
     ):
@@ -62,7 +65,7 @@ class TestCli(object):
 
     @patch("sceptre_migration_tool.migrator.import_stack")
     @patch("sceptre_migration_tool.cli.os.getcwd")
-    @patch("sceptre_migration_tool.cli.Environment")
+    @patch("sceptre.environment.Environment")
     def test_import_stack_user_template_dir(
             self, mock_env, mock_getcwd, mock_import_stack
     ):
@@ -91,7 +94,7 @@ class TestCli(object):
 
     @patch("sceptre_migration_tool.migrator.import_env")
     @patch("sceptre_migration_tool.cli.os.getcwd")
-    @patch("sceptre_migration_tool.cli.Environment")
+    @patch("sceptre.environment.Environment")
     def test_import_env(
             self, mock_env, mock_getcwd, mock_import_env
     ):
@@ -104,10 +107,46 @@ class TestCli(object):
             options={}
         )
         mock_import_env.assert_called_with(
-            mock_env.return_value
+            mock_env.return_value,
+            1,
+            False
+        )
+
+    @patch("sceptre_migration_tool.migrator.import_env")
+    @patch("sceptre_migration_tool.cli.os.getcwd")
+    @patch("sceptre.environment.Environment")
+    def test_import_env__jobs(
+            self, mock_env, mock_getcwd, mock_import_env
+    ):
+        mock_getcwd.return_value = sentinel.cwd
+        result = self.runner.invoke(
+            cli.cli, ["import-env", "--jobs", "8", "dev"]
+        )
+        assert 0 == result.exit_code
+        mock_import_env.assert_called_with(
+            mock_env.return_value,
+            8,
+            False
+        )
+
+    @patch("sceptre_migration_tool.migrator.import_env")
+    @patch("sceptre_migration_tool.cli.os.getcwd")
+    @patch("sceptre.environment.Environment")
+    def test_import_env__resume(
+            self, mock_env, mock_getcwd, mock_import_env
+    ):
+        mock_getcwd.return_value = sentinel.cwd
+        result = self.runner.invoke(
+            cli.cli, ["import-env", "--resume", "dev"]
+        )
+        assert 0 == result.exit_code
+        mock_import_env.assert_called_with(
+            mock_env.return_value,
+            1,
+            True
         )
 
-    @patch("sceptre_migration_tool.cli.migrator.import_list")
+    @patch("sceptre_migration_tool.migrator.import_list")
     @patch("sceptre_migration_tool.cli.open")
     @patch("sceptre_migration_tool.cli.os.getcwd")
     def test_import_list(
@@ -121,12 +160,67 @@ class TestCli(object):
         mock_import_list.assert_called_once_with(
             sentinel.cwd,
             {},
-            mock_open.return_value.__enter__.return_value
+            mock_open.return_value.__enter__.return_value,
+            1,
+            False
         )
 
-    @patch("sceptre_migration_tool.cli.migrator.generate_import_list")
+    @patch("sceptre_migration_tool.migrator.import_list")
     @patch("sceptre_migration_tool.cli.open")
-    @patch("sceptre_migration_tool.cli.Environment")
+    @patch("sceptre_migration_tool.cli.os.getcwd")
+    def test_import_list__jobs(
+            self, mock_getcwd, mock_open, mock_import_list
+    ):
+        mock_getcwd.return_value = sentinel.cwd
+        result = self.runner.invoke(cli.cli, [
+            "import-list", "--list-path", "fake-list-path", "--jobs", "4"
+        ])
+        assert 0 == result.exit_code
+        mock_import_list.assert_called_once_with(
+            sentinel.cwd,
+            {},
+            mock_open.return_value.__enter__.return_value,
+            4,
+            False
+        )
+
+    @patch("sceptre_migration_tool.migrator.import_list")
+    @patch("sceptre_migration_tool.cli.open")
+    @patch("sceptre_migration_tool.cli.os.getcwd")
+    def test_import_list__resume(
+            self, mock_getcwd, mock_open, mock_import_list
+    ):
+        mock_getcwd.return_value = sentinel.cwd
+        result = self.runner.invoke(cli.cli, [
+            "import-list", "--list-path", "fake-list-path", "--resume"
+        ])
+        assert 0 == result.exit_code
+        mock_import_list.assert_called_once_with(
+            sentinel.cwd,
+            {},
+            mock_open.return_value.__enter__.return_value,
+            1,
+            True
+        )
+
+    @patch("sceptre_migration_tool.migrator.import_list")
+    @patch("sceptre_migration_tool.cli.open")
+    @patch("sceptre_migration_tool.cli.os.getcwd")
+    def test_import_list__stdin(
+            self, mock_getcwd, mock_open, mock_import_list
+    ):
+        mock_getcwd.return_value = sentinel.cwd
+        result = self.runner.invoke(cli.cli, [
+            "import-list", "--list-path", "-"
+        ], input="dev vpc fake-aws-stack\n")
+        assert 0 == result.exit_code
+        mock_open.assert_not_called()
+        list_fobj = mock_import_list.call_args[0][2]
+        assert list_fobj.readlines() == ["dev vpc fake-aws-stack\n"]
+
+    @patch("sceptre_migration_tool.migrator.generate_import_list")
+    @patch("sceptre_migration_tool.cli.open")
+    @patch("sceptre.environment.Environment")
     @patch("sceptre_migration_tool.cli.os.getcwd")
     def test_generate_import_list(
             self, mock_getcwd, mock_import_env,
@@ -142,9 +236,9 @@ class TestCli(object):
             mock_open.return_value.__enter__.return_value
         )
 
-    @patch("sceptre_migration_tool.cli.migrator.generate_import_list")
+    @patch("sceptre_migration_tool.migrator.generate_import_list")
     @patch("sceptre_migration_tool.cli.open")
-    @patch("sceptre_migration_tool.cli.Environment")
+    @patch("sceptre.environment.Environment")
     @patch("sceptre_migration_tool.cli.os.getcwd")
     def test_generate_import_list__to_stdout(
             self, mock_getcwd, mock_import_env,
@@ -157,3 +251,71 @@ class TestCli(object):
         assert 0 == result.exit_code
         mock_open.assert_not_called()
         mock_generate_import_list.assert_called_once()
+
+    @patch("sceptre_migration_tool.migrator.generate_project_import_list")
+    @patch("sceptre_migration_tool.cli.open")
+    @patch("sceptre_migration_tool.cli.os.getcwd")
+    def test_generate_project_import_list(
+            self, mock_getcwd, mock_open, mock_generate_project_import_list
+    ):
+        mock_getcwd.return_value = sentinel.cwd
+        result = self.runner.invoke(cli.cli, [
+            "generate-project-import-list", "--list-path", "fake-list-path",
+            "--jobs", "4"
+        ])
+        assert 0 == result.exit_code
+        mock_generate_project_import_list.assert_called_once_with(
+            sentinel.cwd,
+            {},
+            mock_open.return_value.__enter__.return_value,
+            4
+        )
+
+    def test_generate_project_import_list__help(self):
+        result = self.runner.invoke(cli.cli, [
+            "generate-project-import-list", "--help"
+        ])
+        assert 0 == result.exit_code
+        # Stacks of a shared account go under the first environment only
+        assert "under the first of the environments" in \
+            " ".join(result.output.split())
+
+
+class TestCliStartup(object):
+
+    # The agreed budget for importing the CLI module, in microseconds
+    IMPORT_TIME_BUDGET = 150000
+
+    HEAVY_MODULES = ("boto3", "botocore", "sceptre", "yaml", "colorama")
+
+    @pytest.mark.skipif(
+        sys.version_info < (3, 7), reason="-X importtime needs Python 3.7"
+    )
+    def test_import_time(self):
+        env = dict(os.environ)
+        repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env["PYTHONPATH"] = os.pathsep.join(
+            path for path in (repo_dir, env.get("PYTHONPATH")) if path
+        )
+        output = subprocess.check_output(
+            [
+                sys.executable, "-X", "importtime",
+                "-c", "import sceptre_migration_tool.cli"
+            ],
+            stderr=subprocess.STDOUT,
+            env=env
+        ).decode("utf-8")
+
+        imports = {}
+        for line in output.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, cumulative, module = line.split("|")
+                if cumulative.strip().isdigit():
+                    imports[module.strip()] = int(cumulative)
+        heavy_imports = [
+            module for module in imports
+            if module.split(".")[0] in self.HEAVY_MODULES
+        ]
+        assert heavy_imports == []
+        assert imports["sceptre_migration_tool.cli"] < \
+            self.IMPORT_TIME_BUDGET
@@ -4,6 +4,7 @@ from contextlib import contextmanager
 from tempfile import mkdtemp
 import shutil
 import json
+import os
 from mock import patch, Mock, call
 import pytest
 
@@ -12,6 +13,7 @@ from sceptre.template import Template
 
 from sceptre_migration_tool import config
 from sceptre_migration_tool.exceptions import ImportFailureError
+from sceptre_migration_tool.manifest import Manifest
 from sceptre_migration_tool.migration_environment import MigrationEnvironment
 
 
@@ -49,11 +51,14 @@ class TestConfig(object):
                 template=Template('fake-path', [])
             )
 
+    @patch("sceptre_migration_tool.config._write_config")
+    @patch("sceptre_migration_tool.config.get_manifest")
     @patch("sceptre_migration_tool.config.print")
-    @patch("sceptre_migration_tool.config.open")
+    @patch("sceptre_migration_tool.config.StringIO")
     @patch("sceptre_migration_tool.config.os.path.isfile")
     def test_import_config__empty_stack(
-        self, mock_isfile, mock_open, mock_print
+        self, mock_isfile, mock_string_io, mock_print,
+        mock_get_manifest, mock_write_config
     ):
         self.migration_environment.connection_manager\
             .call.return_value = {'Stacks': [
@@ -72,35 +77,40 @@ class TestConfig(object):
 
         )
 
-        mock_open.assert_called_with(
+        mock_get_manifest.assert_called_once_with('fake-spectre-dir')
+        mock_write_config.assert_called_once_with(
             "fake-spectre-dir/config/environment-path/fake-stack.yaml",
-            'w'
+            mock_string_io.return_value.getvalue.return_value,
+            mock_get_manifest.return_value
         )
 
         mock_print.assert_has_calls(
             [
                 call(
                     "template_path: fake-relative-path",
-                    file=mock_open.return_value.__enter__.return_value
+                    file=mock_string_io.return_value
                 ),
                 call(
                     "stack_name: fake-aws-stack-name",
-                    file=mock_open.return_value.__enter__.return_value
+                    file=mock_string_io.return_value
                 )
             ],
             any_order=False
         )
 
+    @patch("sceptre_migration_tool.config._write_config")
+    @patch("sceptre_migration_tool.config.get_manifest")
     @patch("sceptre_migration_tool.config.print")
-    @patch("sceptre_migration_tool.config.open")
+    @patch("sceptre_migration_tool.config.StringIO")
     @patch("sceptre_migration_tool.config.os.path.isfile")
     def test_import_config__all_details_stack(
-        self, mock_isfile, mock_open, mock_print
+        self, mock_isfile, mock_string_io, mock_print,
+        mock_get_manifest, mock_write_config
     ):
         mock_template = Mock()
         mock_template.path = 'fake-path'
         mock_template.relative_template_path = 'fake-relative-path.yaml'
-        mock_template.body = json.dumps({
+        fake_template_body = {
             'Parameters': {
                 'fake-key1': {
                 },
@@ -113,7 +123,7 @@ class TestConfig(object):
                 'fake-key4': {
                 }
             }
-        })
+        }
         self.migration_environment.connection_manager\
             .call.return_value = {'Stacks': [
                 {
@@ -151,56 +161,105 @@ class TestConfig(object):
             migration_environment=self.migration_environment,
             aws_stack_name="fake-aws-stack-name",
             config_path="environment-path/fake-stack",
-            template=mock_template
+            template=mock_template,
+            template_body=fake_template_body
         )
 
         expected_calls = [
             call(
                 "template_path: fake-relative-path.yaml",
-                file=mock_open.return_value.__enter__.return_value
+                file=mock_string_io.return_value
             ),
             call(
                 "stack_name: fake-aws-stack-name",
-                file=mock_open.return_value.__enter__.return_value
+                file=mock_string_io.return_value
             ),
             call(
                 "protect: True",
-                file=mock_open.return_value.__enter__.return_value
+                file=mock_string_io.return_value
             ),
             call(
                 "role_arn: fake-role-arn",
-                file=mock_open.return_value.__enter__.return_value
+                file=mock_string_io.return_value
             ),
             call(
                 "parameters:",
-                file=mock_open.return_value.__enter__.return_value
+                file=mock_string_io.return_value
             ),
             call(
                 "  fake-key1: 'no-default-value'",
-                file=mock_open.return_value.__enter__.return_value
+                file=mock_string_io.return_value
             ),
             call(
                 "  fake-key2: 'mismatch-default-value'",
-                file=mock_open.return_value.__enter__.return_value
+                file=mock_string_io.return_value
             ),
             call(
                 "  #fake-key3: 'match-default-value'",
-                file=mock_open.return_value.__enter__.return_value
+                file=mock_string_io.return_value
             ),
             call(
                 "  fake-key4: '!Ref ref-value'",
-                file=mock_open.return_value.__enter__.return_value
+                file=mock_string_io.return_value
             ),
             call(
                 "stack_tags:",
-                file=mock_open.return_value.__enter__.return_value
+                file=mock_string_io.return_value
             ),
             call(
                 "  \"fake-tag-key\": \"fake-tag-value\"",
-                file=mock_open.return_value.__enter__.return_value
+                file=mock_string_io.return_value
             )
         ]
         mock_print.assert_has_calls(
             expected_calls,
             any_order=False
         )
+
+    def test__write_config__identical_config_not_rewritten(self):
+        with self._create_temp_dir() as temp_dir:
+            path = os.path.join(temp_dir, 'fake-stack.yaml')
+            fake_manifest = Manifest(
+                os.path.join(temp_dir, '.migration-manifest')
+            )
+            config._write_config(path, 'stack_name: fake\n', fake_manifest)
+            with open(path) as config_fobj:
+                assert 'stack_name: fake\n' == config_fobj.read()
+            with patch("sceptre_migration_tool.config.atomic_open") \
+                    as mock_atomic_open:
+                config._write_config(
+                    path, 'stack_name: fake\n', fake_manifest
+                )
+            mock_atomic_open.assert_not_called()
+
+    def test__write_config__changed_config_rewritten(self):
+        with self._create_temp_dir() as temp_dir:
+            path = os.path.join(temp_dir, 'fake-stack.yaml')
+            fake_manifest = Manifest(
+                os.path.join(temp_dir, '.migration-manifest')
+            )
+            config._write_config(path, 'stack_name: old\n', fake_manifest)
+            config._write_config(path, 'stack_name: new\n', fake_manifest)
+            with open(path) as config_fobj:
+                assert 'stack_name: new\n' == config_fobj.read()
+
+    def test__get_template_parameters__imported_yaml_body(self):
+        mock_template = Mock()
+        self.migration_environment.set_resolution_context(
+            'fake-config-path', 'fake-stack', {}, mock_template
+        )
+        writer = config.ConfigFileWriter(
+            Mock(), self.migration_environment,
+            'Parameters:\n  Key:\n    Default: !Ref Value\n'
+        )
+        assert {'Key': {'Default': {'Ref': 'Value'}}} == \
+            writer._get_template_parameters()
+
+    def test__get_template_parameters__reads_template_without_body(self):
+        mock_template = Mock()
+        mock_template.body = json.dumps({'Parameters': {'Key': {}}})
+        self.migration_environment.set_resolution_context(
+            'fake-config-path', 'fake-stack', {}, mock_template
+        )
+        writer = config.ConfigFileWriter(Mock(), self.migration_environment)
+        assert {'Key': {}} == writer._get_template_parameters()
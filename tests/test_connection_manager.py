@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+
+from botocore.exceptions import ClientError
+from dateutil.tz import tzutc
+import pytest
+from mock import patch, Mock, PropertyMock, sentinel
+
+from sceptre.exceptions import RetryLimitExceededError
+
+from sceptre_migration_tool import connection_manager
+from sceptre_migration_tool.connection_manager import ConnectionManager, \
+    configure_pool, get_connection_manager, DEFAULT_MAX_POOL_CONNECTIONS
+
+
+class TestConnectionManager(object):
+
+    def setup_method(self, test_method):
+        self.connection_manager = ConnectionManager(
+            region='fake-region',
+            iam_role=None,
+            profile='fake-profile'
+        )
+        self.mock_client = Mock()
+        self.connection_manager._get_client = Mock(
+            return_value=self.mock_client
+        )
+
+    @staticmethod
+    def _client_error(code):
+        return ClientError(
+            {'Error': {'Code': code, 'Message': 'fake-message'}},
+            'fake-operation'
+        )
+
+    @patch("sceptre_migration_tool.connection_manager.get_rate_limiter")
+    def test_call__success(self, mock_get_rate_limiter):
+        self.mock_client.describe_stacks.return_value = sentinel.response
+        result = self.connection_manager.call(
+            'cloudformation', 'describe_stacks', {'StackName': 'fake-stack'}
+        )
+        assert result == sentinel.response
+        self.mock_client.describe_stacks.assert_called_once_with(
+            StackName='fake-stack'
+        )
+        mock_get_rate_limiter.assert_called_once_with(
+            'fake-region', 'fake-profile', None, 'cloudformation'
+        )
+        mock_rate_limiter = mock_get_rate_limiter.return_value
+        mock_rate_limiter.acquire.assert_called_once_with()
+        mock_rate_limiter.succeeded.assert_called_once_with()
+        mock_rate_limiter.throttled.assert_not_called()
+
+    @patch("sceptre_migration_tool.connection_manager.get_rate_limiter")
+    def test_call__throttled_then_success(self, mock_get_rate_limiter):
+        self.mock_client.list_exports.side_effect = [
+            self._client_error('Throttling'),
+            sentinel.response
+        ]
+        result = self.connection_manager.call(
+            'cloudformation', 'list_exports'
+        )
+        assert result == sentinel.response
+        mock_rate_limiter = mock_get_rate_limiter.return_value
+        assert 2 == mock_rate_limiter.acquire.call_count
+        mock_rate_limiter.throttled.assert_called_once_with()
+        mock_rate_limiter.succeeded.assert_called_once_with()
+
+    @patch("sceptre_migration_tool.connection_manager.get_rate_limiter")
+    def test_call__other_error(self, mock_get_rate_limiter):
+        self.mock_client.list_exports.side_effect = \
+            self._client_error('ValidationError')
+        with pytest.raises(ClientError):
+            self.connection_manager.call('cloudformation', 'list_exports')
+        mock_get_rate_limiter.return_value.throttled.assert_not_called()
+
+    @patch("sceptre_migration_tool.connection_manager.get_rate_limiter")
+    def test_call__retry_limit(self, mock_get_rate_limiter):
+        self.mock_client.list_exports.side_effect = \
+            self._client_error('Throttling')
+        with pytest.raises(RetryLimitExceededError):
+            self.connection_manager.call('cloudformation', 'list_exports')
+        assert ConnectionManager.MAX_RETRIES == \
+            mock_get_rate_limiter.return_value.throttled.call_count
+
+    @patch("sceptre_migration_tool.connection_manager.get_response_cache")
+    @patch("sceptre_migration_tool.connection_manager.get_rate_limiter")
+    def test_call__cache_hit(self, mock_get_rate_limiter, mock_get_cache):
+        mock_cache = mock_get_cache.return_value
+        mock_cache.get.return_value = sentinel.cached_response
+        result = self.connection_manager.call(
+            'cloudformation', 'describe_stacks', {'StackName': 'fake-stack'}
+        )
+        assert result == sentinel.cached_response
+        mock_cache.get.assert_called_once_with(
+            (
+                'fake-region', 'fake-profile', None, 'cloudformation',
+                'describe_stacks', {'StackName': 'fake-stack'}
+            ),
+            None
+        )
+        self.mock_client.describe_stacks.assert_not_called()
+        mock_cache.put.assert_not_called()
+
+    @patch("sceptre_migration_tool.connection_manager.get_response_cache")
+    @patch("sceptre_migration_tool.connection_manager.get_rate_limiter")
+    def test_call__cache_miss(self, mock_get_rate_limiter, mock_get_cache):
+        mock_cache = mock_get_cache.return_value
+        mock_cache.get.return_value = None
+        self.mock_client.get_template.return_value = sentinel.response
+        result = self.connection_manager.call(
+            'cloudformation', 'get_template', {'StackName': 'fake-stack'},
+            cache_version='fake-version'
+        )
+        assert result == sentinel.response
+        mock_cache.put.assert_called_once_with(
+            (
+                'fake-region', 'fake-profile', None, 'cloudformation',
+                'get_template', {'StackName': 'fake-stack'}
+            ),
+            sentinel.response,
+            'fake-version'
+        )
+
+    @patch("sceptre_migration_tool.connection_manager.get_response_cache")
+    @patch("sceptre_migration_tool.connection_manager.get_rate_limiter")
+    def test_call__not_cached(self, mock_get_rate_limiter, mock_get_cache):
+        self.mock_client.get_template.return_value = sentinel.response
+        self.mock_client.create_stack.return_value = sentinel.response
+        self.connection_manager.call(
+            'cloudformation', 'get_template', {'StackName': 'fake-stack'}
+        )
+        self.connection_manager.call('cloudformation', 'create_stack')
+        mock_get_cache.return_value.get.assert_not_called()
+        mock_get_cache.return_value.put.assert_not_called()
+
+    @patch("sceptre_migration_tool.connection_manager.get_cassette")
+    @patch("sceptre_migration_tool.connection_manager.get_rate_limiter")
+    def test_call__recording(self, mock_get_rate_limiter, mock_get_cassette):
+        mock_cassette = mock_get_cassette.return_value
+        mock_cassette.is_replaying = False
+        self.mock_client.describe_stacks.return_value = sentinel.response
+        result = self.connection_manager.call(
+            'cloudformation', 'describe_stacks', {'StackName': 'fake-stack'}
+        )
+        assert result == sentinel.response
+        mock_cassette.record.assert_called_once_with(
+            (
+                'fake-region', 'fake-profile', None, 'cloudformation',
+                'describe_stacks', {'StackName': 'fake-stack'}
+            ),
+            sentinel.response
+        )
+
+    @patch("sceptre_migration_tool.connection_manager.get_cassette")
+    @patch("sceptre_migration_tool.connection_manager.get_rate_limiter")
+    def test_call__recording_error(
+            self, mock_get_rate_limiter, mock_get_cassette):
+        mock_cassette = mock_get_cassette.return_value
+        mock_cassette.is_replaying = False
+        error = self._client_error('ValidationError')
+        self.mock_client.describe_stacks.side_effect = error
+        with pytest.raises(ClientError):
+            self.connection_manager.call('cloudformation', 'describe_stacks')
+        mock_cassette.record.assert_called_once_with(
+            (
+                'fake-region', 'fake-profile', None, 'cloudformation',
+                'describe_stacks', {}
+            ),
+            error=error
+        )
+
+    @patch("sceptre_migration_tool.connection_manager.get_cassette")
+    @patch("sceptre_migration_tool.connection_manager.get_rate_limiter")
+    def test_call__replaying(self, mock_get_rate_limiter, mock_get_cassette):
+        mock_cassette = mock_get_cassette.return_value
+        mock_cassette.is_replaying = True
+        mock_cassette.play.return_value = sentinel.recorded_response
+        result = self.connection_manager.call(
+            'cloudformation', 'describe_stacks'
+        )
+        assert result == sentinel.recorded_response
+        self.connection_manager._get_client.assert_not_called()
+        mock_get_rate_limiter.assert_not_called()
+
+
+class TestConnectionManager_get_client(object):
+
+    def setup_method(self, test_method):
+        self.connection_manager = ConnectionManager(
+            region='fake-region',
+            iam_role=None,
+            profile='fake-profile'
+        )
+
+    def teardown_method(self, test_method):
+        configure_pool(DEFAULT_MAX_POOL_CONNECTIONS)
+
+    def test_locks_per_instance(self):
+        other_connection_manager = ConnectionManager(region='fake-region')
+        assert self.connection_manager._session_lock is not \
+            other_connection_manager._session_lock
+        assert self.connection_manager._client_lock is not \
+            other_connection_manager._client_lock
+
+    @patch("sceptre_migration_tool.connection_manager.ConnectionManager"
+           ".boto_session")
+    def test_get_client__pool_sized_and_reused(self, mock_boto_session):
+        configure_pool(32)
+        result = self.connection_manager._get_client('cloudformation')
+        self.connection_manager._get_client('cloudformation')
+        assert result == mock_boto_session.client.return_value
+        mock_boto_session.client.assert_called_once()
+        args, kwargs = mock_boto_session.client.call_args
+        assert args == ('cloudformation',)
+        assert kwargs['config'].max_pool_connections == 32
+
+    @patch("sceptre_migration_tool.connection_manager.ConnectionManager"
+           ".boto_session")
+    def test_get_client__pool_never_below_default(self, mock_boto_session):
+        configure_pool(1)
+        self.connection_manager._get_client('cloudformation')
+        _, kwargs = mock_boto_session.client.call_args
+        assert kwargs['config'].max_pool_connections == \
+            DEFAULT_MAX_POOL_CONNECTIONS
+
+
+class TestConnectionManager_boto_session(object):
+
+    def setup_method(self, test_method):
+        self.connection_manager = ConnectionManager(
+            region='fake-region',
+            iam_role='arn:aws:iam::123456789012:role/fake-role',
+            profile='fake-profile'
+        )
+        self.credentials = {
+            'AccessKeyId': 'fake-access-key-id',
+            'SecretAccessKey': 'fake-secret-access-key',
+            'SessionToken': 'fake-session-token',
+            'Expiration': datetime(2030, 1, 1, tzinfo=tzutc())
+        }
+
+    @patch("sceptre_migration_tool.connection_manager.boto3.session.Session")
+    @patch("sceptre_migration_tool.connection_manager.get_credential_cache")
+    def test_boto_session__cached_credentials(
+            self, mock_get_credential_cache, mock_Session
+    ):
+        mock_get_credential_cache.return_value.get.return_value = \
+            self.credentials
+        result = self.connection_manager.boto_session
+        assert result == mock_Session.return_value
+        mock_Session.assert_called_once_with(
+            aws_access_key_id='fake-access-key-id',
+            aws_secret_access_key='fake-secret-access-key',
+            aws_session_token='fake-session-token',
+            region_name='fake-region'
+        )
+        mock_get_credential_cache.return_value.put.assert_not_called()
+        assert self.connection_manager._boto_session_expiration == \
+            datetime(2029, 12, 31, 23, 55, tzinfo=tzutc())
+
+    @patch("sceptre_migration_tool.connection_manager.boto3.session.Session")
+    @patch("sceptre_migration_tool.connection_manager.get_credential_cache")
+    def test_boto_session__assumes_and_caches(
+            self, mock_get_credential_cache, mock_Session
+    ):
+        mock_cache = mock_get_credential_cache.return_value
+        mock_cache.get.return_value = None
+        mock_sts_client = mock_Session.return_value.client.return_value
+        mock_sts_client.assume_role.return_value = {
+            'Credentials': self.credentials
+        }
+        self.connection_manager.boto_session
+        self.connection_manager.boto_session
+        mock_sts_client.assume_role.assert_called_once_with(
+            RoleArn='arn:aws:iam::123456789012:role/fake-role',
+            RoleSessionName='fake-role-session'
+        )
+        mock_cache.put.assert_called_once_with(
+            'fake-profile',
+            'arn:aws:iam::123456789012:role/fake-role',
+            self.credentials
+        )
+
+    @patch("sceptre.connection_manager.ConnectionManager.boto_session",
+           new_callable=PropertyMock)
+    @patch("sceptre_migration_tool.connection_manager.get_credential_cache")
+    def test_boto_session__cache_disabled(
+            self, mock_get_credential_cache, mock_boto_session
+    ):
+        mock_get_credential_cache.return_value = None
+        assert self.connection_manager.boto_session == \
+            mock_boto_session.return_value
+
+
+class TestGetConnectionManager(object):
+
+    def setup_method(self, test_method):
+        connection_manager.connection_managers.clear()
+
+    def test_shared_by_region_profile_and_role(self):
+        result1 = get_connection_manager('fake-region', 'fake-profile', None)
+        result2 = get_connection_manager('fake-region', 'fake-profile', None)
+        result3 = get_connection_manager('fake-region', 'other-profile', None)
+        assert result1 is result2
+        assert result1 is not result3
+        assert result1.region == 'fake-region'
+        assert result1.profile == 'fake-profile'
+        assert result1.iam_role is None
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime, timedelta
+import os
+import shutil
+import stat
+import tempfile
+
+from dateutil.tz import tzutc
+
+from sceptre_migration_tool import credential_cache
+from sceptre_migration_tool.credential_cache import CredentialCache
+
+
+class TestCredentialCache(object):
+
+    def setup_method(self, test_method):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'credentials')
+        self.cache = CredentialCache(self.cache_dir)
+
+    def teardown_method(self, test_method):
+        shutil.rmtree(self.temp_dir)
+
+    @staticmethod
+    def _credentials(expires_in):
+        return {
+            'AccessKeyId': 'fake-access-key-id',
+            'SecretAccessKey': 'fake-secret-access-key',
+            'SessionToken': 'fake-session-token',
+            'Expiration': datetime.now(tzutc()) + expires_in
+        }
+
+    def test_get__missing(self):
+        assert self.cache.get('fake-profile', 'fake-role') is None
+
+    def test_put_then_get(self):
+        credentials = self._credentials(timedelta(hours=1))
+        self.cache.put('fake-profile', 'fake-role', credentials)
+        assert credentials == self.cache.get('fake-profile', 'fake-role')
+        assert self.cache.get('other-profile', 'fake-role') is None
+        assert self.cache.get('fake-profile', 'other-role') is None
+
+    def test_get__about_to_expire(self):
+        self.cache.put(
+            'fake-profile', 'fake-role',
+            self._credentials(timedelta(minutes=4))
+        )
+        assert self.cache.get('fake-profile', 'fake-role') is None
+
+    def test_get__damaged(self):
+        self.cache.put(
+            'fake-profile', 'fake-role', self._credentials(timedelta(hours=1))
+        )
+        path = self.cache._get_path('fake-profile', 'fake-role')
+        with open(path, 'w') as cache_file:
+            cache_file.write('{"AccessKeyId"')
+        assert self.cache.get('fake-profile', 'fake-role') is None
+
+    def test_put__permissions(self):
+        self.cache.put(
+            'fake-profile', 'fake-role', self._credentials(timedelta(hours=1))
+        )
+        path = self.cache._get_path('fake-profile', 'fake-role')
+        assert 0o700 == stat.S_IMODE(os.stat(self.cache_dir).st_mode)
+        assert 0o600 == stat.S_IMODE(os.stat(path).st_mode)
+
+    def test_put__existing_directory_keeps_permissions(self):
+        os.mkdir(self.cache_dir)
+        os.chmod(self.cache_dir, 0o750)
+        self.cache.put(
+            'fake-profile', 'fake-role', self._credentials(timedelta(hours=1))
+        )
+        path = self.cache._get_path('fake-profile', 'fake-role')
+        assert 0o750 == stat.S_IMODE(os.stat(self.cache_dir).st_mode)
+        assert 0o600 == stat.S_IMODE(os.stat(path).st_mode)
+
+    def test_configure(self):
+        try:
+            credential_cache.configure(self.cache_dir)
+            assert credential_cache.get_credential_cache().cache_dir == \
+                self.cache_dir
+        finally:
+            credential_cache._credential_cache = None
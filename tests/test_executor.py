@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+
+import pytest
+from mock import Mock
+
+from sceptre_migration_tool import executor
+from sceptre_migration_tool.exceptions import ImportFailureError
+
+
+class TestExecutor(object):
+
+    def test_run_stack_imports__sequential(self):
+        mock_function1 = Mock()
+        mock_function2 = Mock()
+        results = executor.run_stack_imports([
+            ('env/stack1', mock_function1),
+            ('env/stack2', mock_function2)
+        ])
+        mock_function1.assert_called_once_with()
+        mock_function2.assert_called_once_with()
+        assert ['env/stack1', 'env/stack2'] == \
+            [result.config_path for result in results]
+        assert [None, None] == [result.error for result in results]
+
+    def test_run_stack_imports__sequential_fails_fast(self):
+        mock_function1 = Mock(side_effect=ValueError('fake-error'))
+        mock_function2 = Mock()
+        with pytest.raises(ValueError):
+            executor.run_stack_imports([
+                ('env/stack1', mock_function1),
+                ('env/stack2', mock_function2)
+            ])
+        mock_function2.assert_not_called()
+
+    def test_run_stack_imports__parallel(self):
+        thread_names = set()
+        concurrent = threading.Event()
+
+        def _import():
+            thread_names.add(threading.current_thread().name)
+            if len(thread_names) > 1:
+                concurrent.set()
+            concurrent.wait(1)
+
+        results = executor.run_stack_imports(
+            [('env/stack{}'.format(i), _import) for i in range(4)],
+            jobs=4
+        )
+        assert 4 == len(results)
+        assert len(thread_names) > 1
+        assert ['env/stack0', 'env/stack1', 'env/stack2', 'env/stack3'] == \
+            [result.config_path for result in results]
+
+    def test_run_stack_imports__parallel_gathers_errors(self):
+        mock_function1 = Mock(side_effect=ValueError('fake-error'))
+        mock_function2 = Mock()
+        with pytest.raises(ImportFailureError) as excinfo:
+            executor.run_stack_imports([
+                ('env/stack1', mock_function1),
+                ('env/stack2', mock_function2)
+            ], jobs=2)
+        mock_function2.assert_called_once_with()
+        assert 'env/stack1' in str(excinfo.value)
+        assert 'env/stack2' not in str(excinfo.value)
+
+    def test_run_stack_imports__parallel_gathers_logs(self):
+        logger = logging.getLogger('sceptre_migration_tool.fake')
+        handler = logging.Handler()
+        handler.emit = Mock()
+        logging.getLogger('sceptre_migration_tool').addHandler(handler)
+        try:
+            def _make_import(message):
+                return lambda: logger.warning(message)
+            results = executor.run_stack_imports([
+                ('env/stack1', _make_import('fake-message1')),
+                ('env/stack2', _make_import('fake-message2'))
+            ], jobs=2)
+        finally:
+            logging.getLogger('sceptre_migration_tool')\
+                .removeHandler(handler)
+
+        assert [1, 1] == [result.log_record_count for result in results]
+        emitted = [
+            args[0].getMessage() for args, _ in handler.emit.call_args_list
+        ]
+        assert 'fake-message1' in emitted
+        assert 'fake-message2' in emitted
+        assert not handler.filters
+
+    def test_run_stack_import_groups__group_runs_in_order(self):
+        calls = []
+
+        def _make_import(name):
+            return lambda: calls.append(name)
+
+        results = executor.run_stack_import_groups([
+            [
+                ('env1/stack1', _make_import('env1/stack1')),
+                ('env1/stack2', _make_import('env1/stack2'))
+            ],
+            [
+                ('env2/stack1', _make_import('env2/stack1'))
+            ]
+        ], jobs=2)
+        assert ['env1/stack1', 'env1/stack2', 'env2/stack1'] == \
+            [result.config_path for result in results]
+        assert calls.index('env1/stack1') < calls.index('env1/stack2')
+
+    def test_run_stack_imports__journal_skips_and_records(self):
+        mock_journal = Mock()
+        mock_journal.is_completed.side_effect = \
+            lambda config_path: config_path == 'env/stack1'
+        mock_function1 = Mock()
+        mock_function2 = Mock()
+        results = executor.run_stack_imports([
+            ('env/stack1', mock_function1),
+            ('env/stack2', mock_function2)
+        ], journal=mock_journal)
+        mock_function1.assert_not_called()
+        mock_function2.assert_called_once_with()
+        mock_journal.record.assert_called_once_with('env/stack2')
+        assert ['env/stack2'] == [result.config_path for result in results]
+
+    def test_run_stack_imports__parallel_journal_records_successes(self):
+        mock_journal = Mock()
+        mock_journal.is_completed.return_value = False
+        with pytest.raises(ImportFailureError):
+            executor.run_stack_imports([
+                ('env/stack1', Mock(side_effect=ValueError('fake-error'))),
+                ('env/stack2', Mock())
+            ], jobs=2, journal=mock_journal)
+        mock_journal.record.assert_called_once_with('env/stack2')
+
+    def test_run_stack_imports__sequential_interrupt(self):
+        mock_journal = Mock()
+        mock_journal.is_completed.return_value = False
+        mock_function3 = Mock()
+        with pytest.raises(KeyboardInterrupt):
+            executor.run_stack_imports([
+                ('env/stack1', Mock()),
+                ('env/stack2', Mock(side_effect=KeyboardInterrupt())),
+                ('env/stack3', mock_function3)
+            ], journal=mock_journal)
+        mock_journal.record.assert_called_once_with('env/stack1')
+        mock_function3.assert_not_called()
+
+    def test_run_group__stops_when_interrupted(self):
+        interrupted = threading.Event()
+        mock_function2 = Mock()
+        results = executor._run_group(
+            executor._StackLogBuffer(),
+            [
+                ('env/stack1', interrupted.set),
+                ('env/stack2', mock_function2)
+            ],
+            interrupted=interrupted
+        )
+        assert ['env/stack1'] == [result.config_path for result in results]
+        mock_function2.assert_not_called()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+from sceptre_migration_tool.journal import ImportJournal, get_journal_path
+
+
+class TestImportJournal(object):
+
+    def setup_method(self, test_method):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, '.migration-journal')
+
+    def teardown_method(self, test_method):
+        shutil.rmtree(self.temp_dir)
+
+    def test_record(self):
+        journal = ImportJournal(self.path)
+        journal.record('env/stack1')
+        assert journal.is_completed('env/stack1')
+        assert not journal.is_completed('env/stack2')
+
+    def test_resume(self):
+        ImportJournal(self.path).record('env/stack1')
+        journal = ImportJournal(self.path, resume=True)
+        assert journal.is_completed('env/stack1')
+
+    def test_resume__missing_journal(self):
+        journal = ImportJournal(self.path, resume=True)
+        assert not journal.completed
+
+    def test_without_resume_empties_journal(self):
+        ImportJournal(self.path).record('env/stack1')
+        journal = ImportJournal(self.path)
+        assert not journal.is_completed('env/stack1')
+        assert not ImportJournal(self.path, resume=True).completed
+
+    def test_resume__torn_last_entry(self):
+        with open(self.path, 'w') as journal_file:
+            journal_file.write('{"config_path": "env/stack1"}\n')
+            journal_file.write('{"config_pa')
+        journal = ImportJournal(self.path, resume=True)
+        assert {'env/stack1'} == journal.completed
+        journal.record('env/stack2')
+        assert {'env/stack1', 'env/stack2'} == \
+            ImportJournal(self.path, resume=True).completed
+
+    def test_get_journal_path__per_command_and_target(self):
+        dev_path = get_journal_path(self.temp_dir, 'import-env', 'dev')
+        prod_path = get_journal_path(self.temp_dir, 'import-env', 'prod')
+        assert len({
+            dev_path,
+            prod_path,
+            get_journal_path(self.temp_dir, 'import-list', ['dev'])
+        }) == 3
+        assert dev_path == get_journal_path(self.temp_dir, 'import-env', 'dev')
+        assert os.path.basename(dev_path).startswith(
+            '.migration-journal-import-env-'
+        )
+
+        # A fresh run of prod keeps the interrupted dev run resumable
+        ImportJournal(dev_path).record('dev/stack1')
+        ImportJournal(prod_path)
+        assert ImportJournal(dev_path, resume=True).is_completed('dev/stack1')
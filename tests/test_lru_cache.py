@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+from sceptre_migration_tool.lru_cache import LruCache
+
+
+class TestLruCache(object):
+
+    def setup_method(self, test_method):
+        self.cache = LruCache(2)
+
+    def test_get__missing(self):
+        assert LruCache.MISSING is self.cache.get('key')
+        assert 1 == self.cache.misses
+
+    def test_put_then_get(self):
+        self.cache.put('key', 'value')
+        assert 'value' == self.cache.get('key')
+        assert 1 == self.cache.hits
+
+    def test_put__none_is_cached(self):
+        self.cache.put('key', None)
+        assert self.cache.get('key') is None
+
+    def test_put__evicts_least_recently_used(self):
+        self.cache.put('key1', 'value1')
+        self.cache.put('key2', 'value2')
+        self.cache.get('key1')
+        self.cache.put('key3', 'value3')
+        assert 2 == len(self.cache)
+        assert 'value1' == self.cache.get('key1')
+        assert LruCache.MISSING is self.cache.get('key2')
+        assert 'value3' == self.cache.get('key3')
+
+    def test_put__replaces_value(self):
+        self.cache.put('key', 'value1')
+        self.cache.put('key', 'value2')
+        assert 1 == len(self.cache)
+        assert 'value2' == self.cache.get('key')
+
+    def test_hit_rate(self):
+        assert 0.0 == self.cache.hit_rate
+        self.cache.put('key', 'value')
+        self.cache.get('key')
+        self.cache.get('other-key')
+        assert 0.5 == self.cache.hit_rate
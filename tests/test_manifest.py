@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+
+from sceptre_migration_tool import manifest
+from sceptre_migration_tool.manifest import Manifest, hash_body, hash_file
+
+
+class TestManifest(object):
+
+    def setup_method(self, test_method):
+        self.temp_dir = tempfile.mkdtemp()
+        self.manifest_path = os.path.join(self.temp_dir, '.migration-manifest')
+        self.path = os.path.join(self.temp_dir, 'templates', 'fake.yaml')
+        os.makedirs(os.path.dirname(self.path))
+
+    def teardown_method(self, test_method):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, body):
+        with open(self.path, 'w') as fobj:
+            fobj.write(body)
+
+    def test_is_current__not_recorded(self):
+        self._write('Key: Value\n')
+        assert not Manifest(self.manifest_path)\
+            .is_current(self.path, 'Key: Value\n')
+
+    def test_is_current__recorded(self):
+        self._write('Key: Value\n')
+        fake_manifest = Manifest(self.manifest_path)
+        fake_manifest.record(self.path, 'Key: Value\n')
+        assert fake_manifest.is_current(self.path, 'Key: Value\n')
+        assert not fake_manifest.is_current(self.path, 'Key: Other\n')
+
+    def test_is_current__equivalent_body(self):
+        self._write('Key: Value\n')
+        fake_manifest = Manifest(self.manifest_path)
+        fake_manifest.record(self.path, 'Key: Value\n', '{"Key": "Value"}')
+        assert fake_manifest.is_current(self.path, '{"Key": "Value"}')
+
+    def test_is_current__file_changed(self):
+        self._write('Key: Value\n')
+        fake_manifest = Manifest(self.manifest_path)
+        fake_manifest.record(self.path, 'Key: Value\n')
+        self._write('Key: Edited\n')
+        assert not fake_manifest.is_current(self.path, 'Key: Value\n')
+
+    def test_is_current__file_removed(self):
+        self._write('Key: Value\n')
+        fake_manifest = Manifest(self.manifest_path)
+        fake_manifest.record(self.path, 'Key: Value\n')
+        os.remove(self.path)
+        assert not fake_manifest.is_current(self.path, 'Key: Value\n')
+
+    def test_record_digest(self):
+        self._write('Key: Value\n')
+        fake_manifest = Manifest(self.manifest_path)
+        fake_manifest.record_digest(
+            self.path, hash_body('Key: Value\n'), hash_body('{"Key": 1}')
+        )
+        assert fake_manifest.is_current(self.path, 'Key: Value\n')
+        assert fake_manifest.is_current_digest(
+            self.path, hash_body('{"Key": 1}')
+        )
+
+    def test_hash_file(self):
+        self._write('Key: Value\n')
+        assert hash_file(self.path) == hash_body('Key: Value\n')
+
+    def test_load__persisted_and_compacted(self):
+        self._write('Key: Value\n')
+        fake_manifest = Manifest(self.manifest_path)
+        fake_manifest.record(self.path, 'Key: Value\n')
+        fake_manifest.record(self.path, 'Key: Value\n')
+        assert Manifest(self.manifest_path)\
+            .is_current(self.path, 'Key: Value\n')
+        with open(self.manifest_path) as manifest_file:
+            assert 1 == len(manifest_file.readlines())
+
+    def test_get_manifest__shared(self):
+        try:
+            first = manifest.get_manifest(self.temp_dir)
+            assert first is manifest.get_manifest(self.temp_dir + '/.')
+            assert self.manifest_path == first.path
+        finally:
+            manifest.manifests.clear()
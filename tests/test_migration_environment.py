@@ -1,11 +1,23 @@
 # -*- coding: utf-8 -*-
 
 import os
+import threading
 
 from mock import sentinel, Mock, patch
 
 from sceptre_migration_tool.reverse_resolvers import ReverseResolver
 from sceptre_migration_tool.migrator import MigrationEnvironment
+from sceptre_migration_tool.migration_environment import \
+    get_reverse_resolver_classes, reverse_resolver_classes
+from sceptre_migration_tool.resolver_registry import \
+    BUILTIN_REVERSE_RESOLVERS
+
+
+BUILTIN_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "sceptre_migration_tool",
+    "reverse_resolvers"
+)
 
 
 class TestMigrationEnvironment_import_stack_list(object):
@@ -43,12 +55,72 @@ class TestMigrationEnvironment_import_stack_list(object):
         assert result == [('1', '2', '3', '4')]
 
 
+def _make_mock_reverse_resolver():
+    reverse_resolver = Mock()
+    reverse_resolver.depends_on_context.return_value = False
+    reverse_resolver.reverse_lookup_table.return_value = None
+    reverse_resolver.suggest_many.side_effect = lambda values: {
+        value: reverse_resolver.suggest(value) for value in values
+    }
+    return reverse_resolver
+
+
+class TestGetReverseResolverClasses(object):
+
+    def setup_method(self):
+        reverse_resolver_classes.clear()
+
+    @patch("sceptre_migration_tool.migration_environment.get_subclasses")
+    def test_get_reverse_resolver_classes__cached(
+        self, mock_get_subclasses, tmpdir
+    ):
+        tmpdir.join("resolver.py").write("")
+        mock_get_subclasses.return_value = {'key': sentinel.resolver_class}
+        directory = str(tmpdir)
+
+        assert get_reverse_resolver_classes(directory) == \
+            {'key': sentinel.resolver_class}
+        assert get_reverse_resolver_classes(directory) == \
+            {'key': sentinel.resolver_class}
+        mock_get_subclasses.assert_called_once_with(
+            directory=directory,
+            class_type=ReverseResolver
+        )
+
+    @patch("sceptre_migration_tool.migration_environment.get_subclasses")
+    def test_get_reverse_resolver_classes__file_changed(
+        self, mock_get_subclasses, tmpdir
+    ):
+        resolver_file = tmpdir.join("resolver.py")
+        resolver_file.write("")
+        mock_get_subclasses.return_value = {}
+        directory = str(tmpdir)
+
+        get_reverse_resolver_classes(directory)
+        resolver_file.setmtime(resolver_file.mtime() + 10)
+        get_reverse_resolver_classes(directory)
+        assert mock_get_subclasses.call_count == 2
+
+    @patch("sceptre_migration_tool.migration_environment.get_subclasses")
+    def test_get_reverse_resolver_classes__file_added(
+        self, mock_get_subclasses, tmpdir
+    ):
+        mock_get_subclasses.return_value = {}
+        directory = str(tmpdir)
+
+        get_reverse_resolver_classes(directory)
+        tmpdir.join("resolver.py").write("")
+        get_reverse_resolver_classes(directory)
+        assert mock_get_subclasses.call_count == 2
+
+
 class TestMigrationEnvironment(object):
 
     class MockConfig(dict):
         pass
 
     def setup_method(self):
+        reverse_resolver_classes.clear()
         self.mock_config = self.MockConfig()
         self.mock_config['user_variables'] = {}
         self.migration_environment = MigrationEnvironment(
@@ -62,7 +134,7 @@ class TestMigrationEnvironment(object):
         assert self.migration_environment.environment_config == \
             self.mock_config
         assert self.migration_environment._reversed_env_config == {}
-        assert self.migration_environment._config_re_pattern == ''
+        assert 0 == len(self.migration_environment._env_config_matcher)
         assert self.migration_environment._reverse_resolver_list is None
 
     @patch("sceptre_migration_tool.migration_environment.get_subclasses")
@@ -95,7 +167,7 @@ class TestMigrationEnvironment(object):
 
     def test_suggest(self):
         def _make_reverse_resolver(return_value):
-            reverse_resolver = Mock()
+            reverse_resolver = _make_mock_reverse_resolver()
             reverse_resolver.suggest.return_value = return_value
             return reverse_resolver
         self.migration_environment._reverse_resolver_list = [
@@ -106,6 +178,202 @@ class TestMigrationEnvironment(object):
         result = self.migration_environment.suggest('value')
         assert result == 'suggest2'
 
+    def test_suggest__memoised(self):
+        reverse_resolver = _make_mock_reverse_resolver()
+        reverse_resolver.suggest.side_effect = ["suggest1", None]
+        self.migration_environment._reverse_resolver_list = [
+            reverse_resolver
+        ]
+        self.migration_environment.config_path = 'env/stack1'
+        assert 'suggest1' == self.migration_environment.suggest('value1')
+        self.migration_environment.config_path = 'env/stack2'
+        assert 'suggest1' == self.migration_environment.suggest('value1')
+        assert "'value2'" == self.migration_environment.suggest('value2')
+        assert "'value2'" == self.migration_environment.suggest('value2')
+        assert 2 == reverse_resolver.suggest.call_count
+        assert 0.5 == self.migration_environment._suggestions.hit_rate
+
+    def test_suggest__memoised_per_stack_when_context_dependent(self):
+        reverse_resolver = _make_mock_reverse_resolver()
+        reverse_resolver.depends_on_context.return_value = True
+        reverse_resolver.suggest.side_effect = ["suggest1", None, "suggest1"]
+        self.migration_environment._reverse_resolver_list = [
+            reverse_resolver
+        ]
+        self.migration_environment.config_path = 'env/stack1'
+        assert 'suggest1' == self.migration_environment.suggest('value')
+        self.migration_environment.config_path = 'env/stack2'
+        assert "'value'" == self.migration_environment.suggest('value')
+        self.migration_environment.config_path = 'env/stack1'
+        assert 'suggest1' == self.migration_environment.suggest('value')
+        assert 2 == reverse_resolver.suggest.call_count
+
+    def test_suggest__memoised_per_stack_by_default(self):
+        class ContextReverseResolver(ReverseResolver):
+            def precendence(self):
+                return 50
+
+            def suggest(self, value):
+                return "'{}'".format(
+                    self.migration_environment.aws_stack_name
+                )
+
+        self.migration_environment._reverse_resolver_list = [
+            ContextReverseResolver(self.migration_environment)
+        ]
+        self.migration_environment.set_resolution_context(
+            'env/stack', 'aws-stack1', {}, None
+        )
+        assert "'aws-stack1'" == self.migration_environment.suggest('value')
+        self.migration_environment.set_resolution_context(
+            'env/stack', 'aws-stack2', {}, None
+        )
+        assert "'aws-stack2'" == self.migration_environment.suggest('value')
+
+    def test_suggest_many(self):
+        reverse_resolver1 = _make_mock_reverse_resolver()
+        reverse_resolver1.suggest.side_effect = \
+            lambda value: 'suggest1' if value == 'value1' else None
+        reverse_resolver2 = _make_mock_reverse_resolver()
+        reverse_resolver2.suggest.side_effect = \
+            lambda value: 'suggest2' if value == 'value2' else None
+        self.migration_environment._reverse_resolver_list = [
+            reverse_resolver1, reverse_resolver2
+        ]
+        self.migration_environment._reversed_env_config['value4'] = \
+            'fake-reversal'
+
+        result = self.migration_environment.suggest_many(
+            ['value1', 'value2', 'value3', 'value4', 'value1']
+        )
+
+        assert {
+            'value1': 'suggest1',
+            'value2': 'suggest2',
+            'value3': "'value3'",
+            'value4': "'fake-reversal'"
+        } == result
+        reverse_resolver1.suggest_many.assert_called_once_with(
+            ['value1', 'value2', 'value3']
+        )
+        reverse_resolver2.suggest_many.assert_called_once_with(
+            ['value2', 'value3']
+        )
+
+    def test_suggest_many__memoised_values_not_resolved(self):
+        reverse_resolver = _make_mock_reverse_resolver()
+        reverse_resolver.suggest.return_value = 'suggest'
+        self.migration_environment._reverse_resolver_list = [
+            reverse_resolver
+        ]
+        self.migration_environment.suggest('value1')
+        self.migration_environment.suggest_many(['value1', 'value2'])
+        reverse_resolver.suggest_many.assert_called_with(['value2'])
+
+    def test_suggest_many__tables(self):
+        reverse_resolver1 = _make_mock_reverse_resolver()
+        reverse_resolver1.reverse_lookup_table.return_value = {
+            'value1': 'table1-suggest1'
+        }
+        reverse_resolver2 = _make_mock_reverse_resolver()
+        reverse_resolver2.suggest.side_effect = \
+            lambda value: 'suggest2' if value in ('value1', 'value2') \
+            else None
+        reverse_resolver3 = _make_mock_reverse_resolver()
+        reverse_resolver3.reverse_lookup_table.return_value = {
+            'value1': 'table3-suggest1',
+            'value3': 'table3-suggest3'
+        }
+        self.migration_environment._reverse_resolver_list = [
+            reverse_resolver1, reverse_resolver2, reverse_resolver3
+        ]
+
+        result = self.migration_environment.suggest_many(
+            ['value1', 'value2', 'value3', 'value4']
+        )
+
+        assert {
+            'value1': 'table1-suggest1',
+            'value2': 'suggest2',
+            'value3': 'table3-suggest3',
+            'value4': "'value4'"
+        } == result
+        # value1 is answered by a higher precedence table
+        reverse_resolver2.suggest_many.assert_called_once_with(
+            ['value2', 'value3', 'value4']
+        )
+        reverse_resolver1.suggest_many.assert_not_called()
+        reverse_resolver3.suggest_many.assert_not_called()
+
+    def test_suggest_many__procedural_resolver_outranks_index(self):
+        reverse_resolver1 = _make_mock_reverse_resolver()
+        reverse_resolver1.suggest.return_value = 'suggest1'
+        reverse_resolver2 = _make_mock_reverse_resolver()
+        reverse_resolver2.reverse_lookup_table.return_value = {
+            'value': 'table-suggest'
+        }
+        self.migration_environment._reverse_resolver_list = [
+            reverse_resolver1, reverse_resolver2
+        ]
+        assert 'suggest1' == self.migration_environment.suggest('value')
+
+    def test_suggest__later_resolvers_not_touched(self):
+        reverse_resolver1 = _make_mock_reverse_resolver()
+        reverse_resolver1.suggest.return_value = 'suggest1'
+        reverse_resolver2 = _make_mock_reverse_resolver()
+        reverse_resolver2.depends_on_context.return_value = True
+        self.migration_environment._reverse_resolver_list = [
+            reverse_resolver1, reverse_resolver2
+        ]
+        self.migration_environment._reversed_env_config['user-value'] = \
+            'fake-reversal'
+
+        assert "'fake-reversal'" == \
+            self.migration_environment.suggest('user-value')
+        reverse_resolver1.reverse_lookup_table.assert_not_called()
+        reverse_resolver1.suggest_many.assert_not_called()
+
+        assert 'suggest1' == self.migration_environment.suggest('value')
+        self.migration_environment.config_path = 'env/stack2'
+        assert 'suggest1' == self.migration_environment.suggest('value')
+        # Answered above it, so its context dependency does not matter
+        reverse_resolver2.reverse_lookup_table.assert_not_called()
+        reverse_resolver2.depends_on_context.assert_not_called()
+        reverse_resolver2.suggest_many.assert_not_called()
+        reverse_resolver1.suggest_many.assert_called_once_with(['value'])
+
+    def test_suggest__context_dependent_if_any_resolver_asked_is(self):
+        reverse_resolver1 = _make_mock_reverse_resolver()
+        reverse_resolver1.depends_on_context.return_value = True
+        reverse_resolver1.suggest.return_value = None
+        reverse_resolver2 = _make_mock_reverse_resolver()
+        reverse_resolver2.suggest.return_value = 'suggest2'
+        self.migration_environment._reverse_resolver_list = [
+            reverse_resolver1, reverse_resolver2
+        ]
+        self.migration_environment.config_path = 'env/stack1'
+        assert 'suggest2' == self.migration_environment.suggest('value')
+        self.migration_environment.config_path = 'env/stack2'
+        assert 'suggest2' == self.migration_environment.suggest('value')
+        assert 2 == reverse_resolver1.suggest.call_count
+
+    def test_log_statistics(self):
+        reverse_resolver = _make_mock_reverse_resolver()
+        reverse_resolver.depends_on_context.side_effect = \
+            lambda value: value == 'value2'
+        self.migration_environment._reverse_resolver_list = [
+            reverse_resolver
+        ]
+        self.migration_environment.suggest_many(
+            ['value1', 'value2', 'value1', 'value2']
+        )
+        self.migration_environment.suggest_many(['value1', 'value2'])
+        with patch.object(self.migration_environment, 'logger') as logger:
+            self.migration_environment.log_statistics()
+        logger.info.assert_called_once_with(
+            "Suggestions: %d lookups, %.0f%% answered from memo", 4, 50.0
+        )
+
     def test_suggest__match_env_config(self):
         self.migration_environment._reversed_env_config['value'] = \
             'fake-reversal'
@@ -118,24 +386,96 @@ class TestMigrationEnvironment(object):
         result = self.migration_environment.reverse_resolver_list
         assert 'fake-list' == result
 
+    @patch("sceptre_migration_tool.migration_environment"
+           ".get_reverse_resolver_entry_points")
     @patch("sceptre_migration_tool.migration_environment.MigrationEnvironment"
            "._add_reverse_resolvers")
-    def test_reverse_resolver_list__search(self, mock__add_reverse_resolvers):
+    def test_reverse_resolver_list__search(
+        self, mock__add_reverse_resolvers, mock_get_entry_points
+    ):
+        mock_get_entry_points.return_value = []
         self.migration_environment.environment_config.sceptre_dir = \
             'fake-sceptre-dir'
         result = self.migration_environment.reverse_resolver_list
         assert [] == result
         assert 2 == mock__add_reverse_resolvers.call_count
+        mock__add_reverse_resolvers.assert_any_call(BUILTIN_DIR, [])
         mock__add_reverse_resolvers.assert_any_call(
-            os.path.join(
-                os.path.dirname(os.path.dirname(__file__)),
-                "sceptre_migration_tool",
-                "reverse_resolvers"
-            )
+            'fake-sceptre-dir/reverse_resolvers'
         )
+
+    @patch("sceptre_migration_tool.migration_environment"
+           ".get_reverse_resolver_entry_points")
+    @patch("sceptre_migration_tool.migration_environment.MigrationEnvironment"
+           "._add_reverse_resolvers")
+    def test_reverse_resolver_list__entry_points(
+        self, mock__add_reverse_resolvers, mock_get_entry_points
+    ):
+        entry_point_1 = Mock()
+        entry_point_1.name = "resolver_1@20"
+        entry_point_2 = Mock()
+        entry_point_2.name = "resolver_2@10"
+        mock_get_entry_points.return_value = [entry_point_1, entry_point_2]
+        self.migration_environment.environment_config.sceptre_dir = \
+            'fake-sceptre-dir'
+        result = self.migration_environment.reverse_resolver_list
+        assert ["resolver_2", "resolver_1"] == [r.name for r in result]
+        assert 2 == mock__add_reverse_resolvers.call_count
         mock__add_reverse_resolvers.assert_any_call(
             'fake-sceptre-dir/reverse_resolvers'
         )
+        entry_point_1.resolve.assert_not_called()
+        entry_point_2.resolve.assert_not_called()
+
+    @patch("sceptre_migration_tool.migration_environment"
+           ".get_reverse_resolver_entry_points")
+    @patch("sceptre_migration_tool.migration_environment.MigrationEnvironment"
+           "._add_reverse_resolvers")
+    def test_reverse_resolver_list__own_entry_points(
+        self, mock__add_reverse_resolvers, mock_get_entry_points
+    ):
+        entry_points = []
+        for name in BUILTIN_REVERSE_RESOLVERS:
+            entry_point = Mock()
+            entry_point.name = name + "@10"
+            entry_points.append(entry_point)
+        mock_get_entry_points.return_value = entry_points
+        self.migration_environment.environment_config.sceptre_dir = \
+            'fake-sceptre-dir'
+        self.migration_environment.reverse_resolver_list
+        mock__add_reverse_resolvers.assert_called_once_with(
+            'fake-sceptre-dir/reverse_resolvers'
+        )
+
+    @patch("sceptre_migration_tool.migration_environment"
+           ".get_reverse_resolver_entry_points")
+    def test_reverse_resolver_list__foreign_entry_point_keeps_builtins(
+        self, mock_get_entry_points, tmpdir
+    ):
+        foreign_entry_point = Mock(
+            module_name="foreign_package.resolvers",
+            attrs=("ReverseForeign",)
+        )
+        foreign_entry_point.name = "reverse_foreign@50"
+        # The same class as a built-in, registered under another name
+        renamed_entry_point = Mock(
+            module_name="sceptre_migration_tool.reverse_resolvers"
+            ".reverse_intuit_ami",
+            attrs=("ReverseIntuitAmi",)
+        )
+        renamed_entry_point.name = "my_ami@95"
+        mock_get_entry_points.return_value = [
+            foreign_entry_point, renamed_entry_point
+        ]
+        self.migration_environment.environment_config.sceptre_dir = \
+            str(tmpdir)
+        result = self.migration_environment.reverse_resolver_list
+        assert [
+            "ReverseExports", "ReverseStackOutput", "LazyReverseResolver",
+            "LazyReverseResolver"
+        ] == [type(r).__name__ for r in result]
+        assert ["reverse_foreign", "my_ami"] == [r.name for r in result[2:]]
+        foreign_entry_point.resolve.assert_not_called()
 
     def test_get_internal_stack__not_found(self):
         result = \
@@ -183,10 +523,9 @@ class TestMigrationEnvironment__reverse_env_config(object):
             'us-west-2': '{{ var.preprod_region }}',
             'vpc-abc123': '{{ var.preprod_vpc_id }}'
         }
-        assert self.migration_environment._config_re_pattern\
-            .split('|').sort() == \
-            'us\\-west\\-2|vpc\\-abc123|my\\-special\\-profile'\
-            .split('|').sort()
+        assert self.migration_environment._env_config_matcher\
+            .replacements == \
+            self.migration_environment._reversed_env_config
         assert self.migration_environment._reverse_resolver_list is None
 
     def test__multi_subst(self):
@@ -195,3 +534,64 @@ class TestMigrationEnvironment__reverse_env_config(object):
         )
         assert result ==\
             'my-bucket-{{ var.preprod_vpc_id }}-{{ var.preprod_region }}'
+
+    def test__multi_subst__longest_match(self):
+        self.mock_config['user_variables'] = {
+            'short_ip': '10.0.0.1',
+            'long_ip': '10.0.0.10'
+        }
+        migration_environment = MigrationEnvironment(
+            connection_manager=sentinel.connection_manager,
+            environment_config=self.mock_config
+        )
+        result = migration_environment._reverse_env_config(
+            '10.0.0.10,10.0.0.1'
+        )
+        assert result == '{{ var.long_ip }},{{ var.short_ip }}'
+
+
+class TestMigrationEnvironment_resolution_context(object):
+
+    class MockConfig(dict):
+        pass
+
+    def setup_method(self):
+        self.mock_config = self.MockConfig()
+        self.mock_config['user_variables'] = {}
+        self.migration_environment = MigrationEnvironment(
+            connection_manager=sentinel.connection_manager,
+            environment_config=self.mock_config
+        )
+
+    def test_defaults(self):
+        assert self.migration_environment.config_path == ""
+        assert self.migration_environment.aws_stack_name == ""
+        assert self.migration_environment.aws_stack == {}
+        assert self.migration_environment.template.path == ""
+
+    def test_set_resolution_context(self):
+        self.migration_environment.set_resolution_context(
+            'fake-config-path',
+            'fake-aws-stack-name',
+            sentinel.aws_stack,
+            sentinel.template
+        )
+        assert self.migration_environment.config_path == 'fake-config-path'
+        assert self.migration_environment.aws_stack_name == \
+            'fake-aws-stack-name'
+        assert self.migration_environment.aws_stack == sentinel.aws_stack
+        assert self.migration_environment.template == sentinel.template
+
+    def test_resolution_context_is_per_thread(self):
+        self.migration_environment.config_path = 'fake-main-path'
+        seen = []
+
+        def _worker():
+            seen.append(self.migration_environment.config_path)
+            self.migration_environment.config_path = 'fake-worker-path'
+
+        thread = threading.Thread(target=_worker)
+        thread.start()
+        thread.join()
+        assert seen == [""]
+        assert self.migration_environment.config_path == 'fake-main-path'
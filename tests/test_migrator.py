@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 
-from StringIO import StringIO
-from mock import patch, sentinel, Mock, PropertyMock
+from six import StringIO
+from mock import patch, sentinel, Mock, PropertyMock, call
 
 from sceptre.environment import Environment
 
 from sceptre_migration_tool.migration_environment import MigrationEnvironment
+from sceptre_migration_tool import connection_manager
 from sceptre_migration_tool import migrator
+from sceptre_migration_tool.journal import get_journal_path
 
 
 class TestMigrator_ensure_env_dir_exists(object):
@@ -51,6 +53,15 @@ class TestMigrator(object):
         # Run the rest of the tests against a leaf environment
         self.environment._is_leaf = True
 
+        self.journal_patcher = patch(
+            "sceptre_migration_tool.migrator.ImportJournal"
+        )
+        self.mock_journal = self.journal_patcher.start()
+        self.mock_journal.return_value.is_completed.return_value = False
+
+    def teardown_method(self, test_method):
+        self.journal_patcher.stop()
+
     @patch("sceptre_migration_tool.stack.import_stack")
     @patch("sceptre_migration_tool.migrator"
            "._create_migration_environment")
@@ -79,28 +90,13 @@ class TestMigrator(object):
             self, mock_migration_environment,
             mock_import_stack
     ):
-        mock_connection_manager =\
-            mock_migration_environment.return_value.connection_manager
-        mock_connection_manager.call.side_effect = [
-            {
-                'Stacks': [
-                    {
-                        'StackName': 'fake-aws-stack1'
-                    }
-                ],
-                'NextToken': 'StackName2'
-            },
-            {
-                'Stacks': [
-                    {
-                        'StackName': 'fake-aws-stack2'
-                    }
-                ]
-            }
-        ]
+        mock_migration_environment.return_value.stack_inventory\
+            .stack_names = ['fake-aws-stack1', 'fake-aws-stack2']
 
         migrator.import_env(self.environment)
 
+        mock_migration_environment.return_value.stack_inventory.load\
+            .assert_called_once_with()
         assert 2 == mock_import_stack.call_count
 
         mock_import_stack.assert_any_call(
@@ -119,6 +115,38 @@ class TestMigrator(object):
             template_path='templates/aws-import/fake-aws-stack2.yaml'
         )
 
+    @patch("sceptre_migration_tool.stack.import_stack")
+    @patch("sceptre_migration_tool.migrator"
+           "._create_migration_environment")
+    def test_import_env__resume(
+            self, mock_migration_environment,
+            mock_import_stack
+    ):
+        mock_migration_environment.return_value.stack_inventory\
+            .stack_names = ['fake-aws-stack1', 'fake-aws-stack2']
+        self.mock_journal.return_value.is_completed.side_effect = \
+            lambda config_path: config_path.endswith('stack1')
+
+        migrator.import_env(self.environment, resume=True)
+
+        mock_migration_environment.return_value.stack_inventory.load\
+            .assert_not_called()
+
+        self.mock_journal.assert_called_once_with(
+            get_journal_path('sceptre_dir', 'import-env', 'environment_path'),
+            True
+        )
+        mock_import_stack.assert_called_once_with(
+            migration_environment=mock_migration_environment
+            .return_value,
+            aws_stack_name='fake-aws-stack2',
+            config_path='environment_path/fake-aws-stack2',
+            template_path='templates/aws-import/fake-aws-stack2.yaml'
+        )
+        self.mock_journal.return_value.record.assert_called_once_with(
+            'environment_path/fake-aws-stack2'
+        )
+
     @patch("sceptre_migration_tool.migrator.import_stack")
     @patch("sceptre_migration_tool.migrator.Environment")
     @patch("sceptre_migration_tool.migration_environment"
@@ -136,43 +164,144 @@ class TestMigrator(object):
         mock_environment.assert_not_called()
         mock_import_stack.assert_not_called()
 
-    @patch("sceptre_migration_tool.migrator.import_stack")
+    @patch("sceptre_migration_tool.migrator._import_stack")
+    @patch("sceptre_migration_tool.migrator._create_migration_environment")
     @patch("sceptre_migration_tool.migrator.Environment")
     @patch("sceptre_migration_tool.migration_environment"
            ".MigrationEnvironment.read_import_stack_list")
     def test_import_list__data(
             self, mock_read_import_stack_list,
             mock_environment,
+            mock_create_migration_environment,
             mock_import_stack
     ):
         fake_item = ('1', '2', '3', '4')
         mock_read_import_stack_list.return_value = [fake_item]
+        mock_environment.return_value.path = '1'
         migrator.import_list(
             "sceptre_dir", sentinel.options, sentinel.list_fobj
         )
         mock_read_import_stack_list.assert_called_once_with(sentinel.list_fobj)
+        self.mock_journal.assert_called_once_with(
+            get_journal_path('sceptre_dir', 'import-list', [fake_item]),
+            False
+        )
         mock_environment.assert_called_once_with(
             sceptre_dir="sceptre_dir",
             environment_path=fake_item[MigrationEnvironment.PART_ENV],
             options=sentinel.options
         )
+        mock_create_migration_environment.assert_called_once_with(
+            mock_environment.return_value
+        )
         mock_import_stack.assert_called_once_with(
             mock_environment.return_value,
+            mock_create_migration_environment.return_value,
             fake_item[MigrationEnvironment.PART_AWS_STACK_NAME],
             fake_item[MigrationEnvironment.PART_SCEPTRE_STACK_NAME],
             fake_item[MigrationEnvironment.PART_TEMPLATE_PATH]
         )
 
+    @patch("sceptre_migration_tool.migrator._import_stack")
+    @patch("sceptre_migration_tool.migrator._create_migration_environment")
+    @patch("sceptre_migration_tool.migrator.Environment")
+    @patch("sceptre_migration_tool.migration_environment"
+           ".MigrationEnvironment.read_import_stack_list")
+    def test_import_list__reuses_environment(
+            self, mock_read_import_stack_list,
+            mock_environment,
+            mock_create_migration_environment,
+            mock_import_stack
+    ):
+        mock_read_import_stack_list.return_value = [
+            ('env1', 'a', 'aws-a', 'templates/a.yaml'),
+            ('env2', 'b', 'aws-b', 'templates/b.yaml'),
+            ('env1', 'c', 'aws-c', 'templates/c.yaml')
+        ]
+        mock_environment.return_value.path = 'env'
+        migrator.import_list(
+            "sceptre_dir", sentinel.options, sentinel.list_fobj
+        )
+        assert 2 == mock_environment.call_count
+        assert 2 == mock_create_migration_environment.call_count
+        assert 3 == mock_import_stack.call_count
+
+    @patch("sceptre_migration_tool.migrator._import_stack")
+    @patch("sceptre_migration_tool.migrator._create_migration_environment")
+    @patch("sceptre_migration_tool.migrator.Environment")
+    @patch("sceptre_migration_tool.migration_environment"
+           ".MigrationEnvironment.read_import_stack_list")
+    def test_import_list__sequential_keeps_list_order(
+            self, mock_read_import_stack_list,
+            mock_environment,
+            mock_create_migration_environment,
+            mock_import_stack
+    ):
+        mock_read_import_stack_list.return_value = [
+            ('env1', 'a', 'aws-a', 'templates/a.yaml'),
+            ('env2', 'b', 'aws-b', 'templates/b.yaml'),
+            ('env1', 'c', 'aws-c', 'templates/c.yaml')
+        ]
+        mock_environment.side_effect = lambda **kwargs: Mock(
+            path=kwargs['environment_path']
+        )
+        mock_create_migration_environment.side_effect = \
+            lambda env: Mock(connection_manager=env.path)
+
+        migrator.import_list(
+            "sceptre_dir", sentinel.options, sentinel.list_fobj
+        )
+
+        assert ['aws-a', 'aws-b', 'aws-c'] == [
+            args[2] for args, _ in mock_import_stack.call_args_list
+        ]
+
+    @patch("sceptre_migration_tool.migrator.run_stack_import_groups")
+    @patch("sceptre_migration_tool.migrator._create_migration_environment")
+    @patch("sceptre_migration_tool.migrator.Environment")
+    @patch("sceptre_migration_tool.migration_environment"
+           ".MigrationEnvironment.read_import_stack_list")
+    def test_import_list__groups_by_connection(
+            self, mock_read_import_stack_list,
+            mock_environment,
+            mock_create_migration_environment,
+            mock_run_stack_import_groups
+    ):
+        mock_read_import_stack_list.return_value = [
+            ('env1', 'a', 'aws-a', 'templates/a.yaml'),
+            ('env2', 'b', 'aws-b', 'templates/b.yaml'),
+            ('env3', 'c', 'aws-c', 'templates/c.yaml')
+        ]
+        mock_environment.side_effect = lambda **kwargs: Mock(
+            path=kwargs['environment_path']
+        )
+        migration_environments = {
+            'env1': Mock(connection_manager=sentinel.connection1),
+            'env2': Mock(connection_manager=sentinel.connection2),
+            'env3': Mock(connection_manager=sentinel.connection1)
+        }
+        mock_create_migration_environment.side_effect = \
+            lambda env: migration_environments[env.path]
+
+        migrator.import_list(
+            "sceptre_dir", sentinel.options, sentinel.list_fobj, 3
+        )
+
+        import_task_groups, jobs, journal = \
+            mock_run_stack_import_groups.call_args[0]
+        assert 3 == jobs
+        assert [
+            [config_path for config_path, _ in import_tasks]
+            for import_tasks in import_task_groups
+        ] == [['env1/a', 'env3/c'], ['env2/b']]
+
     @patch("sceptre_migration_tool.migrator"
            "._create_migration_environment")
     def test_generate_import_list__empty(
             self, mock_migration_environment
     ):
-        mock_connection_manager =\
-            mock_migration_environment.return_value.connection_manager
-        mock_connection_manager.call.return_value = {
-            'Stacks': []
-        }
+        mock_migration_environment.return_value.stack_inventory\
+            .iter_stack_name_pages.return_value = iter([[]])
         try:
             list_fobj = StringIO()
             migrator.generate_import_list(
@@ -181,39 +310,16 @@ class TestMigrator(object):
             assert "" == list_fobj.getvalue()
         finally:
             list_fobj.close()
-        mock_connection_manager.call.assert_called_once_with(
-            service='cloudformation',
-            command='describe_stacks',
-            kwargs={}
-        )
 
     @patch("sceptre_migration_tool.migrator"
            "._create_migration_environment")
     def test_generate_import_list__data(
             self, mock_migration_environment
     ):
-        mock_connection_manager =\
-            mock_migration_environment.return_value.connection_manager
-        mock_connection_manager.call.side_effect = [
-            {
-                'Stacks': [
-                    {
-                        'StackName': 'name1'
-                    },
-                    {
-                        'StackName': 'name2'
-                    }
-                ],
-                'NextToken': 'next'
-            },
-            {
-                'Stacks': [
-                    {
-                        'StackName': 'name3'
-                    }
-                ]
-            }
-        ]
+        mock_migration_environment.return_value.stack_inventory\
+            .iter_stack_name_pages.return_value = iter([
+                ['name1', 'name2'], ['name3']
+            ])
         try:
             list_fobj = StringIO()
             migrator.generate_import_list(
@@ -227,12 +333,87 @@ class TestMigrator(object):
             ])
         finally:
             list_fobj.close()
-        mock_connection_manager.call.call_count = 2
+
+    @patch("sceptre_migration_tool.migrator"
+           "._create_migration_environment")
+    def test_generate_import_list__flushed_per_page(
+            self, mock_migration_environment
+    ):
+        mock_migration_environment.return_value.stack_inventory\
+            .iter_stack_name_pages.return_value = iter([
+                ['name1', 'name2'], ['name3']
+            ])
+        mock_list_fobj = Mock()
+        migrator.generate_import_list(self.environment, mock_list_fobj)
+        assert mock_list_fobj.mock_calls == [
+            call.write(
+                'environment_path name1 name1 '
+                'templates/aws-import/name1.yaml\n'
+                'environment_path name2 name2 '
+                'templates/aws-import/name2.yaml\n'
+            ),
+            call.flush(),
+            call.write(
+                'environment_path name3 name3 '
+                'templates/aws-import/name3.yaml\n'
+            ),
+            call.flush()
+        ]
+
+
+class TestMigrator_generate_project_import_list(object):
+
+    def test__find_leaf_environment_paths(self, tmpdir):
+        tmpdir.ensure("config", "prod", "eu", dir=True)
+        tmpdir.ensure("config", "prod", "us", "stack.yaml")
+        tmpdir.ensure("config", "dev", "config.yaml")
+        tmpdir.ensure("config", "config.yaml")
+        result = list(migrator._find_leaf_environment_paths(str(tmpdir)))
+        assert result == ["dev", "prod/eu", "prod/us"]
+
+    @patch("sceptre_migration_tool.migrator._create_migration_environment")
+    @patch("sceptre_migration_tool.migrator.Environment")
+    @patch("sceptre_migration_tool.migrator._find_leaf_environment_paths")
+    def test_generate_project_import_list(
+            self, mock_find_leaf_environment_paths, mock_environment,
+            mock_create_migration_environment
+    ):
+        mock_find_leaf_environment_paths.return_value = ["a", "b", "c"]
+        mock_environment.side_effect = \
+            lambda sceptre_dir, environment_path, options: \
+            Mock(path=environment_path)
+        inventory_1 = Mock(stack_names=["stack1", "stack2"])
+        inventory_2 = Mock(stack_names=["stack3"])
+        mock_create_migration_environment.side_effect = [
+            Mock(stack_inventory=inventory_1),
+            Mock(stack_inventory=inventory_2),
+            Mock(stack_inventory=inventory_1)
+        ]
+        list_fobj = StringIO()
+
+        migrator.generate_project_import_list(
+            "sceptre_dir", sentinel.options, list_fobj, 2
+        )
+
+        assert list_fobj.getvalue() == "".join([
+            "a stack1 stack1 templates/aws-import/stack1.yaml\n",
+            "a stack2 stack2 templates/aws-import/stack2.yaml\n",
+            "b stack3 stack3 templates/aws-import/stack3.yaml\n"
+        ])
+        mock_environment.assert_any_call(
+            sceptre_dir="sceptre_dir",
+            environment_path="c",
+            options=sentinel.options
+        )
 
 
 class TestEnvironment__create_migration_environment(object):
 
-    @patch("sceptre_migration_tool.migrator.ConnectionManager")
+    def setup_method(self, test_method):
+        connection_manager.connection_managers.clear()
+        migrator.stack_inventories.clear()
+
+    @patch("sceptre_migration_tool.connection_manager.ConnectionManager")
     def test_happy_case(self, mock_ConnectionManager):
         mock_env = Mock()
         mock_env._get_config.return_value = {
@@ -252,3 +433,32 @@ class TestEnvironment__create_migration_environment(object):
             iam_role='fake-iam-role',
             profile='fake-profile'
         )
+
+        assert result.stack_inventory.connection_manager == \
+            mock_ConnectionManager.return_value
+
+    @patch("sceptre_migration_tool.connection_manager.ConnectionManager")
+    def test_connection_shared_by_account_and_region(
+            self, mock_ConnectionManager
+    ):
+        def _make_env(region):
+            mock_env = Mock()
+            mock_env._get_config.return_value = {
+                "region": region,
+                "iam_role": 'fake-iam-role',
+                "profile": 'fake-profile',
+                "user_variables": {}
+            }
+            return mock_env
+
+        result1 = migrator._create_migration_environment(
+            _make_env('fake-region'))
+        result2 = migrator._create_migration_environment(
+            _make_env('fake-region'))
+        result3 = migrator._create_migration_environment(
+            _make_env('fake-other-region'))
+
+        assert result1.stack_inventory is result2.stack_inventory
+        assert result1.stack_inventory is not result3.stack_inventory
+        assert result1.connection_manager is result2.connection_manager
+        assert 2 == mock_ConnectionManager.call_count
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+from mock import patch, sentinel
+
+from sceptre_migration_tool import process_pool
+
+
+class TestProcessPool(object):
+
+    def teardown_method(self, test_method):
+        if process_pool._process_pool is not None:
+            process_pool._process_pool.shutdown()
+        process_pool._process_pool = None
+
+    def test_run__disabled_runs_in_calling_process(self):
+        assert process_pool.get_process_pool() is None
+        assert process_pool.run(os.getpid) == os.getpid()
+
+    def test_run__enabled_runs_in_worker_process(self):
+        process_pool.configure(1)
+        assert process_pool.get_process_pool() is not None
+        assert process_pool.run(os.getpid) != os.getpid()
+        assert process_pool.run(max, 1, 2) == 2
+
+    @patch("sceptre_migration_tool.process_pool._get_start_context")
+    @patch("sceptre_migration_tool.process_pool.ProcessPoolExecutor")
+    def test_configure(
+            self, mock_ProcessPoolExecutor, mock_get_start_context):
+        process_pool.configure(4)
+        mock_ProcessPoolExecutor.assert_called_once_with(
+            max_workers=4, mp_context=mock_get_start_context.return_value
+        )
+        mock_ProcessPoolExecutor.return_value.submit.assert_not_called()
+        mock_ProcessPoolExecutor.return_value.submit.return_value.result\
+            .return_value = sentinel.result
+        assert process_pool.run(max, 1, 2) == sentinel.result
+        mock_ProcessPoolExecutor.return_value.submit.assert_called_once_with(
+            max, 1, 2
+        )
+        process_pool._process_pool = None
+
+    @patch("sceptre_migration_tool.process_pool._get_start_context")
+    @patch("sceptre_migration_tool.process_pool.ProcessPoolExecutor")
+    def test_configure__no_start_context_starts_workers(
+            self, mock_ProcessPoolExecutor, mock_get_start_context):
+        mock_get_start_context.return_value = None
+        process_pool.configure(4)
+        mock_ProcessPoolExecutor.assert_called_once_with(max_workers=4)
+        mock_ProcessPoolExecutor.return_value.submit.assert_called_once_with(
+            os.getpid
+        )
+        process_pool._process_pool = None
+
+    def test_get_start_context__does_not_fork(self):
+        context = process_pool._get_start_context()
+        if context is not None:
+            assert context.get_start_method() in ("forkserver", "spawn")
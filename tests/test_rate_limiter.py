@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+from mock import patch
+
+from sceptre_migration_tool import rate_limiter
+from sceptre_migration_tool.rate_limiter import AdaptiveRateLimiter
+
+
+class TestAdaptiveRateLimiter(object):
+
+    def setup_method(self, test_method):
+        self.rate_limiter = AdaptiveRateLimiter(
+            'fake-name', rate=10.0, min_rate=1.0, max_rate=12.0,
+            increase=1.0, decrease=0.5
+        )
+
+    def test_acquire__token_available(self):
+        self.rate_limiter.acquire()
+        assert 1 == self.rate_limiter.calls
+        assert self.rate_limiter.wait_time < 0.05
+
+    @patch("sceptre_migration_tool.rate_limiter.time.sleep")
+    @patch("sceptre_migration_tool.rate_limiter.time.time")
+    def test_acquire__waits_for_token(self, mock_time, mock_sleep):
+        clock = [100.0]
+        mock_time.side_effect = lambda: clock[0]
+
+        def _sleep(delay):
+            clock[0] += delay
+        mock_sleep.side_effect = _sleep
+
+        self.rate_limiter._updated = clock[0]
+        self.rate_limiter._tokens = 0.0
+        self.rate_limiter.acquire()
+
+        mock_sleep.assert_called_once_with(0.1)
+        assert 1 == self.rate_limiter.calls
+        assert abs(self.rate_limiter.wait_time - 0.1) < 1e-9
+
+    def test_succeeded__additive_increase(self):
+        self.rate_limiter.succeeded()
+        assert 11.0 == self.rate_limiter.rate
+        self.rate_limiter.succeeded()
+        self.rate_limiter.succeeded()
+        assert 12.0 == self.rate_limiter.rate
+
+    def test_throttled__multiplicative_decrease(self):
+        self.rate_limiter.throttled()
+        assert 5.0 == self.rate_limiter.rate
+        assert 0.0 == self.rate_limiter._tokens
+        assert 1 == self.rate_limiter.throttles
+        for _ in range(5):
+            self.rate_limiter.throttled()
+        assert 1.0 == self.rate_limiter.rate
+
+
+class TestGetRateLimiter(object):
+
+    def setup_method(self, test_method):
+        rate_limiter.rate_limiters.clear()
+
+    def test_shared_per_account_region_and_service(self):
+        result1 = rate_limiter.get_rate_limiter(
+            'fake-region', 'fake-profile', None, 'cloudformation'
+        )
+        result2 = rate_limiter.get_rate_limiter(
+            'fake-region', 'fake-profile', None, 'cloudformation'
+        )
+        result3 = rate_limiter.get_rate_limiter(
+            'fake-region', 'fake-profile', None, 'sts'
+        )
+        assert result1 is result2
+        assert result1 is not result3
+        assert 'fake-region/fake-profile/cloudformation' == result1.name
+
+    @patch("sceptre_migration_tool.rate_limiter.AdaptiveRateLimiter"
+           ".log_statistics")
+    def test_log_statistics__only_used_limiters(self, mock_log_statistics):
+        used = rate_limiter.get_rate_limiter(
+            'fake-region', None, None, 'cloudformation'
+        )
+        rate_limiter.get_rate_limiter('fake-region', None, None, 'sts')
+        used.calls = 3
+
+        rate_limiter.log_statistics()
+
+        mock_log_statistics.assert_called_once_with()
+
+    def test_log_statistics__reports_waiting(self):
+        limiter = rate_limiter.get_rate_limiter(
+            'fake-region', None, None, 'cloudformation'
+        )
+        limiter.calls = 4
+        limiter.throttles = 1
+        limiter.wait_time = 2.5
+        with patch.object(limiter.logger, "info") as mock_info:
+            rate_limiter.log_statistics()
+        args = mock_info.call_args[0]
+        assert args[1:] == ('fake-region/cloudformation', 4, 1, 2.5, 5.0)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+from mock import sentinel, Mock, patch
+
+from sceptre_migration_tool import resolver_registry
+from sceptre_migration_tool.resolver_registry import \
+    get_reverse_resolver_entry_points, LazyReverseResolver, \
+    ENTRY_POINT_GROUP
+
+
+class TestGetReverseResolverEntryPoints(object):
+
+    def setup_method(self):
+        resolver_registry._entry_points = None
+
+    def teardown_method(self):
+        resolver_registry._entry_points = None
+
+    @patch("pkg_resources.iter_entry_points")
+    def test_get_reverse_resolver_entry_points(self, mock_iter_entry_points):
+        mock_iter_entry_points.return_value = iter([sentinel.entry_point])
+        assert get_reverse_resolver_entry_points() == [sentinel.entry_point]
+        assert get_reverse_resolver_entry_points() == [sentinel.entry_point]
+        mock_iter_entry_points.assert_called_once_with(ENTRY_POINT_GROUP)
+
+
+class TestLazyReverseResolver(object):
+
+    def setup_method(self):
+        self.mock_resolver = Mock()
+        self.mock_resolver_class = Mock(return_value=self.mock_resolver)
+        self.entry_point = Mock()
+        self.entry_point.name = "fake_resolver@15"
+        self.entry_point.resolve.return_value = self.mock_resolver_class
+        self.lazy_resolver = LazyReverseResolver(
+            sentinel.migration_environment, self.entry_point
+        )
+
+    def test_init__not_loaded(self):
+        assert self.lazy_resolver.name == "fake_resolver"
+        assert self.lazy_resolver.precendence() == 15
+        self.entry_point.resolve.assert_not_called()
+
+    def test_traits__none(self):
+        self.entry_point.name = "fake_resolver@15:none"
+        lazy_resolver = LazyReverseResolver(
+            sentinel.migration_environment, self.entry_point
+        )
+        assert lazy_resolver.name == "fake_resolver"
+        assert lazy_resolver.precendence() == 15
+        assert lazy_resolver.reverse_lookup_table() is None
+        assert lazy_resolver.depends_on_context("value") is False
+        self.entry_point.resolve.assert_not_called()
+
+    def test_traits__declared(self):
+        self.entry_point.name = "fake_resolver@15:table, context"
+        self.mock_resolver.reverse_lookup_table.return_value = sentinel.table
+        self.mock_resolver.depends_on_context.return_value = True
+        lazy_resolver = LazyReverseResolver(
+            sentinel.migration_environment, self.entry_point
+        )
+        assert lazy_resolver.reverse_lookup_table() == sentinel.table
+        assert lazy_resolver.depends_on_context("value") is True
+
+    def test_traits__table_only(self):
+        self.entry_point.name = "fake_resolver@15:table"
+        lazy_resolver = LazyReverseResolver(
+            sentinel.migration_environment, self.entry_point
+        )
+        assert lazy_resolver.depends_on_context("value") is False
+        self.entry_point.resolve.assert_not_called()
+
+    def test_registers(self):
+        self.entry_point.module_name = "fake_package.fake_module"
+        self.entry_point.attrs = ("FakeResolver",)
+        fake_class = type("FakeResolver", (object,), {})
+        fake_class.__module__ = "fake_module"
+        other_class = type("OtherResolver", (object,), {})
+        assert self.lazy_resolver.registers("fake_resolver", other_class)
+        assert self.lazy_resolver.registers("other_name", fake_class)
+        assert not self.lazy_resolver.registers("other_name", other_class)
+        self.entry_point.resolve.assert_not_called()
+
+    def test_precendence__without_metadata(self):
+        self.entry_point.name = "fake_resolver"
+        self.mock_resolver.precendence.return_value = 42
+        lazy_resolver = LazyReverseResolver(
+            sentinel.migration_environment, self.entry_point
+        )
+        assert lazy_resolver.name == "fake_resolver"
+        assert lazy_resolver.precendence() == 42
+
+    def test_suggest__loads_once(self):
+        self.mock_resolver.suggest.return_value = "fake-suggestion"
+        assert self.lazy_resolver.suggest("value") == "fake-suggestion"
+        self.lazy_resolver.suggest("value")
+        self.entry_point.resolve.assert_called_once_with()
+        self.mock_resolver_class.assert_called_once_with(
+            sentinel.migration_environment
+        )
+
+    def test_delegates(self):
+        self.mock_resolver.suggest_many.return_value = sentinel.suggestions
+        self.mock_resolver.reverse_lookup_table.return_value = sentinel.table
+        self.mock_resolver.depends_on_context.return_value = True
+        assert self.lazy_resolver.suggest_many(["value"]) == \
+            sentinel.suggestions
+        assert self.lazy_resolver.reverse_lookup_table() == sentinel.table
+        assert self.lazy_resolver.depends_on_context("value") is True
+        self.mock_resolver.suggest_many.assert_called_once_with(["value"])
+        self.mock_resolver.depends_on_context.assert_called_once_with(
+            "value"
+        )
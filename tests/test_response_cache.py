@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+import shutil
+import tempfile
+
+from dateutil.tz import tzutc
+from mock import patch
+
+from sceptre_migration_tool import response_cache
+from sceptre_migration_tool.response_cache import ResponseCache
+
+
+class TestResponseCache(object):
+
+    def setup_method(self, test_method):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = ResponseCache(self.cache_dir, ttl=60)
+        self.key = (
+            'fake-region', 'fake-profile', None,
+            'cloudformation', 'describe_stacks', {'StackName': 'fake-stack'}
+        )
+
+    def teardown_method(self, test_method):
+        shutil.rmtree(self.cache_dir)
+
+    def test_get__missing(self):
+        assert self.cache.get(self.key) is None
+
+    def test_put_then_get(self):
+        response = {
+            'Stacks': [{
+                'StackName': 'fake-stack',
+                'CreationTime': datetime(2017, 1, 2, 3, 4, 5, tzinfo=tzutc())
+            }]
+        }
+        self.cache.put(self.key, response)
+        assert response == self.cache.get(self.key)
+
+    def test_get__keeps_key_order(self):
+        self.cache.put(self.key, {'b': 1, 'a': 2, 'c': 3})
+        assert ['b', 'a', 'c'] == list(self.cache.get(self.key).keys())
+
+    def test_get__other_key(self):
+        self.cache.put(self.key, {'fake': 'response'})
+        other_key = self.key[:-1] + ({'StackName': 'other-stack'},)
+        assert self.cache.get(other_key) is None
+
+    @patch("sceptre_migration_tool.response_cache.time.time")
+    def test_get__expired(self, mock_time):
+        mock_time.return_value = 1000.0
+        self.cache.put(self.key, {'fake': 'response'})
+        mock_time.return_value = 1059.0
+        assert {'fake': 'response'} == self.cache.get(self.key)
+        mock_time.return_value = 1061.0
+        assert self.cache.get(self.key) is None
+
+    @patch("sceptre_migration_tool.response_cache.time.time")
+    def test_get__versioned_does_not_expire(self, mock_time):
+        mock_time.return_value = 1000.0
+        self.cache.put(self.key, {'fake': 'response'}, 'fake-version')
+        mock_time.return_value = 100000.0
+        assert {'fake': 'response'} == \
+            self.cache.get(self.key, 'fake-version')
+
+    def test_get__other_version(self):
+        self.cache.put(self.key, {'fake': 'response'}, 'fake-version')
+        assert self.cache.get(self.key, 'other-version') is None
+        assert self.cache.get(self.key) is None
+
+    def test_get__refresh(self):
+        self.cache.put(self.key, {'fake': 'response'})
+        self.cache.refresh = True
+        assert self.cache.get(self.key) is None
+
+    def test_get__corrupt_file(self):
+        self.cache.put(self.key, {'fake': 'response'})
+        with open(self.cache._get_path(self.key), 'wb') as cache_file:
+            cache_file.write(b'not gzip')
+        assert self.cache.get(self.key) is None
+
+    def test_configure(self):
+        try:
+            response_cache.configure(self.cache_dir, 10, True)
+            cache = response_cache.get_response_cache()
+            assert self.cache_dir == cache.cache_dir
+            assert 10 == cache.ttl
+            assert cache.refresh is True
+        finally:
+            response_cache._response_cache = None
@@ -96,3 +96,15 @@ class TestReverseExports(object):
                 command="list_exports",
                 kwargs={'NextToken': 'fake-next'}
         )
+
+    @patch("sceptre_migration_tool.reverse_resolvers.reverse_exports."
+           "ReverseExports._get_exports")
+    def test_reverse_lookup_table(self, mock_get_exports):
+        mock_get_exports.return_value = {'fake-key': 'fake-value'}
+        assert {'fake-key': 'fake-value'} == \
+            self.reverse_exporter.reverse_lookup_table()
+        self.reverse_exporter.suggest('fake-key')
+        mock_get_exports.assert_called_once_with()
+
+    def test_depends_on_context(self):
+        assert self.reverse_exporter.depends_on_context('fake-key') is False
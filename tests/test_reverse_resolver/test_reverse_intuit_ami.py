@@ -53,3 +53,6 @@ class TestReverseIntuitAmi(object):
 
     def test_suggest8(self):
         assert self.reverse_intuit_ami.suggest("ami-6f46da0f") == '!intuit_ami'
+
+    def test_depends_on_context(self):
+        assert self.reverse_intuit_ami.depends_on_context("ami-1") is False
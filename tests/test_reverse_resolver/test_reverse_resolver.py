@@ -50,3 +50,14 @@ class TestReverseResolver(object):
             .environment_config == self.mock_environment_config
         assert self.reverse_exporter.precendence() == 99
         assert self.reverse_exporter.suggest("value") is None
+
+    def test_depends_on_context(self):
+        # Resolvers may read the resolution context unless they say not
+        assert self.reverse_exporter.depends_on_context("value") is True
+
+    def test_suggest_many(self):
+        self.reverse_exporter.mock_suggtestion = 'fake-suggestion'
+        assert {
+            'value1': 'fake-suggestion',
+            'value2': 'fake-suggestion'
+        } == self.reverse_exporter.suggest_many(['value1', 'value2'])
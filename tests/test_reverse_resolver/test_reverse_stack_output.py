@@ -237,9 +237,9 @@ class TestReverseStackOutput(object):
     @patch("sceptre_migration_tool.reverse_resolvers.reverse_stack_output."
            "ReverseStackOutput._build_reverse_lookup")
     def test__get_stack_output__good(self, mock_build_reverse_lookup):
-        self.mock_stack1 = Mock()
-        self.mock_stack2 = Mock()
-        self.mock_stack3 = Mock()
+        self.mock_stack1 = {'StackName': 'fake-stack1'}
+        self.mock_stack2 = {'StackName': 'fake-stack2'}
+        self.mock_stack3 = {'StackName': 'fake-stack3'}
         self.mock_connection_manager.call.side_effect = [
             {
                 'Stacks': [
@@ -316,3 +316,44 @@ class TestReverseStackOutput(object):
         assert result == 'fake-external-key'
 
         mock_get_stack_output.assert_called_once()
+
+    @patch("sceptre_migration_tool.reverse_resolvers.reverse_stack_output."
+           "ReverseStackOutput._get_stack_output")
+    def test_depends_on_context(self, mock_get_stack_output):
+        def _get_stack_output_side_effect():
+            self.reverse_stack_output._stack_output = {
+                'fake-internal-value': ('fake-stack-name', 'fake-key')
+            }
+            self.reverse_stack_output._stack_output_external = {
+                'fake-external-value': ('fake-stack-name', 'fake-key')
+            }
+        mock_get_stack_output.side_effect = _get_stack_output_side_effect
+
+        assert self.reverse_stack_output\
+            .depends_on_context('fake-internal-value')
+        assert not self.reverse_stack_output\
+            .depends_on_context('fake-external-value')
+        mock_get_stack_output.assert_called_once()
+
+    @patch("sceptre_migration_tool.reverse_resolvers.reverse_stack_output."
+           "ReverseStackOutput._get_stack_output")
+    def test_reverse_lookup_table__external(self, mock_get_stack_output):
+        def _get_stack_output_side_effect():
+            self.reverse_stack_output._stack_output = {}
+            self.reverse_stack_output._stack_output_external = {
+                'fake-value': ('fake-stack-name', 'fake-external-key')
+            }
+        mock_get_stack_output.side_effect = _get_stack_output_side_effect
+        assert {'fake-value': 'fake-external-key'} == \
+            self.reverse_stack_output.reverse_lookup_table()
+
+    @patch("sceptre_migration_tool.reverse_resolvers.reverse_stack_output."
+           "ReverseStackOutput._get_stack_output")
+    def test_reverse_lookup_table__internal(self, mock_get_stack_output):
+        def _get_stack_output_side_effect():
+            self.reverse_stack_output._stack_output = {
+                'fake-value': ('fake-stack-name', 'fake-internal-key')
+            }
+            self.reverse_stack_output._stack_output_external = {}
+        mock_get_stack_output.side_effect = _get_stack_output_side_effect
+        assert self.reverse_stack_output.reverse_lookup_table() is None
@@ -26,7 +26,7 @@ class TestStack(object):
     @patch("sceptre_migration_tool.stack.import_config")
     @patch("sceptre_migration_tool.stack.import_template")
     def test_import_stack(self, mock_template, mock_config, mock_stack):
-        mock_template.return_value = Mock()
+        mock_template.return_value = (Mock(), {'Key': 'Value'})
         mock_connection_manager =\
             self.migration_environment.connection_manager
         mock_environment_config =\
@@ -53,7 +53,8 @@ class TestStack(object):
             self.migration_environment,
             'fake-aws-stack-name',
             'fake-config-path',
-            mock_template.return_value
+            mock_template.return_value[0],
+            {'Key': 'Value'}
         )
 
         mock_stack.assert_called_once_with(
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+from mock import Mock, sentinel
+
+from sceptre_migration_tool.stack_inventory import StackInventory, \
+    STACK_STATUS_FILTER
+
+
+class TestStackInventory(object):
+
+    def setup_method(self, test_method):
+        self.mock_connection_manager = Mock()
+        self.stack_inventory = StackInventory(self.mock_connection_manager)
+
+    def test_config_correctly_initialised(self):
+        assert self.stack_inventory.connection_manager == \
+            self.mock_connection_manager
+        assert not self.stack_inventory.is_loaded
+
+    def test_stacks__paged(self):
+        self.mock_connection_manager.call.side_effect = [
+            {
+                'Stacks': [
+                    {'StackName': 'fake-stack1'},
+                    {'StackName': 'fake-stack2'}
+                ],
+                'NextToken': 'fake-next-token'
+            },
+            {
+                'Stacks': [
+                    {'StackName': 'fake-stack3'}
+                ]
+            }
+        ]
+        result = self.stack_inventory.stacks
+        assert result == [
+            {'StackName': 'fake-stack1'},
+            {'StackName': 'fake-stack2'},
+            {'StackName': 'fake-stack3'}
+        ]
+        assert self.stack_inventory.is_loaded
+        self.mock_connection_manager.call.assert_any_call(
+            service='cloudformation',
+            command='describe_stacks',
+            kwargs={}
+        )
+        self.mock_connection_manager.call.assert_any_call(
+            service='cloudformation',
+            command='describe_stacks',
+            kwargs={'NextToken': 'fake-next-token'}
+        )
+
+    def test_stacks__loaded_once(self):
+        self.mock_connection_manager.call.return_value = {
+            'Stacks': [{'StackName': 'fake-stack1'}]
+        }
+        self.stack_inventory.stacks
+        self.stack_inventory.stacks
+        self.mock_connection_manager.call.assert_called_once()
+
+    def test_describe_stack__not_loaded(self):
+        self.mock_connection_manager.call.return_value = {
+            'Stacks': [{'StackName': 'fake-stack1'}]
+        }
+        result = self.stack_inventory.describe_stack('fake-stack1')
+        assert result == {'StackName': 'fake-stack1'}
+        assert not self.stack_inventory.is_loaded
+        self.mock_connection_manager.call.assert_called_once_with(
+            service='cloudformation',
+            command='describe_stacks',
+            kwargs={'StackName': 'fake-stack1'}
+        )
+
+    def test_describe_stack__loaded(self):
+        self.mock_connection_manager.call.return_value = {
+            'Stacks': [{'StackName': 'fake-stack1', 'Parameters': []}]
+        }
+        self.stack_inventory.load()
+        result = self.stack_inventory.describe_stack('fake-stack1')
+        assert result == {'StackName': 'fake-stack1', 'Parameters': []}
+        self.mock_connection_manager.call.assert_called_once_with(
+            service='cloudformation',
+            command='describe_stacks',
+            kwargs={}
+        )
+
+    def test_stack_names__paged_and_listed_once(self):
+        self.mock_connection_manager.call.side_effect = [
+            {
+                'StackSummaries': [
+                    {'StackName': 'fake-stack1'},
+                    {'StackName': 'fake-stack2'}
+                ],
+                'NextToken': 'fake-next-token'
+            },
+            {
+                'StackSummaries': [{'StackName': 'fake-stack3'}]
+            }
+        ]
+        self.stack_inventory.stack_names
+        result = self.stack_inventory.stack_names
+        assert result == ['fake-stack1', 'fake-stack2', 'fake-stack3']
+        assert not self.stack_inventory.is_loaded
+        assert 2 == self.mock_connection_manager.call.call_count
+        self.mock_connection_manager.call.assert_any_call(
+            service='cloudformation',
+            command='list_stacks',
+            kwargs={'StackStatusFilter': STACK_STATUS_FILTER}
+        )
+        self.mock_connection_manager.call.assert_any_call(
+            service='cloudformation',
+            command='list_stacks',
+            kwargs={
+                'StackStatusFilter': STACK_STATUS_FILTER,
+                'NextToken': 'fake-next-token'
+            }
+        )
+        assert 'DELETE_COMPLETE' not in STACK_STATUS_FILTER
+
+    def test_stack_names__loaded(self):
+        self.mock_connection_manager.call.return_value = {
+            'Stacks': [{'StackName': 'fake-stack1'}]
+        }
+        self.stack_inventory.load()
+        result = self.stack_inventory.stack_names
+        assert result == ['fake-stack1']
+        self.mock_connection_manager.call.assert_called_once_with(
+            service='cloudformation',
+            command='describe_stacks',
+            kwargs={}
+        )
+
+    def test_iter_stack_name_pages(self):
+        self.mock_connection_manager.call.side_effect = [
+            {
+                'StackSummaries': [
+                    {'StackName': 'fake-stack1'},
+                    {'StackName': 'fake-stack2'}
+                ],
+                'NextToken': 'fake-next-token'
+            },
+            {
+                'StackSummaries': [{'StackName': 'fake-stack3'}]
+            }
+        ]
+        result = list(self.stack_inventory.iter_stack_name_pages())
+        assert result == [['fake-stack1', 'fake-stack2'], ['fake-stack3']]
+        self.mock_connection_manager.call.assert_any_call(
+            service='cloudformation',
+            command='list_stacks',
+            kwargs={
+                'StackStatusFilter': STACK_STATUS_FILTER,
+                'NextToken': 'fake-next-token'
+            }
+        )
+
+        # Listed once, then served as a single page
+        assert self.stack_inventory.stack_names == \
+            ['fake-stack1', 'fake-stack2', 'fake-stack3']
+        assert list(self.stack_inventory.iter_stack_name_pages()) == \
+            [['fake-stack1', 'fake-stack2', 'fake-stack3']]
+        assert 2 == self.mock_connection_manager.call.call_count
+
+    def test_get_stack_version(self):
+        self.mock_connection_manager.call.return_value = {
+            'StackSummaries': [
+                {
+                    'StackName': 'fake-stack1',
+                    'CreationTime': sentinel.created1
+                },
+                {
+                    'StackName': 'fake-stack2',
+                    'CreationTime': sentinel.created2,
+                    'LastUpdatedTime': sentinel.updated2
+                }
+            ]
+        }
+        assert self.stack_inventory.get_stack_version('fake-stack1') == \
+            sentinel.created1
+        assert self.stack_inventory.get_stack_version('fake-stack2') == \
+            sentinel.updated2
+        assert self.stack_inventory.get_stack_version('fake-stack3') is None
+        self.mock_connection_manager.call.assert_called_once_with(
+            service='cloudformation',
+            command='list_stacks',
+            kwargs={'StackStatusFilter': STACK_STATUS_FILTER}
+        )
+
+    def test_exports__paged_and_loaded_once(self):
+        self.mock_connection_manager.call.side_effect = [
+            {
+                'Exports': [{'Name': 'fake-key1', 'Value': 'fake-value1'}],
+                'NextToken': 'fake-next'
+            },
+            {
+                'Exports': [{'Name': 'fake-key2', 'Value': 'fake-value2'}]
+            }
+        ]
+        self.stack_inventory.exports
+        result = self.stack_inventory.exports
+        assert result == [
+            {'Name': 'fake-key1', 'Value': 'fake-value1'},
+            {'Name': 'fake-key2', 'Value': 'fake-value2'}
+        ]
+        assert 2 == self.mock_connection_manager.call.call_count
+        self.mock_connection_manager.call.assert_any_call(
+            service='cloudformation',
+            command='list_exports',
+            kwargs={'NextToken': 'fake-next'}
+        )
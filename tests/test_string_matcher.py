@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+from mock import patch
+
+from sceptre_migration_tool.string_matcher import MultiStringMatcher
+
+
+class TestMultiStringMatcher(object):
+
+    def test_sub__no_strings(self):
+        assert 'fake-text' == MultiStringMatcher({}).sub('fake-text')
+
+    def test_sub__empty_text(self):
+        assert '' == MultiStringMatcher({'a': 'b'}).sub('')
+
+    def test_sub__no_match(self):
+        assert 'fake-text' == MultiStringMatcher({'xyz': 'b'}).sub('fake-text')
+
+    def test_sub__whole_text(self):
+        assert 'B' == MultiStringMatcher({'abc': 'B'}).sub('abc')
+
+    def test_sub__several_matches(self):
+        matcher = MultiStringMatcher({'vpc-1': 'VPC', 'us-west-2': 'REGION'})
+        assert 'bucket-VPC-REGION-VPC' == \
+            matcher.sub('bucket-vpc-1-us-west-2-vpc-1')
+
+    def test_sub__longest_match(self):
+        matcher = MultiStringMatcher({'ab': 'X', 'abc': 'Y', 'b': 'Z'})
+        assert 'Y' == matcher.sub('abc')
+        assert 'XX' == matcher.sub('abab')
+
+    def test_sub__leftmost_match(self):
+        matcher = MultiStringMatcher({'abc': 'X', 'cde': 'Y'})
+        assert 'Xde' == matcher.sub('abcde')
+
+    def test_sub__overlapping_suffixes(self):
+        matcher = MultiStringMatcher({'she': '1', 'he': '2', 'hers': '3'})
+        assert 'u1rs' == matcher.sub('ushers')
+        assert '3' == matcher.sub('hers')
+
+    def test_sub__ignores_empty_string(self):
+        matcher = MultiStringMatcher({'': 'X', 'a': 'Y'})
+        assert 'bYb' == matcher.sub('bab')
+        assert 1 == len(matcher)
+
+    def test_sub__agrees_with_longest_first_regex(self):
+        replacements = {
+            '10.0.0.1': 'A', '10.0.0.10': 'B', '0.0': 'C',
+            '123456789012': 'D', '2345': 'E', 'subnet-1': 'F'
+        }
+        pattern = re.compile('|'.join(
+            re.escape(string)
+            for string in sorted(replacements, key=len, reverse=True)
+        ))
+        matcher = MultiStringMatcher(replacements)
+        for text in [
+            '10.0.0.10,10.0.0.1', 'arn:aws:iam::123456789012:role/x',
+            'subnet-10.0.0.0/16', '0.0.0.0/0', '12345', 'subnet-12345'
+        ]:
+            assert pattern.sub(
+                lambda match: replacements[match.group(0)], text
+            ) == matcher.sub(text)
+
+
+class TestMultiStringMatcher_automaton(TestMultiStringMatcher):
+    """
+    Runs every test above against the automaton, which is otherwise only
+    built for large sets of strings.
+    """
+
+    def setup_method(self, test_method):
+        self.threshold_patcher = patch.object(
+            MultiStringMatcher, 'AUTOMATON_THRESHOLD', 0
+        )
+        self.threshold_patcher.start()
+
+    def teardown_method(self, test_method):
+        self.threshold_patcher.stop()
+
+    def test_uses_automaton(self):
+        assert MultiStringMatcher({'a': 'b'})._pattern is None
+
+
+class TestMultiStringMatcher_threshold(object):
+
+    def test_small_set_uses_pattern(self):
+        matcher = MultiStringMatcher({'a': 'b'})
+        assert matcher._pattern is not None
+        assert not hasattr(matcher, '_goto')
+
+    def test_large_set_uses_automaton(self):
+        matcher = MultiStringMatcher({
+            'value{}'.format(i): 'X'
+            for i in range(MultiStringMatcher.AUTOMATON_THRESHOLD)
+        })
+        assert matcher._pattern is None
+        assert 'X-X' == matcher.sub('value1-value10')
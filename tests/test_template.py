@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 
+from collections import OrderedDict
+from datetime import datetime
 import json
+import os
+import shutil
+import tempfile
+import threading
+import time
 
 import pytest
 from mock import patch, Mock
@@ -8,9 +15,14 @@ from mock import patch, Mock
 from sceptre.connection_manager import ConnectionManager
 from sceptre.exceptions import UnsupportedTemplateFileTypeError
 
+from sceptre_migration_tool import connection_manager as \
+    migration_connection_manager
 from sceptre_migration_tool import template
 from sceptre_migration_tool.exceptions import ImportFailureError
+from sceptre_migration_tool.manifest import Manifest
 from sceptre_migration_tool.migration_environment import MigrationEnvironment
+from sceptre_migration_tool.response_cache import ResponseCache
+from sceptre_migration_tool.stack_inventory import StackInventory
 
 
 class TestTemplate(object):
@@ -26,10 +38,11 @@ class TestTemplate(object):
         self.migration_environment = MigrationEnvironment(
             connection_manager, environment_config)
 
+    @patch("sceptre_migration_tool.template.get_manifest")
     @patch("sceptre_migration_tool.template._write_template")
     @patch("sceptre_migration_tool.template._normalize_template_for_write")
     def test_import_template__json_template_new_json_target(
-            self, mock_normalize, mock_write):
+            self, mock_normalize, mock_write, mock_get_manifest):
         fake_template_body = {
             'TemplateBody': {
                 'Key': 'Value'
@@ -62,9 +75,170 @@ class TestTemplate(object):
             '.json'
         )
 
+        mock_get_manifest.assert_called_once_with('fake-spectre-dir')
         mock_write.assert_called_once_with(
             'fake-spectre-dir/templates/fake-template-path.json',
-            fake_template_body_string
+            fake_template_body_string,
+            mock_get_manifest.return_value
+        )
+
+    @patch("sceptre_migration_tool.template.get_manifest")
+    @patch("sceptre_migration_tool.template._write_template")
+    @patch("sceptre_migration_tool.template.get_response_cache")
+    def test_import_template__cached_by_stack_update_time(
+            self, mock_get_cache, mock_write, mock_get_manifest):
+        self.migration_environment.stack_inventory = Mock()
+        self.migration_environment.stack_inventory.get_stack_version\
+            .return_value = datetime(2017, 2, 1)
+        mock_connection_manager =\
+            self.migration_environment.connection_manager
+        mock_connection_manager.call.return_value = {
+            'TemplateBody': 'fake: body'
+        }
+
+        template.import_template(
+            self.migration_environment,
+            'fake-aws-stack-name',
+            'templates/fake-template-path.yaml'
+        )
+
+        mock_connection_manager.call.assert_called_once_with(
+            service='cloudformation',
+            command='get_template',
+            kwargs={
+                'StackName': 'fake-aws-stack-name',
+                'TemplateStage': 'Original'
+            },
+            cache_version='2017-02-01T00:00:00'
+        )
+
+    @patch("sceptre_migration_tool.template.get_manifest")
+    @patch("sceptre_migration_tool.template._write_template")
+    @patch("sceptre_migration_tool.template.get_response_cache")
+    def test_import_template__unlisted_stack_not_cached(
+            self, mock_get_cache, mock_write, mock_get_manifest):
+        self.migration_environment.stack_inventory = Mock()
+        self.migration_environment.stack_inventory.get_stack_version\
+            .return_value = None
+        mock_connection_manager =\
+            self.migration_environment.connection_manager
+        mock_connection_manager.call.return_value = {
+            'TemplateBody': 'fake: body'
+        }
+
+        template.import_template(
+            self.migration_environment,
+            'fake-aws-stack-name',
+            'templates/fake-template-path.yaml'
+        )
+
+        assert mock_connection_manager.call.call_args[1]['cache_version'] \
+            is None
+
+    @patch("sceptre_migration_tool.template.get_manifest")
+    @patch("sceptre_migration_tool.template._write_template")
+    def test_import_template__stack_updated_within_ttl(
+            self, mock_write, mock_get_manifest):
+        cache = ResponseCache(tempfile.mkdtemp(), ttl=3600)
+        stack = {
+            'StackName': 'fake-aws-stack-name',
+            'CreationTime': datetime(2017, 1, 1)
+        }
+        responses = {
+            'describe_stacks': {'Stacks': [stack]},
+            'list_stacks': {'StackSummaries': [stack]},
+            'get_template': {'TemplateBody': 'version: 1\n'}
+        }
+
+        def fake_call(service, command, kwargs):
+            return responses[command]
+
+        def run():
+            connection_manager = \
+                migration_connection_manager.ConnectionManager('fake-region')
+            connection_manager._call = Mock(side_effect=fake_call)
+            self.migration_environment.connection_manager = \
+                connection_manager
+            self.migration_environment.stack_inventory = \
+                StackInventory(connection_manager)
+            # The cached description is read first, as the resolvers do
+            self.migration_environment.stack_inventory.load()
+            template.import_template(
+                self.migration_environment,
+                'fake-aws-stack-name',
+                'templates/fake-template-path.yaml'
+            )
+            return mock_write.call_args[0][1]
+
+        try:
+            with patch(
+                "sceptre_migration_tool.template.get_response_cache",
+                return_value=cache
+            ), patch(
+                "sceptre_migration_tool.connection_manager"
+                ".get_response_cache",
+                return_value=cache
+            ):
+                assert 'version: 1\n' == run()
+                # Updated within the time-to-live of the cached description
+                updated_stack = dict(
+                    stack, LastUpdatedTime=datetime(2017, 2, 1)
+                )
+                responses['list_stacks'] = {
+                    'StackSummaries': [updated_stack]
+                }
+                responses['get_template'] = {'TemplateBody': 'version: 2\n'}
+                assert 'version: 2\n' == run()
+        finally:
+            shutil.rmtree(cache.cache_dir)
+
+    @patch("sceptre_migration_tool.template.get_manifest")
+    @patch("sceptre_migration_tool.template._write_template")
+    def test_import_template__keeps_parsed_body(
+            self, mock_write, mock_get_manifest):
+        self.migration_environment.connection_manager.call.return_value = {
+            'TemplateBody': 'Parameters: {Key: {Default: Value}}\n'
+        }
+
+        result, template_body = template.import_template(
+            self.migration_environment,
+            'fake-aws-stack-name',
+            'templates/fake-template-path.json'
+        )
+
+        assert {'Parameters': {'Key': {'Default': 'Value'}}} == template_body
+        assert 'templates/fake-template-path.json' == \
+            result.relative_template_path
+        assert not hasattr(result, 'imported_body')
+
+    @patch("sceptre_migration_tool.template.process_pool.run")
+    def test__run_cpu_bound__small_template_in_thread(self, mock_run):
+        result = template._run_cpu_bound(
+            template._prepare_template, 'Key: Value\n', 'Key: Value\n',
+            '.json'
+        )
+        assert result == ({'Key': 'Value'}, '{"Key": "Value"}')
+        mock_run.assert_not_called()
+
+    @patch("sceptre_migration_tool.template.process_pool.run")
+    def test__run_cpu_bound__large_template_in_pool(self, mock_run):
+        body = 'Key: ' + 'x' * template.LARGE_TEMPLATE_SIZE + '\n'
+        result = template._run_cpu_bound(
+            template._prepare_template, body, body, '.yaml'
+        )
+        assert result == mock_run.return_value
+        mock_run.assert_called_once_with(
+            template._prepare_template, body, '.yaml'
+        )
+
+    @patch("sceptre_migration_tool.template.process_pool.run")
+    def test__run_cpu_bound__dict_template_in_pool(self, mock_run):
+        body = {'Key': 'Value'}
+        template._run_cpu_bound(
+            template._prepare_template, body, body, '.yaml'
+        )
+        mock_run.assert_called_once_with(
+            template._prepare_template, body, '.yaml'
         )
 
     def test__normalize_template_for_write_json_to_json(self):
@@ -95,24 +269,39 @@ class TestTemplate(object):
         )
         assert result == 'Key: Value\n'
 
+    def test__normalize_template_for_write_short_form_yaml_to_json(self):
+        result = template._normalize_template_for_write(
+            'Value: !GetAtt Resource.Arn\n',
+            ".json"
+        )
+        assert json.loads(result) == \
+            {'Value': {'Fn::GetAtt': ['Resource', 'Arn']}}
+
+    def test__normalize_template_for_write_ordered_json_to_yaml(self):
+        result = template._normalize_template_for_write(
+            OrderedDict([('Resources', {}), ('Outputs', {})]),
+            ".yaml"
+        )
+        assert result == 'Resources: {}\nOutputs: {}\n'
+
     def test__normalize_template_for_write_yaml_to_unsupported(self):
         with pytest.raises(UnsupportedTemplateFileTypeError):
             template._normalize_template_for_write('Key: Value\n', ".txt")
 
-    @patch("sceptre_migration_tool.template.open")
+    @patch("sceptre_migration_tool.template.atomic_open")
     @patch("os.makedirs")
     @patch("os.path.isfile")
     def test__write_template__new_file(
-            self, mock_isfile, mock_makedirs, mock_open
+            self, mock_isfile, mock_makedirs, mock_atomic_open
     ):
         mock_isfile.return_value = False
 
         template._write_template('fake-path/fake-file', 'fake-body')
 
         mock_makedirs.assert_called_once_with('fake-path')
-        mock_open.called_once_with('fake-path')
-        mock_open.return_value.__enter__.return_value\
-            .write.called_once_with('fake-body/fake-file', 'w')
+        mock_atomic_open.assert_called_once_with('fake-path/fake-file')
+        mock_atomic_open.return_value.__enter__.return_value\
+            .write.assert_called_once_with('fake-body')
 
     @patch("sceptre_migration_tool.template.open")
     @patch("os.path.isfile")
@@ -123,11 +312,24 @@ class TestTemplate(object):
 
         template._write_template('fake-path', 'fake-body: !Ref value')
 
-        mock_open.called_once_with('fake-path', 'r')
-        mock_open.return_value.read.called_once()
+        mock_open.assert_called_once_with('fake-path', 'r')
         mock_open.return_value.__enter__.return_value\
             .write.assert_not_called()
 
+    @patch("sceptre_migration_tool.template.atomic_open")
+    @patch("sceptre_migration_tool.template.open")
+    @patch("os.path.isfile")
+    def test__write_template__existing_equivalent_file(
+            self, mock_isfile, mock_open, mock_atomic_open
+    ):
+        mock_isfile.return_value = True
+        mock_open.return_value.__enter__.return_value\
+            .read.return_value = '{"fake-body": {"Ref": "value"}}'
+
+        template._write_template('fake-path', 'fake-body: !Ref value\n')
+
+        mock_atomic_open.assert_not_called()
+
     @patch("sceptre_migration_tool.template.open")
     @patch("os.path.isfile")
     def test__write_template__existing_diff_file(self, mock_isfile, mock_open):
@@ -138,6 +340,263 @@ class TestTemplate(object):
         with pytest.raises(ImportFailureError):
             template._write_template('fake-path', 'fake-body')
 
-        mock_open.called_once_with('fake-path')
-        mock_open.return_value.read.called_once()
-        mock_open.write.assert_not_called()
+        mock_open.assert_called_once_with('fake-path', 'r')
+        mock_open.return_value.__enter__.return_value\
+            .write.assert_not_called()
+
+    def test__write_template__manifest_skips_unchanged(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, 'templates', 'fake.yaml')
+            fake_manifest = Manifest(
+                os.path.join(temp_dir, '.migration-manifest')
+            )
+            template._write_template(path, 'Key: Value\n', fake_manifest)
+            mtime = os.stat(path).st_mtime
+            with patch(
+                "sceptre_migration_tool.template.open"
+            ) as mock_open, patch(
+                "sceptre_migration_tool.template.atomic_open"
+            ) as mock_atomic_open:
+                template._write_template(path, 'Key: Value\n', fake_manifest)
+            mock_open.assert_not_called()
+            mock_atomic_open.assert_not_called()
+            assert mtime == os.stat(path).st_mtime
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test__write_template__identical_file_not_parsed(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, 'fake.yaml')
+            with open(path, 'w') as template_file:
+                template_file.write('Key: Value\n')
+            fake_manifest = Manifest(
+                os.path.join(temp_dir, '.migration-manifest')
+            )
+            with patch("sceptre_migration_tool.template.cfn_yaml.load") \
+                    as mock_load:
+                template._write_template(path, 'Key: Value\n', fake_manifest)
+            mock_load.assert_not_called()
+            assert fake_manifest.is_current(path, 'Key: Value\n')
+        finally:
+            shutil.rmtree(temp_dir)
+
+    @patch("sceptre_migration_tool.template.get_manifest")
+    @patch("sceptre_migration_tool.template._write_template")
+    @patch("sceptre_migration_tool.template._stream_template")
+    def test_import_template__streaming(
+            self, mock_stream, mock_write, mock_get_manifest):
+        self.migration_environment.connection_manager.call.return_value = {
+            'TemplateBody': 'Key: Value\n'
+        }
+        template.configure_streaming(True)
+        try:
+            _, template_body = template.import_template(
+                self.migration_environment,
+                'fake-aws-stack-name',
+                'templates/fake-template-path.json'
+            )
+        finally:
+            template.configure_streaming(False)
+
+        mock_stream.assert_called_once_with(
+            'fake-spectre-dir/templates/fake-template-path.json',
+            {'Key': 'Value'},
+            '.json',
+            mock_get_manifest.return_value
+        )
+        mock_write.assert_not_called()
+        assert {'Key': 'Value'} == template_body
+
+    @patch("sceptre_migration_tool.template.get_manifest")
+    @patch("sceptre_migration_tool.template._write_template")
+    @patch("sceptre_migration_tool.template._stream_template")
+    def test_import_template__streaming_yaml_unconverted(
+            self, mock_stream, mock_write, mock_get_manifest):
+        self.migration_environment.connection_manager.call.return_value = {
+            'TemplateBody': 'Key: Value\n'
+        }
+        template.configure_streaming(True)
+        try:
+            template.import_template(
+                self.migration_environment,
+                'fake-aws-stack-name',
+                'templates/fake-template-path.yaml'
+            )
+        finally:
+            template.configure_streaming(False)
+
+        mock_stream.assert_not_called()
+        mock_write.assert_called_once_with(
+            'fake-spectre-dir/templates/fake-template-path.yaml',
+            'Key: Value\n',
+            mock_get_manifest.return_value
+        )
+
+    @patch("sceptre_migration_tool.template.process_pool.run")
+    @patch("sceptre_migration_tool.template.get_manifest")
+    @patch("sceptre_migration_tool.template._write_template")
+    def test_import_template__large_yaml_unconverted_not_in_pool(
+            self, mock_write, mock_get_manifest, mock_run):
+        body = 'Key: ' + 'x' * template.LARGE_TEMPLATE_SIZE + '\n'
+        self.migration_environment.connection_manager.call.return_value = {
+            'TemplateBody': body
+        }
+        template.import_template(
+            self.migration_environment,
+            'fake-aws-stack-name',
+            'templates/fake-template-path.yaml'
+        )
+
+        mock_run.assert_not_called()
+        mock_write.assert_called_once_with(
+            'fake-spectre-dir/templates/fake-template-path.yaml',
+            body,
+            mock_get_manifest.return_value
+        )
+
+    @patch("sceptre_migration_tool.template.process_pool.run")
+    @patch("sceptre_migration_tool.template.get_manifest")
+    @patch("sceptre_migration_tool.template._write_template")
+    def test_import_template__large_yaml_to_json_in_pool(
+            self, mock_write, mock_get_manifest, mock_run):
+        body = 'Key: ' + 'x' * template.LARGE_TEMPLATE_SIZE + '\n'
+        self.migration_environment.connection_manager.call.return_value = {
+            'TemplateBody': body
+        }
+        mock_run.return_value = ({'Key': 'x'}, '{"Key": "x"}')
+        template.import_template(
+            self.migration_environment,
+            'fake-aws-stack-name',
+            'templates/fake-template-path.json'
+        )
+
+        mock_run.assert_called_once_with(
+            template._prepare_template, body, '.json'
+        )
+
+    def test__write_template__concurrent_same_path(self):
+        # Widen the window between the existence check and the write
+        isfile = os.path.isfile
+
+        def _slow_isfile(path):
+            result = isfile(path)
+            time.sleep(0.01)
+            return result
+
+        with patch(
+            "sceptre_migration_tool.template.os.path.isfile",
+            side_effect=_slow_isfile
+        ):
+            self._write_template_concurrently()
+
+    def _write_template_concurrently(self):
+        bodies = ['Key: Value1\n', 'Key: Value2\n']
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for attempt in range(5):
+                path = os.path.join(
+                    temp_dir, str(attempt), 'fake-template.yaml'
+                )
+                start = threading.Event()
+                errors = []
+
+                def _write(body):
+                    start.wait()
+                    try:
+                        template._write_template(path, body)
+                    except ImportFailureError as e:
+                        errors.append(e)
+
+                threads = [
+                    threading.Thread(target=_write, args=(body,))
+                    for body in bodies
+                ]
+                for thread in threads:
+                    thread.start()
+                start.set()
+                for thread in threads:
+                    thread.join()
+
+                assert 1 == len(errors)
+                with open(path) as template_file:
+                    assert template_file.read() in bodies
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestTemplate_stream_template(object):
+
+    def setup_method(self, test_method):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'templates', 'fake.yaml')
+        self.manifest = Manifest(
+            os.path.join(self.temp_dir, '.migration-manifest')
+        )
+        self.data = OrderedDict([('Key', 'Value'), ('Other', [1, 2])])
+
+    def teardown_method(self, test_method):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self, path=None):
+        with open(path or self.path) as template_file:
+            return template_file.read()
+
+    def _list_template_dir(self):
+        return os.listdir(os.path.dirname(self.path))
+
+    def test_stream_template__new_yaml_file(self):
+        template._stream_template(self.path, self.data, '.yaml', self.manifest)
+        assert self._read() == 'Key: Value\nOther:\n- 1\n- 2\n'
+        assert ['fake.yaml'] == self._list_template_dir()
+        assert self.manifest.is_current(self.path, self._read())
+
+    def test_stream_template__new_json_file(self):
+        path = os.path.join(self.temp_dir, 'fake.json')
+        template._stream_template(path, self.data, '.json', self.manifest)
+        assert self._read(path) == json.dumps(self.data)
+
+    def test_stream_template__same_as_normalized(self):
+        template._stream_template(self.path, self.data, '.yaml')
+        assert self._read() == \
+            template._normalize_template_for_write(self.data, '.yaml')
+
+    def test_stream_template__identical_file_kept(self):
+        template._stream_template(self.path, self.data, '.yaml')
+        mtime = os.stat(self.path).st_mtime
+        with patch("sceptre_migration_tool.template.cfn_yaml.load") \
+                as mock_load:
+            template._stream_template(
+                self.path, self.data, '.yaml', self.manifest
+            )
+        mock_load.assert_not_called()
+        assert mtime == os.stat(self.path).st_mtime
+        assert ['fake.yaml'] == self._list_template_dir()
+        assert self.manifest.is_current(self.path, self._read())
+
+    def test_stream_template__equivalent_file_kept(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as template_file:
+            template_file.write('Other: [1, 2]\nKey: Value\n')
+        template._stream_template(self.path, self.data, '.yaml', self.manifest)
+        assert self._read() == 'Other: [1, 2]\nKey: Value\n'
+        assert ['fake.yaml'] == self._list_template_dir()
+        assert self.manifest.is_current(
+            self.path, 'Key: Value\nOther:\n- 1\n- 2\n'
+        )
+
+    def test_stream_template__different_file(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as template_file:
+            template_file.write('Key: Other\n')
+        with pytest.raises(ImportFailureError):
+            template._stream_template(self.path, self.data, '.yaml')
+        assert self._read() == 'Key: Other\n'
+        assert ['fake.yaml'] == self._list_template_dir()
+
+    def test_stream_template__unsupported(self):
+        with pytest.raises(UnsupportedTemplateFileTypeError):
+            template._stream_template(
+                os.path.join(self.temp_dir, 'fake.txt'), self.data, '.txt'
+            )